@@ -1,14 +1,69 @@
 from __future__ import annotations
 
+import gc
 import json
+import logging
+import re
 from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from pydantic import TypeAdapter, ValidationError
 
 from app.domain.product import Product
 
 CATALOG_PATH = Path(__file__).with_name("catalog.json")
 
+"""
+Catalog file loading (JSON array or JSON Lines), streamed in validated batches.
+
+Rationale:
+- Large feeds are never held in memory as a whole: the file is read in 1 MiB
+  chunks and only about one batch of raw items (`batch_size` products plus one
+  chunk) exists besides the validated models, instead of the full text plus
+  every parsed dict.
+- Each batch is validated by one `TypeAdapter(list[Product])` call (a single
+  pass in pydantic-core rather than one `model_validate` per item). JSON Lines
+  batches go straight from bytes to models with `validate_json`.
+- `progress(products_loaded, bytes_read, total_bytes)` is called after every
+  batch, so startup and hot reloads of big catalogs can report how far along
+  they are.
+- `load_catalog` pauses the cyclic garbage collector: a load allocates
+  millions of dicts and models that all survive, and each collection would
+  traverse every one of them again (about a quarter of the load time) without
+  freeing anything. Reference counting still frees the temporary dicts.
+
+Notes:
+- The format is chosen by extension: `.jsonl` / `.ndjson` are JSON Lines (one
+  product object per line, blank lines ignored); anything else is a JSON array
+  of product objects, as in `catalog.json`. Prefer JSON Lines for large feeds:
+  its batches are validated from bytes without intermediate dicts (see
+  `benchmarks/bench_catalog_load.py`).
+- Invalid items raise `ValueError` naming the file and the item position;
+  malformed JSON raises `ValueError` naming the byte offset. A JSON array item
+  may span at most `_MAX_PENDING` characters (4 chunks).
+"""
+
+logger = logging.getLogger(__name__)
+
+Progress = Callable[[int, int, int], None]
+
+DEFAULT_BATCH_SIZE = 5_000
+_CHUNK_SIZE = 1 << 20
+# Unparsed text allowed to pile up before the array is declared malformed.
+_MAX_PENDING = 4 * _CHUNK_SIZE
+_JSON_LINES_SUFFIXES = {".jsonl", ".ndjson"}
+
+_PRODUCTS = TypeAdapter(list[Product])
+_DECODER = json.JSONDecoder()
+_SKIP_RE = re.compile(r"[\s,]*")
+_WS_RE = re.compile(r"\s*")
+
 
-def load_catalog() -> list[Product]:
+def load_catalog(
+    path: Path = CATALOG_PATH,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Progress] = None,
+) -> list[Product]:
     """
     Loads the perfume catalog from a JSON file and validates it against the Product model.
 
@@ -16,5 +71,162 @@ def load_catalog() -> list[Product]:
     - Centralizes access to the catalog (nodes should not read JSON files directly).
     - Performs runtime validation using Pydantic to prevent corrupted catalog data.
     """
-    data = json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
-    return [Product.model_validate(item) for item in data]
+    products: list[Product] = []
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        for batch in iter_catalog_batches(path, batch_size=batch_size, progress=progress):
+            products.extend(batch)
+    finally:
+        if collecting:
+            gc.enable()
+    return products
+
+
+def iter_catalog_batches(
+    path: Path = CATALOG_PATH,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Progress] = None,
+) -> Iterator[list[Product]]:
+    """Yield the validated products of the catalog file in batches of `batch_size`."""
+    path = Path(path)
+    total = path.stat().st_size
+    if path.suffix.lower() in _JSON_LINES_SUFFIXES:
+        raw_batches = _json_lines(path, batch_size)
+    else:
+        raw_batches = _json_array(path, batch_size)
+
+    loaded = 0
+    for raw, count, bytes_read in raw_batches:
+        try:
+            batch = _PRODUCTS.validate_json(raw) if isinstance(raw, bytes) else _PRODUCTS.validate_python(raw)
+        except ValidationError as exc:
+            raise ValueError(f"Invalid catalog {path} (items {loaded}..{loaded + count - 1}): {exc}") from exc
+        loaded += len(batch)
+        if progress is not None:
+            progress(loaded, bytes_read, total)
+        yield batch
+
+
+def _json_lines(path: Path, batch_size: int) -> Iterator[tuple[bytes, int, int]]:
+    """JSON Lines: batches as the bytes of a JSON array (validated without dicts)."""
+    lines: list[bytes] = []
+    bytes_read = 0
+    with path.open("rb") as fh:
+        for line in fh:
+            bytes_read += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            lines.append(line)
+            if len(lines) == batch_size:
+                yield b"[" + b",".join(lines) + b"]", len(lines), bytes_read
+                lines = []
+    if lines:
+        yield b"[" + b",".join(lines) + b"]", len(lines), bytes_read
+
+
+def _json_array(path: Path, batch_size: int) -> Iterator[tuple[list[dict], int, int]]:
+    """
+    JSON array: the complete items of each chunk are decoded with `_decode_items`.
+
+    Only the incomplete item at the end of a chunk is carried over (and tried
+    again with the next chunk), so the work per chunk is bounded by the chunk
+    plus one item, wherever the chunk boundaries fall. Text that still does not
+    decode once more than `_MAX_PENDING` characters are pending is a syntax
+    error (a single item larger than that is rejected too).
+    """
+    items: list[dict] = []
+    with path.open("r", encoding="utf-8") as fh:
+        buf = fh.read(_CHUNK_SIZE)
+        bytes_read = len(buf.encode("utf-8"))
+        buf = buf.lstrip()
+        if not buf.startswith("["):
+            raise ValueError(f"Invalid catalog {path}: expected a JSON array")
+        buf = buf[1:]
+        while True:
+            chunk = fh.read(_CHUNK_SIZE)
+            bytes_read += len(chunk.encode("utf-8"))
+            if not chunk:
+                # Last piece: the rest of the array, closing bracket included.
+                rest = _SKIP_RE.sub("", buf, count=1)
+                if rest.strip() != "]":
+                    try:
+                        items.extend(json.loads("[" + rest))
+                    except json.JSONDecodeError as exc:
+                        error = (len(buf) - len(rest) + exc.pos - 1, exc.msg)
+                        raise _syntax_error(path, buf, bytes_read, error) from exc
+                break
+            buf += chunk
+            done, error = _decode_items(buf, items)
+            buf = buf[done:]
+            if len(buf) > _MAX_PENDING:
+                if error is not None:
+                    error = (error[0] - done, error[1])
+                raise _syntax_error(path, buf, bytes_read, error)
+            while len(items) >= batch_size:
+                yield items[:batch_size], batch_size, bytes_read
+                del items[:batch_size]
+    while items:
+        yield items[:batch_size], min(batch_size, len(items)), bytes_read
+        del items[:batch_size]
+
+
+def _decode_items(buf: str, out: list[dict]) -> tuple[int, Optional[tuple[int, str]]]:
+    """
+    Append the complete items at the start of `buf` (array text) to `out`.
+
+    Returns the number of characters consumed and, when decoding stopped on an
+    incomplete or malformed item, the (position in `buf`, message) of the error.
+
+    The text up to the last `}` is tried first with one `json.loads` call; it
+    parses as a list of values only if that `}` ends an item of the array.
+    When it does not (the `}` sits inside a string or closes a nested object),
+    the text is decoded item by item up to the incomplete one instead.
+    """
+    cut = buf.rfind("}") + 1
+    if not cut:
+        return 0, None
+    try:
+        out.extend(json.loads("[" + _SKIP_RE.sub("", buf[:cut], count=1) + "]"))
+        return cut, None
+    except json.JSONDecodeError:
+        pass
+    done = 0
+    pos = _SKIP_RE.match(buf).end()
+    while True:
+        try:
+            item, end = _DECODER.raw_decode(buf, pos)
+        except json.JSONDecodeError as exc:
+            return done, (exc.pos, exc.msg)
+        nxt = _WS_RE.match(buf, end).end()
+        if nxt < len(buf) and buf[nxt] not in ",]":
+            return done, (nxt, "Expecting ',' delimiter")
+        out.append(item)
+        done = end
+        if nxt == len(buf) or buf[nxt] == "]":
+            return done, None
+        pos = _WS_RE.match(buf, nxt + 1).end()
+
+
+def _syntax_error(path: Path, buf: str, bytes_read: int, error: Optional[tuple[int, str]]) -> ValueError:
+    """`ValueError` for malformed text in `buf` (the last text read), naming its byte offset in the file."""
+    start = bytes_read - len(buf.encode("utf-8"))
+    if error is None:
+        return ValueError(f"Invalid catalog {path}: no complete item in {len(buf)} characters from byte {start}")
+    pos, msg = error
+    return ValueError(f"Invalid catalog {path}: {msg} at byte {start + len(buf[:max(pos, 0)].encode('utf-8'))}")
+
+
+def log_progress(step: float = 0.1) -> Progress:
+    """Progress callback logging once per `step` fraction of the file read."""
+    logged = [0]
+
+    def report(loaded: int, bytes_read: int, total: int) -> None:
+        done = bytes_read / total if total else 1.0
+        mark = int(done / step + 1e-9)
+        if mark > logged[0]:
+            logged[0] = mark
+            logger.info("Catalog: %d products loaded (%.0f%% of %d bytes)", loaded, done * 100, total)
+
+    return report
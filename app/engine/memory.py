@@ -1,10 +1,38 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Protocol
+
+from app.utils.proc import current_rss_bytes
 
 from .state import ConversationState
 
 
+class SessionStore(Protocol):
+    """
+    Storage contract used by `ChatEngine` to load and persist conversation state.
+
+    Implementations:
+    - `InMemorySessionStore`: process-local dict (default; dev/tests).
+    - `SqliteSessionStore`: embedded SQLite file shared by the workers of one host.
+    """
+
+    def get(self, session_id: str) -> Optional[ConversationState]:
+        """Return the stored state for `session_id`, or None if unknown."""
+        ...
+
+    def set(self, state: ConversationState) -> None:
+        """Persist `state` under `state.session_id`, overwriting any previous value."""
+        ...
+
+    def reset(self, session_id: str) -> None:
+        """Remove the stored state for `session_id` (no-op if unknown)."""
+        ...
+
+
 class InMemorySessionStore:
     """
     Minimal in-memory session store.
@@ -12,23 +40,76 @@ class InMemorySessionStore:
     - Key: session_id
     - Value: ConversationState
 
+    Eviction (both optional, disabled by default):
+    - `ttl_seconds`: sessions idle (no get/set) for longer than this expire.
+    - `max_sessions`: once full, the least recently used session is evicted.
+
+    Entries are kept in access order, so both policies only ever look at the
+    oldest entries: an expired session is dropped lazily when read, and a
+    background sweeper (every `sweep_interval` seconds) pops expired sessions
+    from the front of the order until it reaches a live one.
+
+    `on_evict(session_id)` (optional) is called for every session dropped by
+    either policy, outside the store lock; `ChatEngine` uses it to release the
+    session's stock holds. It is not called by `reset`.
+
     Notes:
     - This store is ephemeral (data is lost on process restart).
     - It is not shared across multiple worker processes/instances.
-    - Suitable for local development and tests; production deployments
-      typically require a shared persistent store (e.g., Redis/Postgres).
+    - Suitable for local development and tests; multi-worker deployments on a
+      single host can use `SqliteSessionStore` instead.
     """
-    def __init__(self) -> None:
-        # Internal in-memory map for session state.
-        self._db: Dict[str, ConversationState] = {}
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        # Internal in-memory map for session state, least recently used first:
+        # session_id -> (state, last access time).
+        self._db: OrderedDict[str, tuple[ConversationState, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._ttl = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self._max_sessions = max_sessions if max_sessions and max_sessions > 0 else None
+        self._clock = clock
+        self.on_evict = on_evict
+
+        self._expired = 0
+        self._evicted = 0
+
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        if self._ttl is not None and sweep_interval > 0:
+            self._sweeper = threading.Thread(
+                target=_sweep_forever,
+                args=(weakref.ref(self), self._stop, sweep_interval),
+                name="session-sweeper",
+                daemon=True,
+            )
+            self._sweeper.start()
 
     def get(self, session_id: str) -> Optional[ConversationState]:
         """
         Retrieve the conversation state for a given session.
 
-        Returns None if the session does not exist.
+        Returns None if the session does not exist or has expired.
         """
-        return self._db.get(session_id)
+        now = self._clock()
+        with self._lock:
+            entry = self._db.get(session_id)
+            if entry is None:
+                return None
+            state, last_access = entry
+            if self._ttl is None or now - last_access <= self._ttl:
+                self._db[session_id] = (state, now)
+                self._db.move_to_end(session_id)
+                return state
+            del self._db[session_id]
+            self._expired += 1
+        self._evicted_all((session_id,))
+        return None
 
     def set(self, state: ConversationState) -> None:
         """
@@ -36,7 +117,16 @@ class InMemorySessionStore:
 
         Overwrites any existing state for the same session_id.
         """
-        self._db[state.session_id] = state
+        now = self._clock()
+        evicted: list[str] = []
+        with self._lock:
+            self._db[state.session_id] = (state, now)
+            self._db.move_to_end(state.session_id)
+            if self._max_sessions is not None:
+                while len(self._db) > self._max_sessions:
+                    evicted.append(self._db.popitem(last=False)[0])
+                    self._evicted += 1
+        self._evicted_all(evicted)
 
     def reset(self, session_id: str) -> None:
         """
@@ -44,4 +134,66 @@ class InMemorySessionStore:
 
         This operation is idempotent: resetting an unknown session_id is a no-op.
         """
-        self._db.pop(session_id, None)
+        with self._lock:
+            self._db.pop(session_id, None)
+
+    def sweep(self) -> int:
+        """
+        Drop every session idle for longer than the TTL; return how many were removed.
+        """
+        if self._ttl is None:
+            return 0
+        deadline = self._clock() - self._ttl
+        removed: list[str] = []
+        with self._lock:
+            while self._db:
+                session_id, (_, last_access) = next(iter(self._db.items()))
+                if last_access >= deadline:
+                    break
+                del self._db[session_id]
+                removed.append(session_id)
+            self._expired += len(removed)
+        self._evicted_all(removed)
+        return len(removed)
+
+    def _evicted_all(self, session_ids: Iterable[str]) -> None:
+        """Notify `on_evict` of sessions dropped by expiry or LRU eviction."""
+        if self.on_evict is not None:
+            for session_id in session_ids:
+                self.on_evict(session_id)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Memory gauge: live sessions, evictions so far and current process RSS.
+        """
+        with self._lock:
+            sessions = len(self._db)
+        return {
+            "sessions": sessions,
+            "expired_total": self._expired,
+            "evicted_total": self._evicted,
+            "rss_bytes": current_rss_bytes(),
+        }
+
+    def close(self) -> None:
+        """Stop the background sweeper (if any)."""
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=5)
+
+
+def _sweep_forever(
+    store_ref: "weakref.ReferenceType[InMemorySessionStore]",
+    stop: threading.Event,
+    interval: float,
+) -> None:
+    """
+    Sweeper thread body. Holds only a weak reference, so an unused store can
+    still be garbage collected (the thread then exits on its next tick).
+    """
+    while not stop.wait(interval):
+        store = store_ref()
+        if store is None:
+            return
+        store.sweep()
+        del store
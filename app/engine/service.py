@@ -1,14 +1,23 @@
 from __future__ import annotations
 
-from typing import Literal
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Literal, TypeVar
 
 from app.engine.response import finalize_assistant_message
 from app.engine.state import Mode
-from app.graph.builder import build_graph
+from app.graph.executor import build_executor
+from app.services.inventory import InMemoryInventoryLedger, get_inventory
+from app.utils.metrics import get_metrics
+from app.utils.turn_context import turn_scope
 from app.ux import t
 
-from .memory import InMemorySessionStore
+from .memory import InMemorySessionStore, SessionStore
 from .state import ConversationState
+from .state_codec import TRANSIENT_FIELDS, decode_state, encode_state
+
+T = TypeVar("T")
 
 
 def _detect_language_switch_or_greeting(text: str) -> Literal["es", "en"] | None:
@@ -33,17 +42,95 @@ def _detect_language_switch_or_greeting(text: str) -> Literal["es", "en"] | None
     return None
 
 
+class _TurnSnapshot:
+    """
+    Pre-graph copy of a session state, restored if the turn fails.
+
+    Executors run nodes on the state object itself (the one the store handed
+    out), so a node raising mid-turn would leave partial changes in the stored
+    session. Encoding the state (`state_codec`) costs about a third of a deep
+    copy, and decoding only happens on failure.
+    """
+
+    __slots__ = ("_blob", "_transient")
+
+    def __init__(self, state: ConversationState) -> None:
+        self._blob = encode_state(state)
+        # The codec does not store these; keep the values of this turn.
+        self._transient = {name: getattr(state, name) for name in TRANSIENT_FIELDS}
+
+    def restore(self) -> ConversationState:
+        state = decode_state(self._blob)
+        for name, value in self._transient.items():
+            setattr(state, name, value)
+        return state
+
+
 class ChatEngine:
     """
     Orchestrates session state and routes each user turn through the LangGraph.
 
-    The engine keeps session state in an in-memory store (suitable for local/dev)
-    and reuses a single compiled graph instance across requests.
+    The engine keeps session state in a pluggable `SessionStore` (in-memory by
+    default, suitable for local/dev) and reuses a single compiled graph instance
+    across requests. With `executor="direct"` the same nodes run through
+    `DirectExecutor` instead of LangGraph (same outputs, lower per-turn cost).
+
+    Concurrency:
+    - Every public operation on a session runs under that session's lock, so
+      concurrent turns for the same session_id are serialized (no lost cart
+      updates), while different sessions still run in parallel.
+    - Locks are striped: session ids hash onto a fixed pool of `lock_stripes`
+      re-entrant locks, so memory does not grow with the number of sessions.
+    - The async API (`aprocess_turn`, `astart_session`, ...) uses a parallel pool
+      of asyncio locks, so waiting for a session never blocks the event loop.
+      Use one API or the other for a given deployment, not both at once.
+    - On the async API, calls that may block on I/O run in worker threads: the
+      store calls unless both the session store and the inventory ledger are
+      in-memory (SQLite disk I/O, group-commit waits, ledger transactions), and
+      with `executor="direct"` the dispatched node when the ledger is not
+      in-memory (cart tools reserve stock in it).
+
+    Failures:
+    - If the graph raises, the session is stored back as it was before the
+      graph ran (see `_TurnSnapshot`) and the exception propagates.
+
+    Turn scratch:
+    - Every turn runs inside `turn_scope()`, so parser and name-search results
+      are computed once per turn and shared by rules, nodes and tools (see
+      `app.utils.turn_context`).
+
+    Inventory:
+    - With an inventory ledger enabled (`get_inventory()`), every turn of a session
+      with a non-empty cart extends the expiry of its stock holds, and `reset`
+      releases them. So does an `InMemorySessionStore` expiring or evicting the
+      session (its `on_evict` callback is wired to the ledger unless already set).
     """
 
-    def __init__(self) -> None:
-        self._store = InMemorySessionStore()
-        self._graph = build_graph()
+    def __init__(
+        self,
+        store: SessionStore | None = None,
+        lock_stripes: int = 64,
+        executor: Literal["graph", "direct"] = "graph",
+    ) -> None:
+        self._store: SessionStore = store if store is not None else InMemorySessionStore()
+        self._metrics = get_metrics()
+        self._inventory = get_inventory()
+        blocking_ledger = self._inventory is not None and not isinstance(self._inventory, InMemoryInventoryLedger)
+        self._inline = isinstance(self._store, InMemorySessionStore) and not blocking_ledger
+        self._graph = build_executor(executor, offload_nodes=blocking_ledger)
+        if self._inventory is not None and isinstance(self._store, InMemorySessionStore):
+            if self._store.on_evict is None:
+                self._store.on_evict = self._inventory.release
+        self._locks = [threading.RLock() for _ in range(max(1, lock_stripes))]
+        self._async_locks = [asyncio.Lock() for _ in range(len(self._locks))]
+
+    def _session_lock(self, session_id: str) -> threading.RLock:
+        """Return the lock stripe guarding `session_id`."""
+        return self._locks[hash(session_id) % len(self._locks)]
+
+    def _async_session_lock(self, session_id: str) -> asyncio.Lock:
+        """Return the asyncio lock stripe guarding `session_id` on the async path."""
+        return self._async_locks[hash(session_id) % len(self._async_locks)]
 
     def start_session(
         self,
@@ -53,15 +140,16 @@ class ChatEngine:
         """
         Initialize a new session if it doesn't exist, returning the current state.
         """
-        state = self._store.get(session_id)
-        if state is not None:
-            return state
+        with self._session_lock(session_id):
+            state = self._store.get(session_id)
+            if state is not None:
+                return state
 
-        state = ConversationState(session_id=session_id)
-        state.preferred_language = language or "es"
-        state.assistant_message = t(state, "welcome")
-        self._store.set(state)
-        return state
+            state = ConversationState(session_id=session_id)
+            state.preferred_language = language or "es"
+            state.assistant_message = t(state, "welcome")
+            self._store.set(state)
+            return state
 
     def submit_checkout_form(
         self,
@@ -75,80 +163,132 @@ class ChatEngine:
         """
         Validate and persist checkout form fields, then move the session to review.
         """
-        state = self._store.get(session_id)
-        if state is None:
-            state = self.start_session(session_id=session_id)
+        with self._session_lock(session_id):
+            state = self._store.get(session_id)
+            if state is None:
+                state = self.start_session(session_id=session_id)
+
+            # Do not accept checkout data once the conversation has ended.
+            if state.should_end or state.mode == Mode.END:
+                state.assistant_message = t(state, "ended")
+                state.ui_show_checkout_form = False
+                state.ui_form_error = None
+                self._store.set(state)
+                return state
 
-        # Do not accept checkout data once the conversation has ended.
-        if state.should_end or state.mode == Mode.END:
-            state.assistant_message = t(state, "ended")
-            state.ui_show_checkout_form = False
             state.ui_form_error = None
-            self._store.set(state)
-            return state
 
-        state.ui_form_error = None
+            full_name = (full_name or "").strip()
+            address_line1 = (address_line1 or "").strip()
+            city = (city or "").strip()
+            postal_code = (postal_code or "").strip()
+            phone = (phone or "").strip()
+
+            # Basic server-side validation for required fields and numeric constraints.
+            if not full_name or not address_line1 or not city or not postal_code or not phone:
+                state.ui_form_error = t(state, "checkout_form_missing_fields_error")
+                state.ui_show_checkout_form = True
+                state.assistant_message = t(state, "checkout_form_missing_fields_msg")
+                self._store.set(state)
+                return state
 
-        full_name = (full_name or "").strip()
-        address_line1 = (address_line1 or "").strip()
-        city = (city or "").strip()
-        postal_code = (postal_code or "").strip()
-        phone = (phone or "").strip()
+            if not postal_code.replace(" ", "").isdigit():
+                state.ui_form_error = t(state, "checkout_form_postal_numeric_error")
+                state.ui_show_checkout_form = True
+                state.assistant_message = t(state, "checkout_form_postal_numeric_msg")
+                self._store.set(state)
+                return state
 
-        # Basic server-side validation for required fields and numeric constraints.
-        if not full_name or not address_line1 or not city or not postal_code or not phone:
-            state.ui_form_error = t(state, "checkout_form_missing_fields_error")
-            state.ui_show_checkout_form = True
-            state.assistant_message = t(state, "checkout_form_missing_fields_msg")
-            self._store.set(state)
-            return state
+            if not phone.replace(" ", "").isdigit():
+                state.ui_form_error = t(state, "checkout_form_phone_numeric_error")
+                state.ui_show_checkout_form = True
+                state.assistant_message = t(state, "checkout_form_phone_numeric_msg")
+                self._store.set(state)
+                return state
 
-        if not postal_code.replace(" ", "").isdigit():
-            state.ui_form_error = t(state, "checkout_form_postal_numeric_error")
-            state.ui_show_checkout_form = True
-            state.assistant_message = t(state, "checkout_form_postal_numeric_msg")
-            self._store.set(state)
-            return state
+            state.shipping.full_name = full_name
+            state.shipping.address_line1 = address_line1
+            state.shipping.city = city
+            state.shipping.postal_code = postal_code
+            state.shipping.phone = phone
 
-        if not phone.replace(" ", "").isdigit():
-            state.ui_form_error = t(state, "checkout_form_phone_numeric_error")
-            state.ui_show_checkout_form = True
-            state.assistant_message = t(state, "checkout_form_phone_numeric_msg")
+            state.ui_show_checkout_form = False
+            state.mode = Mode.CHECKOUT_REVIEW
+
+            state.assistant_message = t(
+                state,
+                "checkout_review_prompt",
+                full_name=state.shipping.full_name,
+                address_line1=state.shipping.address_line1,
+                city=state.shipping.city,
+                postal_code=state.shipping.postal_code,
+                phone=state.shipping.phone,
+            )
+
+            finalize_assistant_message(state)
             self._store.set(state)
             return state
 
-        state.shipping.full_name = full_name
-        state.shipping.address_line1 = address_line1
-        state.shipping.city = city
-        state.shipping.postal_code = postal_code
-        state.shipping.phone = phone
-
-        state.ui_show_checkout_form = False
-        state.mode = Mode.CHECKOUT_REVIEW
-
-        state.assistant_message = t(
-            state,
-            "checkout_review_prompt",
-            full_name=state.shipping.full_name,
-            address_line1=state.shipping.address_line1,
-            city=state.shipping.city,
-            postal_code=state.shipping.postal_code,
-            phone=state.shipping.phone,
-        )
-
-        finalize_assistant_message(state)
-        self._store.set(state)
-        return state
-
     def process_turn(self, session_id: str, user_message: str) -> ConversationState:
         """
         Process a single user turn through the conversation graph.
         """
+        started = time.perf_counter()
+        with self._session_lock(session_id), turn_scope():
+            state, done = self._begin_turn(session_id, user_message)
+            if done:
+                return state
+
+            snapshot = _TurnSnapshot(state)
+            try:
+                result = self._graph.invoke(state)
+            except BaseException:
+                self._store.set(snapshot.restore())
+                raise
+            new_state = self._finish_turn(result)
+            self._store.set(new_state)
+        if self._metrics is not None:
+            self._metrics.observe_turn(time.perf_counter() - started)
+        return new_state
+
+    async def aprocess_turn(self, session_id: str, user_message: str) -> ConversationState:
+        """
+        Async variant of `process_turn` (runs the graph with `ainvoke`).
+
+        The LLM round-trip is awaited, so one worker can keep many turns in
+        flight; turns of the same session are still serialized.
+        """
+        started = time.perf_counter()
+        async with self._async_session_lock(session_id):
+            with turn_scope():
+                state, done = await self._arun(self._begin_turn, session_id, user_message)
+                if done:
+                    return state
+
+                snapshot = _TurnSnapshot(state)
+                try:
+                    result = await self._graph.ainvoke(state)
+                except BaseException:
+                    await self._arun(self._store.set, snapshot.restore())
+                    raise
+                new_state = self._finish_turn(result)
+            await self._arun(self._store.set, new_state)
+        if self._metrics is not None:
+            self._metrics.observe_turn(time.perf_counter() - started)
+        return new_state
+
+    def _begin_turn(self, session_id: str, user_message: str) -> tuple[ConversationState, bool]:
+        """
+        Load the session and handle the turns answered without the graph.
+
+        Returns `(state, done)`; when `done` is True the state is final (and
+        already persisted if it changed).
+        """
         state = self._store.get(session_id)
         if state is None:
             state = self.start_session(session_id=session_id)
             if not (user_message or "").strip():
-                return state
+                return state, True
 
         # Do not process further messages after reaching an end state.
         if state.should_end or state.mode == Mode.END:
@@ -156,27 +296,91 @@ class ChatEngine:
             state.ui_show_checkout_form = False
             state.ui_form_error = None
             self._store.set(state)
-            return state
+            return state, True
 
         state.user_message = user_message
+        if self._inventory is not None and state.cart:
+            self._inventory.touch(session_id)
 
         switch_lang = _detect_language_switch_or_greeting(user_message)
         if switch_lang in ("es", "en"):
             state.preferred_language = switch_lang
             state.assistant_message = t(state, "welcome")
             self._store.set(state)
-            return state
+            return state, True
 
-        # LangGraph may return either a state-like object or a raw dict; normalize to ConversationState.
-        result = self._graph.invoke(state)
-        new_state = ConversationState.model_validate(result) if isinstance(result, dict) else result
+        return state, False
 
+    @staticmethod
+    def _finish_turn(new_state: ConversationState) -> ConversationState:
+        """Finalize the assistant message of the executor's output state."""
+        # Executors hand back the validated state object itself (no dict round-trip).
         finalize_assistant_message(new_state)
-        self._store.set(new_state)
         return new_state
 
+    async def _arun(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a store-bound call from async code.
+
+        Stores other than the in-memory one may block on I/O (e.g. SQLite reads,
+        or waits for its group commit), and so may the inventory ledger these
+        calls touch (`touch`, `release`: a SQLite ledger transaction waits for
+        the write lock), so unless both are in-memory the call goes to a worker
+        thread instead of stalling the event loop. The calling context (turn
+        scratch) is copied into the thread.
+        """
+        if self._inline:
+            return fn(*args, **kwargs)
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    def get_session(self, session_id: str) -> ConversationState | None:
+        """Return the stored state of `session_id`, or None if it does not exist."""
+        return self._store.get(session_id)
+
+    async def aget_session(self, session_id: str) -> ConversationState | None:
+        """Async variant of `get_session` (the store read runs off the event loop)."""
+        return await self._arun(self._store.get, session_id)
+
     def reset(self, session_id: str) -> None:
         """
         Clear all stored state for a session.
         """
-        self._store.reset(session_id)
+        with self._session_lock(session_id):
+            self._store.reset(session_id)
+            if self._inventory is not None:
+                self._inventory.release(session_id)
+
+    async def astart_session(
+        self,
+        session_id: str,
+        language: Literal["es", "en"] | None = None,
+    ) -> ConversationState:
+        """Async variant of `start_session` (serialized with `aprocess_turn`)."""
+        async with self._async_session_lock(session_id):
+            return await self._arun(self.start_session, session_id=session_id, language=language)
+
+    async def asubmit_checkout_form(
+        self,
+        session_id: str,
+        full_name: str,
+        address_line1: str,
+        city: str,
+        postal_code: str,
+        phone: str,
+    ) -> ConversationState:
+        """Async variant of `submit_checkout_form` (serialized with `aprocess_turn`)."""
+        async with self._async_session_lock(session_id):
+            return await self._arun(
+                self.submit_checkout_form,
+                session_id=session_id,
+                full_name=full_name,
+                address_line1=address_line1,
+                city=city,
+                postal_code=postal_code,
+                phone=phone,
+            )
+
+    async def areset(self, session_id: str) -> None:
+        """Async variant of `reset` (serialized with `aprocess_turn`)."""
+        async with self._async_session_lock(session_id):
+            await self._arun(self.reset, session_id)
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from .state import ConversationState
+from .state_codec import decode_state, encode_state, is_snapshot
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    rev        INTEGER NOT NULL,
+    data       BLOB    NOT NULL,
+    updated_at REAL    NOT NULL
+)
+"""
+
+
+def _encode_state(state: ConversationState) -> bytes:
+    """Compact versioned snapshot (see `app.engine.state_codec`)."""
+    return encode_state(state)
+
+
+def _decode_state(blob: bytes) -> ConversationState:
+    """Inverse of `_encode_state`; rows written before snapshots (zlib JSON) are still readable."""
+    if is_snapshot(blob):
+        return decode_state(blob)
+    return ConversationState.model_validate_json(zlib.decompress(blob))
+
+
+class SqliteSessionStore:
+    """
+    Session store backed by an embedded SQLite database (WAL mode).
+
+    The database file can be shared by several worker processes on the same host
+    (e.g. `uvicorn app.main:app --workers 4`), so a session no longer depends on
+    sticky routing to the worker that created it.
+
+    Design:
+    - Reads go through an in-process LRU cache. Every cached entry carries the
+      row revision (`rev`) it was loaded from; a read only checks the revision
+      (an indexed lookup, no blob transfer) and reloads the state when another
+      worker has written a newer one.
+    - Writes are group-committed: concurrent `set()` calls are queued and a
+      single writer thread commits everything queued in one transaction
+      (repeated writes to the same session collapse to the latest one). By default `set()`
+      returns only once its write is committed, so other workers never observe
+      stale state; `durable_writes=False` turns this into write-behind.
+    - `reset()` queues a delete (a tombstone replacing any queued write of the
+      session) and waits for it like a durable write, so it is ordered after
+      batches already handed to the writer and every ticket gets committed.
+
+    Notes:
+    - A single SQLite connection is used per store, guarded by a lock.
+    - Call `close()` on shutdown to flush pending writes and stop the writer.
+    - A failed batch is raised to the `set()`/`reset()` calls waiting on it,
+      and once to the next `flush()`.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        cache_size: int = 1024,
+        durable_writes: bool = True,
+    ) -> None:
+        self._path = str(path)
+        self._cache_size = max(0, cache_size)
+        self._durable_writes = durable_writes
+
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+        # session_id -> (rev, state)
+        self._cache: OrderedDict[str, tuple[int, ConversationState]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Write queue: session_id -> (rev, blob, state), or None for a delete;
+        # the latest write per session wins.
+        self._pending: dict[str, Optional[tuple[int, bytes, ConversationState]]] = {}
+        self._enqueued = 0
+        self._committed = 0
+        self._failed_ticket = 0
+        self._flush_reported = 0  # last `_failed_ticket` raised by `flush`
+        self._error: Exception | None = None
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._writer = threading.Thread(target=self._writer_loop, name="sqlite-session-writer", daemon=True)
+        self._writer.start()
+
+    # ------------------------------------------------------------------
+    # SessionStore API
+    # ------------------------------------------------------------------
+    def get(self, session_id: str) -> Optional[ConversationState]:
+        """
+        Return the latest state for `session_id`, or None if it does not exist.
+        """
+        with self._cond:
+            queued = session_id in self._pending
+            pending = self._pending.get(session_id)
+        if queued:
+            return pending[2] if pending is not None else None
+
+        with self._cache_lock:
+            cached = self._cache.get(session_id)
+
+        cached_rev = cached[0] if cached else None
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT rev, CASE WHEN rev = ? THEN NULL ELSE data END FROM sessions WHERE session_id = ?",
+                (cached_rev, session_id),
+            ).fetchone()
+
+        if row is None:
+            self._cache_drop(session_id)
+            return None
+
+        rev, blob = row
+        if blob is None and cached is not None:
+            self._cache_put(session_id, rev, cached[1])
+            return cached[1]
+
+        state = _decode_state(blob)
+        self._cache_put(session_id, rev, state)
+        return state
+
+    def set(self, state: ConversationState) -> None:
+        """
+        Queue `state` for persistence and (by default) wait until it is committed.
+        """
+        rev = random.getrandbits(62)
+        blob = _encode_state(state)
+        self._cache_put(state.session_id, rev, state)
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SqliteSessionStore is closed")
+            self._pending[state.session_id] = (rev, blob, state)
+            self._enqueued += 1
+            ticket = self._enqueued
+            self._cond.notify_all()
+
+            if self._durable_writes:
+                self._wait_committed(ticket)
+
+    def reset(self, session_id: str) -> None:
+        """
+        Delete the stored state for `session_id`. Idempotent.
+        """
+        self._cache_drop(session_id)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SqliteSessionStore is closed")
+            # The tombstone replaces any queued write of this session; a batch already
+            # handed to the writer commits first, so it cannot overwrite the delete.
+            self._pending[session_id] = None
+            self._enqueued += 1
+            ticket = self._enqueued
+            self._cond.notify_all()
+            self._wait_committed(ticket)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def flush(self) -> None:
+        """
+        Block until every write queued so far has been processed by the writer.
+
+        Raises if a batch failed since the failure last raised here; a failure
+        is reported once, so later flushes only wait for newer writes.
+        """
+        with self._cond:
+            ticket = self._enqueued
+            self._cond.notify_all()
+            while self._committed < ticket and self._failed_ticket < ticket:
+                self._cond.wait()
+            if self._failed_ticket > self._flush_reported:
+                self._flush_reported = self._failed_ticket
+                raise RuntimeError("Failed to persist session state") from self._error
+
+    def close(self) -> None:
+        """
+        Flush pending writes, stop the writer thread and close the connection.
+
+        The writer is stopped and the connection closed even if the flush
+        raises (the error is re-raised afterwards).
+        """
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._writer.join(timeout=5)
+            with self._db_lock:
+                self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _writer_loop(self) -> None:
+        """Drain the write queue, committing each drained batch in a single transaction."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+
+                batch = self._pending
+                self._pending = {}
+                # Every write enqueued so far is in this batch (later writes for the
+                # same session replaced earlier ones in the queue).
+                ticket = self._enqueued
+
+            now = time.time()
+            error: Exception | None = None
+            with self._db_lock:
+                try:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    self._conn.executemany(
+                        "INSERT INTO sessions (session_id, rev, data, updated_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(session_id) DO UPDATE SET "
+                        "rev = excluded.rev, data = excluded.data, updated_at = excluded.updated_at",
+                        [(sid, w[0], w[1], now) for sid, w in batch.items() if w is not None],
+                    )
+                    self._conn.executemany(
+                        "DELETE FROM sessions WHERE session_id = ?",
+                        [(sid,) for sid, w in batch.items() if w is None],
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception as exc:  # pragma: no cover - depends on disk/lock failures
+                    if self._conn.in_transaction:
+                        self._conn.execute("ROLLBACK")
+                    error = exc
+
+            with self._cond:
+                if error is None:
+                    self._committed = ticket
+                else:
+                    # Surface the failure to the writers waiting on this batch.
+                    self._failed_ticket = ticket
+                    self._error = error
+                    for sid in batch:
+                        self._cache_drop(sid)
+                self._cond.notify_all()
+
+    def _wait_committed(self, ticket: int) -> None:
+        """Wait (holding `_cond`) until `ticket` is committed; raise if its batch failed."""
+        while self._committed < ticket:
+            if self._failed_ticket >= ticket:
+                raise RuntimeError("Failed to persist session state") from self._error
+            self._cond.wait()
+
+    def _cache_put(self, session_id: str, rev: int, state: ConversationState) -> None:
+        if not self._cache_size:
+            return
+        with self._cache_lock:
+            self._cache[session_id] = (rev, state)
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, session_id: str) -> None:
+        with self._cache_lock:
+            self._cache.pop(session_id, None)
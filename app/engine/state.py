@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Optional, Literal
+from typing import Any, Callable, Iterable, Optional, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, GetCoreSchemaHandler
+from pydantic_core import core_schema
 
 from app.llm.router_schema import CartAction
 from app.domain.product import Product
@@ -15,6 +16,145 @@ class CartItem(BaseModel):
     qty: int = Field(default=1, ge=1)
 
 
+def _cents(price: float) -> int:
+    return round(price * 100)
+
+
+class Cart(list):
+    """
+    Cart lines in display order, plus a product_id -> position index and a cached total.
+
+    Rationale:
+    - The cart tools look lines up by product id and nodes ask for the total after
+      almost every cart operation; both are O(1) here instead of a scan per call.
+    - `set_many` applies a whole batch of quantity changes and compacts removed
+      lines once, so bulk updates on large carts stay linear instead of paying a
+      scan and a `list.pop` per action.
+    - The total is kept in integer cents and adjusted as quantities change, so it
+      never accumulates float error.
+
+    Notes:
+    - `set_qty`/`set_many` are the only way quantities should change; the tools
+      use them.
+    - The cached total is tied to the catalog version it was priced with. `total`
+      recomputes it from scratch when the catalog version differs (prices may have
+      changed) or when a line changed without a known unit price.
+    - Plain list mutations (`append`, `pop`, slicing, ...) still work: they rebuild
+      the index and drop the cached total.
+    - Behaves as a `list[CartItem]` for pydantic validation, serialization,
+      equality and copying.
+    """
+
+    def __init__(self, items: Iterable[CartItem] = ()) -> None:
+        super().__init__(items)
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._index_positions()
+        self._total_cents: Optional[int] = None
+        self._priced_version: Optional[int] = None
+
+    def _index_positions(self) -> None:
+        pos: dict[int, int] = {}
+        for i, item in enumerate(self):
+            # First line wins, mirroring the previous `next(...)` lookups.
+            pos.setdefault(item.product_id, i)
+        self._pos = pos
+
+    def line(self, product_id: int) -> Optional[CartItem]:
+        """Return the cart line for `product_id`, or None if it is not in the cart."""
+        i = self._pos.get(product_id)
+        return self[i] if i is not None else None
+
+    def position(self, product_id: int) -> Optional[int]:
+        """Return the display position of the line for `product_id`, or None."""
+        return self._pos.get(product_id)
+
+    def set_qty(self, product_id: int, qty: int, unit_price: Optional[float]) -> None:
+        """
+        Set the quantity of a product: qty <= 0 drops its line, a new product is appended.
+
+        `unit_price` is the current catalog price used to adjust the cached total;
+        pass None when it is unknown (the total is then recomputed on next read).
+        """
+        self.set_many(((product_id, qty, unit_price),))
+
+    def set_many(self, changes: Iterable[tuple[int, int, Optional[float]]]) -> None:
+        """
+        Apply `(product_id, qty, unit_price)` changes in order, as repeated `set_qty` calls would.
+
+        Dropped lines are removed in a single compaction at the end, so the batch costs
+        O(len(cart) + len(changes)). A product dropped and then set again within the
+        batch moves to the end of the cart, exactly as with sequential calls.
+        """
+        dead: set[int] = set()
+        for product_id, qty, unit_price in changes:
+            i = self._pos.get(product_id)
+            old = self[i].qty if i is not None else 0
+            new = max(qty, 0)
+
+            if self._total_cents is not None:
+                if unit_price is None:
+                    self._total_cents = None
+                else:
+                    self._total_cents += (new - old) * _cents(unit_price)
+
+            if i is None:
+                if new > 0:
+                    self._pos[product_id] = len(self)
+                    super().append(CartItem(product_id=product_id, qty=new))
+            elif new > 0:
+                self[i].qty = new
+            else:
+                dead.add(i)
+                del self._pos[product_id]
+
+        if dead:
+            super().__setitem__(slice(None), [x for i, x in enumerate(self) if i not in dead])
+            # Positions shift after compaction; this also exposes the next line of a
+            # product that had duplicate lines (legacy data).
+            self._index_positions()
+
+    def total(self, price_of: Callable[[int], Optional[float]], catalog_version: int) -> float:
+        """
+        Cart total priced with `price_of` (product id -> price, None if missing).
+
+        Products missing from the catalog are skipped. The result is cached until the
+        cart changes without a unit price or `catalog_version` changes.
+        """
+        if self._total_cents is None or self._priced_version != catalog_version:
+            cents = 0
+            for item in self:
+                price = price_of(item.product_id)
+                if price is not None:
+                    cents += item.qty * _cents(price)
+            self._total_cents = cents
+            self._priced_version = catalog_version
+        return self._total_cents / 100
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_after_validator_function(cls, handler(list[CartItem]))
+
+
+def _invalidating(name: str) -> Callable[..., Any]:
+    base = getattr(list, name)
+
+    def method(self: Cart, *args: Any) -> Any:
+        result = base(self, *args)
+        self._reindex()
+        return result
+
+    method.__name__ = name
+    return method
+
+
+for _name in ("append", "extend", "insert", "pop", "remove", "clear",
+              "__setitem__", "__delitem__", "__iadd__", "__imul__"):
+    setattr(Cart, _name, _invalidating(_name))
+del _name
+
+
 class Mode(str, Enum):
     """
     High-level phase of the shopping flow.
@@ -76,7 +216,7 @@ class ConversationState(BaseModel):
 
     # --- Product selection and cart state ---
     selected_product_id: Optional[int] = None
-    cart: list[CartItem] = Field(default_factory=list)
+    cart: Cart = Field(default_factory=Cart)
 
     # --- Router / intent metadata (useful for debugging and UX decisions) ---
     last_intent: str | None = None
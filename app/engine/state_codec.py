@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+from app.domain.product import Product
+from app.engine.state import CartItem, ConversationState
+
+
+"""
+Compact, versioned binary snapshots of `ConversationState`.
+
+`model_dump_json` of a state repeats every field name and every default value.
+Snapshots produced here are what the SQLite session store persists and what
+the engine restores a session from when a turn fails.
+
+Layout:
+    b"CS" | version (1 byte) | flags (1 byte) | body (zlib-compressed if flags & 1)
+    body = field count, then (tag, value) pairs in a small tagged binary encoding
+    (None/bool/int/float/str/list/map; integers are zigzag varints, 0..63 fit
+    in one byte).
+
+Rationale:
+- Fields are identified by stable numeric tags (`STATE_TAGS`), not names, and
+  only non-default values are written.
+- Encode/decode is a pure round trip: products (`ui_products`, `ui_product`)
+  are stored as the records that were shown (`PRODUCT_TAGS`, non-default
+  fields only), never looked up in the catalog, so a catalog reload does not
+  change what a restored session displays.
+- Per-turn fields that are always overwritten before they are read
+  (`TRANSIENT_FIELDS`) are not stored at all.
+- Schema evolution: unknown tags are skipped (snapshots from newer code stay
+  readable), missing tags take the model default, and `_MIGRATIONS` upgrades
+  the decoded field dict of an older version before validation. Tags are
+  never renumbered or reused; bump `VERSION` only for changes tags cannot
+  express (e.g. a field changing meaning).
+- The body is compressed only when that actually makes it smaller (long
+  assistant messages), which keeps small snapshots cheap to decode.
+"""
+
+MAGIC = b"CS"
+VERSION = 2
+_FLAG_ZLIB = 0x01
+_COMPRESS_MIN = 256
+
+# Stable field tags. Append only: never renumber or reuse a tag.
+STATE_TAGS: dict[str, int] = {
+    "session_id": 1,
+    "mode": 2,
+    "assistant_message": 3,
+    "shipping": 4,
+    "should_end": 5,
+    "selected_product_id": 6,
+    "cart": 7,
+    "last_intent": 8,
+    "last_confidence": 9,
+    "last_language": 10,
+    "recommended_family": 11,
+    "recommended_audience": 12,
+    "recommended_max_price": 13,
+    "recommended_min_price": 14,
+    "pending_actions": 15,
+    "ui_products": 16,
+    "ui_product": 17,
+    "ui_cart_total": 18,
+    "ui_show_checkout_form": 19,
+    "ui_form_error": 20,
+    "preferred_language": 21,
+    "candidate_products": 22,
+    "pending_product_op": 23,
+    "pending_qty": 24,
+    "last_cart_product_ids": 25,
+    "last_cart_op": 26,
+    "last_cart_qty": 27,
+    "pending_name_actions": 28,
+    "resume_after_choice": 29,
+    "pending_bulk_op": 30,
+    "pending_bulk_qty": 31,
+    "pending_recommend_clarification": 32,
+}
+_TAG_FIELDS = {tag: name for name, tag in STATE_TAGS.items()}
+
+# Stable tags of the `Product` fields inside a product record. Append only.
+PRODUCT_TAGS: dict[str, int] = {
+    "id": 1,
+    "name": 2,
+    "price": 3,
+    "category": 4,
+    "description": 5,
+    "description_es": 6,
+    "brand": 7,
+    "concentration": 8,
+    "size_ml": 9,
+    "family": 10,
+    "audience": 11,
+    "stock": 12,
+    "img": 13,
+}
+_PRODUCT_TAG_FIELDS = {tag: name for name, tag in PRODUCT_TAGS.items()}
+
+# Overwritten at the start of every turn before anything reads them.
+TRANSIENT_FIELDS = frozenset({"user_message", "next_node"})
+
+
+
+def _drop_product_ids(fields: dict[str, Any]) -> dict[str, Any]:
+    """
+    v1 -> v2: v1 stored only the catalog ids of the products shown.
+
+    Rebuilding them would need the catalog, so the cards are dropped; they are
+    display-only and every turn sets them again.
+    """
+    fields.pop("ui_products", None)
+    fields.pop("ui_product", None)
+    return fields
+
+
+# version -> upgrade of the decoded {field: value} dict to version + 1.
+_MIGRATIONS: dict[int, Callable[[dict[str, Any]], dict[str, Any]]] = {1: _drop_product_ids}
+
+
+# ---------------------------------------------------------------------------
+# Value encoding
+# ---------------------------------------------------------------------------
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _LIST, _MAP = range(8)
+_SMALL_INT = 0x40  # 0x40..0x7f: integers 0..63
+_DOUBLE = struct.Struct("<d")
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    shift = result = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write(out: bytearray, value: Any) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        if 0 <= value < 64:
+            out.append(_SMALL_INT | value)
+        else:
+            out.append(_INT)
+            _write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(_STR)
+        _write_varint(out, len(data))
+        out += data
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _write(out, item)
+    elif isinstance(value, dict):
+        out.append(_MAP)
+        _write_varint(out, len(value))
+        for k, v in value.items():
+            _write(out, k)
+            _write(out, v)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} in a state snapshot")
+
+
+def _read(buf: bytes, pos: int) -> tuple[Any, int]:
+    tag = buf[pos]
+    pos += 1
+    if tag & _SMALL_INT:
+        return tag & 0x3F, pos
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _INT:
+        z, pos = _read_varint(buf, pos)
+        return (z >> 1) ^ -(z & 1), pos
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(buf, pos)[0], pos + 8
+    if tag == _STR:
+        n, pos = _read_varint(buf, pos)
+        return buf[pos:pos + n].decode("utf-8"), pos + n
+    if tag == _LIST:
+        n, pos = _read_varint(buf, pos)
+        items = []
+        for _ in range(n):
+            item, pos = _read(buf, pos)
+            items.append(item)
+        return items, pos
+    if tag == _MAP:
+        n, pos = _read_varint(buf, pos)
+        mapping = {}
+        for _ in range(n):
+            k, pos = _read(buf, pos)
+            mapping[k], pos = _read(buf, pos)
+        return mapping, pos
+    raise ValueError(f"Corrupt state snapshot: unknown value tag {tag:#x}")
+
+
+# ---------------------------------------------------------------------------
+# Field conversions (model values <-> plain values)
+# ---------------------------------------------------------------------------
+def _defaults(model: type[BaseModel]) -> dict[str, Any]:
+    return {
+        name: field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+        if not field.is_required()
+    }
+
+
+_DEFAULTS = _defaults(ConversationState)
+_PRODUCT_DEFAULTS = _defaults(Product)
+
+
+def _product_to_plain(product: Product) -> dict[int, Any]:
+    record = {}
+    for name, tag in PRODUCT_TAGS.items():
+        value = getattr(product, name)
+        if name not in _PRODUCT_DEFAULTS or value != _PRODUCT_DEFAULTS[name]:
+            record[tag] = value
+    return record
+
+
+def _product_from_plain(record: dict[int, Any]) -> dict[str, Any]:
+    # Unknown tags come from newer code: skip them.
+    return {_PRODUCT_TAG_FIELDS[tag]: v for tag, v in record.items() if tag in _PRODUCT_TAG_FIELDS}
+
+
+def _to_plain(name: str, value: Any) -> Any:
+    if name == "mode":
+        return value.value
+    if name == "shipping":
+        return value.model_dump(exclude_none=True)
+    if name == "cart":
+        return [[item.product_id, item.qty] for item in value]
+    if name == "pending_actions":
+        return [action.model_dump(mode="json") for action in value]
+    if name == "ui_products":
+        return [_product_to_plain(p) for p in value]
+    if name == "ui_product":
+        return _product_to_plain(value)
+    return value
+
+
+def _from_plain(fields: dict[str, Any]) -> dict[str, Any]:
+    cart = fields.get("cart")
+    if cart is not None:
+        fields["cart"] = [CartItem(product_id=pid, qty=qty) for pid, qty in cart]
+    products = fields.get("ui_products")
+    if products is not None:
+        fields["ui_products"] = [_product_from_plain(p) for p in products]
+    if fields.get("ui_product") is not None:
+        fields["ui_product"] = _product_from_plain(fields["ui_product"])
+    return fields
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+def encode_state(state: ConversationState) -> bytes:
+    """Serialize `state` into a versioned snapshot (see module notes)."""
+    body = bytearray()
+    pairs = []
+    for name, tag in STATE_TAGS.items():
+        value = getattr(state, name)
+        if name in _DEFAULTS and value == _DEFAULTS[name]:
+            continue
+        pairs.append((tag, _to_plain(name, value)))
+    _write_varint(body, len(pairs))
+    for tag, value in pairs:
+        _write_varint(body, tag)
+        _write(body, value)
+
+    flags = 0
+    payload = bytes(body)
+    if len(payload) >= _COMPRESS_MIN:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < len(payload):
+            payload, flags = compressed, _FLAG_ZLIB
+    return MAGIC + bytes((VERSION, flags)) + payload
+
+
+def is_snapshot(blob: bytes) -> bool:
+    """True if `blob` was produced by `encode_state` (any version)."""
+    return blob[:2] == MAGIC
+
+
+def decode_state(blob: bytes) -> ConversationState:
+    """Inverse of `encode_state`; accepts snapshots of this or any older version."""
+    if not is_snapshot(blob) or len(blob) < 4:
+        raise ValueError("Not a ConversationState snapshot")
+    version, flags = blob[2], blob[3]
+    if version > VERSION:
+        raise ValueError(f"Unsupported snapshot version {version} (this code reads up to {VERSION})")
+    body = zlib.decompress(blob[4:]) if flags & _FLAG_ZLIB else blob[4:]
+
+    count, pos = _read_varint(body, 0)
+    fields: dict[str, Any] = {}
+    for _ in range(count):
+        tag, pos = _read_varint(body, pos)
+        value, pos = _read(body, pos)
+        name = _TAG_FIELDS.get(tag)
+        if name is not None:  # unknown tags come from newer code: skip them
+            fields[name] = value
+
+    for v in range(version, VERSION):
+        fields = _MIGRATIONS[v](fields)
+    return ConversationState.model_validate(_from_plain(fields))
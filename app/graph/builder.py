@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import inspect
+from typing import Any, Callable, TypedDict
+
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 from app.engine.state import ConversationState
@@ -16,10 +20,75 @@ from app.graph.nodes import (
     handle_checkout_review_node,
     recommend_product_node,
     interpret_user_node,
+    ainterpret_user_node,
     bulk_cart_update_node,
     resolve_product_choice_node,
     adjust_cart_qty_node,
 )
+from app.utils.metrics import get_metrics
+
+
+NodeFn = Callable[[ConversationState], ConversationState]
+
+# Business/UI nodes: every turn runs exactly one of them, chosen by
+# `select_next_node`, and then ends. Shared by the LangGraph builder and the
+# direct executor (`app.graph.executor`), so both always dispatch to the same
+# set of nodes.
+NODES: dict[str, NodeFn] = {
+    # Catalog / product browsing
+    "show_catalog": show_catalog_node,
+    "show_product_detail": show_product_detail_node,
+    # Cart operations
+    "add_to_cart": add_to_cart_node,
+    "view_cart": view_cart_node,
+    "remove_from_cart": remove_from_cart_node,
+    "bulk_cart_update": bulk_cart_update_node,
+    "resolve_product_choice": resolve_product_choice_node,
+    "adjust_cart_qty": adjust_cart_qty_node,
+    # Checkout flow
+    "checkout_confirm": checkout_confirm_node,
+    "handle_checkout_confirmation": handle_checkout_confirmation_node,
+    "handle_checkout_review": handle_checkout_review_node,
+    # Recommendations / fallback
+    "recommend_product": recommend_product_node,
+    "echo": echo_node,
+}
+
+
+class GraphTurn(TypedDict):
+    """
+    Graph state: a single channel holding the conversation state object.
+
+    Nodes receive and return the already-validated `ConversationState`, so
+    LangGraph neither splits it into one channel per field nor rebuilds (and
+    re-validates) the model before every node and after the last one.
+    """
+
+    state: ConversationState
+
+
+def _lift(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Adapt a `ConversationState -> ConversationState` node (sync or async) to `GraphTurn`."""
+    if inspect.iscoroutinefunction(fn):
+        async def anode(turn: GraphTurn) -> GraphTurn:
+            return {"state": await fn(turn["state"])}
+
+        return anode
+
+    def node(turn: GraphTurn) -> GraphTurn:
+        return {"state": fn(turn["state"])}
+
+    return node
+
+
+def _select_next(turn: GraphTurn) -> str:
+    return select_next_node(turn["state"])
+
+
+def instrumented(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap `fn` with the node execution timer when metrics are enabled."""
+    metrics = get_metrics()
+    return metrics.timed_node(name, fn) if metrics is not None else fn
 
 
 def build_graph():
@@ -30,78 +99,42 @@ def build_graph():
     - One user turn triggers a single graph execution.
     - `interpret_user` updates the state from the raw user message (intent/entities).
     - `route` selects the next node via `select_next_node`.
-    - All business/UI nodes end the turn by transitioning to END.
+    - All business/UI nodes (`NODES`) end the turn by transitioning to END.
+    - The compiled graph supports both `invoke` and `ainvoke`: `interpret_user`
+      carries a sync and an async implementation (the latter awaits the LLM
+      router); every other node is CPU-only and shared by both paths.
+    - The graph state is `GraphTurn` ({"state": ConversationState}): invoke it
+      with `{"state": state}` and read the resulting state from the same key.
+    - With metrics enabled every node is wrapped with an execution timer;
+      otherwise the node functions are registered as they are.
     """
-    g = StateGraph(ConversationState)
+    g = StateGraph(GraphTurn)
 
     # 1) Parse/interpret the user message into structured state.
-    g.add_node("interpret_user", interpret_user_node)
+    g.add_node(
+        "interpret_user",
+        RunnableLambda(
+            _lift(instrumented("interpret_user", interpret_user_node)),
+            afunc=_lift(instrumented("interpret_user", ainterpret_user_node)),
+        ),
+    )
 
     # 2) Route to the appropriate node based on the updated state.
-    g.add_node("route", route_node)
+    g.add_node("route", _lift(instrumented("route", route_node)))
 
-    # Catalog / product browsing
-    g.add_node("show_catalog", show_catalog_node)
-    g.add_node("show_product_detail", show_product_detail_node)
-
-    # Cart operations
-    g.add_node("add_to_cart", add_to_cart_node)
-    g.add_node("view_cart", view_cart_node)
-    g.add_node("remove_from_cart", remove_from_cart_node)
-    g.add_node("bulk_cart_update", bulk_cart_update_node)
-    g.add_node("resolve_product_choice", resolve_product_choice_node)
-    g.add_node("adjust_cart_qty", adjust_cart_qty_node)
-
-    # Checkout flow
-    g.add_node("checkout_confirm", checkout_confirm_node)
-    g.add_node("handle_checkout_confirmation", handle_checkout_confirmation_node)
-    g.add_node("handle_checkout_review", handle_checkout_review_node)
-
-    # Recommendations / fallback
-    g.add_node("recommend_product", recommend_product_node)
-    g.add_node("echo", echo_node)
+    # 3) One business/UI node per turn.
+    for name, fn in NODES.items():
+        g.add_node(name, _lift(instrumented(name, fn)))
 
     # Entry point for every turn.
     g.set_entry_point("interpret_user")
     g.add_edge("interpret_user", "route")
 
-    # Contract: `select_next_node` must return one of the keys in this mapping.
-    g.add_conditional_edges(
-        "route",
-        select_next_node,
-        {
-            "show_catalog": "show_catalog",
-            "show_product_detail": "show_product_detail",
-            "add_to_cart": "add_to_cart",
-            "view_cart": "view_cart",
-            "remove_from_cart": "remove_from_cart",
-            "bulk_cart_update": "bulk_cart_update",
-            "resolve_product_choice": "resolve_product_choice",
-            "adjust_cart_qty": "adjust_cart_qty",
-            "checkout_confirm": "checkout_confirm",
-            "handle_checkout_confirmation": "handle_checkout_confirmation",
-            "handle_checkout_review": "handle_checkout_review",
-            "recommend_product": "recommend_product",
-            "echo": "echo",
-        },
-    )
+    # Contract: `select_next_node` must return one of the keys of `NODES`.
+    g.add_conditional_edges("route", _select_next, {name: name for name in NODES})
 
     # End the graph after executing a single business/UI node per turn.
-    for node in [
-        "show_catalog",
-        "show_product_detail",
-        "resolve_product_choice",
-        "add_to_cart",
-        "view_cart",
-        "remove_from_cart",
-        "bulk_cart_update",
-        "adjust_cart_qty",
-        "checkout_confirm",
-        "handle_checkout_confirmation",
-        "handle_checkout_review",
-        "recommend_product",
-        "echo",
-    ]:
-        g.add_edge(node, END)
+    for name in NODES:
+        g.add_edge(name, END)
 
     return g.compile()
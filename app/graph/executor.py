@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.engine.state import ConversationState
+from app.graph.builder import NODES, build_graph, instrumented
+from app.graph.nodes import ainterpret_user_node, interpret_user_node
+from app.graph.routing.selectors import route_node, select_next_node
+
+
+"""
+Direct-dispatch turn executor.
+
+The compiled LangGraph always runs the same shape: interpret_user -> route ->
+one node from `NODES` -> END. Going through LangGraph still costs, on every
+turn, its task scheduling and channel bookkeeping (even with the single
+`GraphTurn` channel).
+
+`DirectExecutor` runs the very same node functions in that order on the state
+object it is given, dispatching through a table built once from `NODES`.
+
+Rationale:
+- Same contract as `GraphExecutor` (`invoke` / `ainvoke` taking and returning
+  a `ConversationState`), so the engine can use either one; differential
+  tests check that both produce the same state turn after turn.
+- No per-turn copies: nodes mutate and return the state they receive, which
+  is exactly what they already do under LangGraph.
+- Node timers (metrics) are applied the same way as in `build_graph`.
+- With `offload_nodes`, `ainvoke` runs the dispatched (sync) node in a worker
+  thread, as LangGraph does for sync nodes, so a node blocking on I/O (cart
+  tools on a SQLite inventory ledger) does not stall the event loop. The
+  engine enables it when its inventory ledger is not in-memory.
+
+Notes:
+- With either executor nodes work on the state object itself; `ChatEngine`
+  snapshots the state before invoking the executor and stores the snapshot
+  back if a node raises, so a failed turn leaves the session unchanged.
+"""
+
+
+class GraphExecutor:
+    """The compiled LangGraph behind the executor contract (state in, state out)."""
+
+    def __init__(self) -> None:
+        self._graph = build_graph()
+
+    def invoke(self, state: ConversationState) -> ConversationState:
+        return self._graph.invoke({"state": state})["state"]
+
+    async def ainvoke(self, state: ConversationState) -> ConversationState:
+        return (await self._graph.ainvoke({"state": state}))["state"]
+
+
+class DirectExecutor:
+    """Runs interpret_user -> route -> dispatched node without LangGraph."""
+
+    def __init__(self, offload_nodes: bool = False) -> None:
+        self._offload_nodes = offload_nodes
+        self._interpret = instrumented("interpret_user", interpret_user_node)
+        self._ainterpret = instrumented("interpret_user", ainterpret_user_node)
+        self._route = instrumented("route", route_node)
+        self._dispatch = {name: instrumented(name, fn) for name, fn in NODES.items()}
+
+    def invoke(self, state: ConversationState) -> ConversationState:
+        state = self._route(self._interpret(state))
+        return self._dispatch[select_next_node(state)](state)
+
+    async def ainvoke(self, state: ConversationState) -> ConversationState:
+        state = self._route(await self._ainterpret(state))
+        node = self._dispatch[select_next_node(state)]
+        if self._offload_nodes:
+            return await asyncio.to_thread(node, state)
+        return node(state)
+
+
+def build_executor(kind: str = "graph", offload_nodes: bool = False):
+    """
+    Return the turn executor for `kind`: "graph" (`GraphExecutor`, default)
+    or "direct" (`DirectExecutor`, with `offload_nodes` passed through; LangGraph
+    always runs sync nodes in worker threads on `ainvoke`).
+    """
+    if kind == "direct":
+        return DirectExecutor(offload_nodes=offload_nodes)
+    if kind == "graph":
+        return GraphExecutor()
+    raise ValueError(f"Unknown turn executor: {kind!r} (expected 'graph' or 'direct')")
@@ -7,7 +7,7 @@ from .checkout import (
     handle_checkout_review_node,
 )
 from .recommend import recommend_product_node
-from .interpret import interpret_user_node
+from .interpret import ainterpret_user_node, interpret_user_node
 from .bulk_cart import bulk_cart_update_node
 from .clarify_product import resolve_product_choice_node
 from .adjust_qty import adjust_cart_qty_node
@@ -25,6 +25,7 @@ __all__ = [
     "handle_checkout_review_node",
     "recommend_product_node",
     "interpret_user_node",
+    "ainterpret_user_node",
     "bulk_cart_update_node",
     "resolve_product_choice_node",
     "adjust_cart_qty_node",
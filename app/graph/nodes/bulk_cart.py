@@ -1,14 +1,13 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, List
+from typing import List
 
 from app.engine.state import ConversationState, Mode
 from app.llm.router_schema import CartAction, CartOp
 from app.tools import (
     tool_get_product,
-    tool_add_to_cart,
-    tool_remove_from_cart,
+    tool_bulk_update_cart,
     tool_cart_total,
     tool_find_products_by_name,
 )
@@ -143,74 +142,41 @@ def bulk_cart_update_node(state: ConversationState) -> ConversationState:
     # --------------------------------------------------
     # 2) Apply actions
     # --------------------------------------------------
-    # Build a local view of cart quantities to validate removals consistently during the batch.
-    in_cart: Dict[int, int] = {item.product_id: item.qty for item in state.cart}
+    # The whole batch is applied as one transaction; each action gets an outcome to report.
     lines: List[str] = []
     affected: list[int] = []
 
-    for a in actions:
-        op = a.op
-        product_id = a.product_id
-        qty = a.qty
-
-        product = tool_get_product(product_id)
-        if not product:
-            lines.append(t(state, "bulk_not_found", product_id=product_id))
+    for r in tool_bulk_update_cart(state, actions):
+        if r.product is None:
+            lines.append(t(state, "bulk_not_found", product_id=r.action.product_id))
             continue
 
-        product_label = f"[{product.id}] {product.brand} - {product.name}"
-
-        if op == CartOp.ADD:
-            ok, added = tool_add_to_cart(state, product_id, qty=qty)
-            if not ok or added <= 0:
-                lines.append(t(state, "bulk_no_stock", product_label=product_label))
-                continue
+        product_label = f"[{r.product.id}] {r.product.brand} - {r.product.name}"
 
+        if r.status == "no_stock":
+            lines.append(t(state, "bulk_no_stock", product_label=product_label))
+        elif r.status == "added":
             note = ""
-            if added < qty:
-                note = t(state, "bulk_partial_add_note", qty=qty, added=added)
-
-            lines.append(t(state, "bulk_added", added=added, product_label=product_label, note=note))
-            in_cart[product_id] = in_cart.get(product_id, 0) + added
-            affected.append(product_id)
-            continue
-
-        if op == CartOp.REMOVE:
-            current_qty = in_cart.get(product_id, 0)
-            if current_qty <= 0:
-                lines.append(t(state, "bulk_not_in_cart", product_label=product_label))
-                continue
-
-            if qty > current_qty:
-                lines.append(
-                    t(
-                        state,
-                        "bulk_cannot_remove",
-                        qty=qty,
-                        product_label=product_label,
-                        current_qty=current_qty,
-                    )
+            if r.qty < r.action.qty:
+                note = t(state, "bulk_partial_add_note", qty=r.action.qty, added=r.qty)
+            lines.append(t(state, "bulk_added", added=r.qty, product_label=product_label, note=note))
+        elif r.status == "not_in_cart":
+            lines.append(t(state, "bulk_not_in_cart", product_label=product_label))
+        elif r.status == "cannot_remove":
+            lines.append(
+                t(
+                    state,
+                    "bulk_cannot_remove",
+                    qty=r.action.qty,
+                    product_label=product_label,
+                    current_qty=r.current_qty,
                 )
-                continue
-
-            ok, removed = tool_remove_from_cart(state, product_id, qty=qty)
-            if not ok or removed <= 0:
-                lines.append(t(state, "bulk_remove_failed", product_label=product_label))
-                continue
-
-            lines.append(t(state, "bulk_removed", removed=removed, product_label=product_label))
-
-            remaining = current_qty - removed
-            if remaining <= 0:
-                in_cart.pop(product_id, None)
-            else:
-                in_cart[product_id] = remaining
-
-            affected.append(product_id)
-            continue
+            )
+        else:
+            lines.append(t(state, "bulk_removed", removed=r.qty, product_label=product_label))
 
-        # Defensive fallback (should not occur due to schema validation).
-        lines.append(t(state, "bulk_not_found", product_id=product_id))
+        if r.ok:
+            affected.append(r.product.id)
 
     total = tool_cart_total(state)
     lines.append("")
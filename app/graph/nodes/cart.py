@@ -2,7 +2,6 @@ from __future__ import annotations
 
 from app.engine.state import ConversationState, Mode
 from app.tools import (
-    tool_list_catalog,
     tool_get_product,
     tool_add_to_cart,
     tool_remove_from_cart,
@@ -102,11 +101,10 @@ def view_cart_node(state: ConversationState) -> ConversationState:
         state.assistant_message = t(state, "cart_empty")
         return state
 
-    catalog = tool_list_catalog()
     lines = [t(state, "cart_header")]
 
     for item in state.cart:
-        p = next((x for x in catalog if x.id == item.product_id), None)
+        p = tool_get_product(item.product_id)
         if not p:
             continue
         subtotal = p.price * item.qty
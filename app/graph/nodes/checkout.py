@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from app.engine.state import ConversationState, Mode
+from app.tools import tool_checkout_cart
 from app.ux import t
 
 # Shared yes/no vocabulary (ES + EN).
@@ -74,12 +75,25 @@ def handle_checkout_review_node(state: ConversationState) -> ConversationState:
     user_text = _norm(state.user_message)
 
     if _is_yes(user_text):
+        # Simulate order completion: held stock is sold and the cart is cleared.
+        short = tool_checkout_cart(state)
+        if short:
+            # Some units are gone (e.g. an expired hold): no order, back to the cart to adjust it.
+            state.mode = Mode.CART
+            state.ui_show_checkout_form = False
+            state.ui_form_error = None
+            lines = [t(state, "checkout_out_of_stock")]
+            for product, qty, available in short:
+                product_label = f"[{product.id}] {product.brand} - {product.name}"
+                lines.append(
+                    t(state, "checkout_out_of_stock_line", product_label=product_label, qty=qty, available=available)
+                )
+            state.assistant_message = "\n".join(lines)
+            return state
+
         # Do not end the conversation automatically after checkout.
         state.should_end = False
         state.mode = Mode.CATALOG  # alternatively: Mode.CART
-
-        # Simulate order completion: clear the cart.
-        state.cart = []
         state.selected_product_id = None
 
         # Reset shipping info (kept in memory only).
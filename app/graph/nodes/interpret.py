@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import logging
 import re
+import time
 
 from app.engine.state import ConversationState, Mode
 from app.graph.routing.rules import RULES
 from app.graph.routing.rules.common_rules import explicit_language_switch
 from app.ux import t
 from app.llm.config import llm_enabled, llm_min_confidence
-from app.llm.openai_router import interpret_with_openai
-from app.llm.router_schema import Intent
+from app.llm.openai_router import ainterpret_with_openai, interpret_with_openai
+from app.llm.router_schema import Intent, RouterResult
+from app.utils.metrics import ChatMetrics, get_metrics
+
+
+logger = logging.getLogger(__name__)
 
 
 _INTENT_TO_NODE: dict[Intent, str] = {
@@ -44,17 +50,15 @@ def _can_accept_intent(state: ConversationState, intent: Intent) -> bool:
     return True
 
 
-def interpret_user_node(state: ConversationState) -> ConversationState:
+def _prepare_turn(state: ConversationState) -> bool:
     """
-    Interpret the user message and decide the next node.
+    Reset per-turn outputs and run the deterministic rules.
 
-    Priority order:
-    1) Deterministic rules (fast, explainable, preferred)
-    2) Optional LLM router (slots + intent proposal)
-    3) Fallback to `echo`
+    Returns True when the turn is already decided (ended conversation or a rule
+    matched) and the LLM router must not be consulted.
     """
     if state.should_end or state.mode == Mode.END:
-        return state
+        return True
 
     # Reset per-turn outputs to ensure a clean decision for routing.
     state.assistant_message = ""
@@ -64,53 +68,115 @@ def interpret_user_node(state: ConversationState) -> ConversationState:
     state.next_node = None
 
     # 1) Deterministic rules drive routing when possible.
+    metrics = get_metrics()
+    if metrics is not None:
+        return _run_rules_timed(state, metrics)
     for rule in RULES:
         if rule(state):
-            return state
+            return True
+    return False
+
+
+def _run_rules_timed(state: ConversationState, metrics: ChatMetrics) -> bool:
+    """Same loop as `_prepare_turn`, recording each rule's time and the winner."""
+    clock = time.perf_counter
+    for rule in RULES:
+        start = clock()
+        matched = rule(state)
+        metrics.observe_rule(rule.__name__, clock() - start)
+        if matched:
+            metrics.rule_won(rule.__name__)
+            return True
+    metrics.rule_won("none")
+    return False
+
+
+def _apply_router_result(state: ConversationState, rr: RouterResult) -> bool:
+    """
+    Apply an LLM router proposal to the state.
+
+    Returns True if the proposal was accepted and `next_node` is set.
+    """
+    if rr.confidence < llm_min_confidence() or rr.intent == Intent.UNKNOWN:
+        return False
+
+    # Update language only when the user explicitly requests a switch.
+    if rr.language and explicit_language_switch(state.user_message):
+        state.preferred_language = rr.language
+
+    # End-of-conversation is handled here (not as a separate node).
+    if rr.intent == Intent.END:
+        state.mode = Mode.END
+        state.should_end = True
+        state.assistant_message = t(state, "ended")
+        state.next_node = "echo"
+        return True
+
+    # Recommendation slots
+    if rr.family is not None:
+        state.recommended_family = rr.family
+    if rr.audience is not None:
+        state.recommended_audience = rr.audience
+    if rr.max_price is not None:
+        state.recommended_max_price = rr.max_price
+    if rr.min_price is not None:
+        state.recommended_min_price = rr.min_price
+
+    # Apply product_id only if it appears in the raw user text.
+    if rr.product_id is not None and re.search(rf"\b{rr.product_id}\b", state.user_message or ""):
+        state.selected_product_id = rr.product_id
+
+    if _can_accept_intent(state, rr.intent):
+        state.last_intent = rr.intent.value
+        state.last_confidence = rr.confidence
+        state.next_node = _INTENT_TO_NODE.get(rr.intent, "echo")
+        return True
+    return False
+
+
+def interpret_user_node(state: ConversationState) -> ConversationState:
+    """
+    Interpret the user message and decide the next node.
+
+    Priority order:
+    1) Deterministic rules (fast, explainable, preferred)
+    2) Optional LLM router (slots + intent proposal)
+    3) Fallback to `echo`
+    """
+    if _prepare_turn(state):
+        return state
 
     # 2) Optional LLM router for intent + slot extraction.
     if llm_enabled():
         try:
-            rr = interpret_with_openai(state)
-
-            if rr.confidence >= llm_min_confidence() and rr.intent != Intent.UNKNOWN:
-                # Update language only when the user explicitly requests a switch.
-                if rr.language and explicit_language_switch(state.user_message):
-                    state.preferred_language = rr.language
-
-                # End-of-conversation is handled here (not as a separate node).
-                if rr.intent == Intent.END:
-                    state.mode = Mode.END
-                    state.should_end = True
-                    state.assistant_message = t(state, "ended")
-                    state.next_node = "echo"
-                    return state
-
-                # Recommendation slots
-                if rr.family is not None:
-                    state.recommended_family = rr.family
-                if rr.audience is not None:
-                    state.recommended_audience = rr.audience
-                if rr.max_price is not None:
-                    state.recommended_max_price = rr.max_price
-                if rr.min_price is not None:
-                    state.recommended_min_price = rr.min_price
-
-                # Apply product_id only if it appears in the raw user text.
-                if rr.product_id is not None and re.search(rf"\b{rr.product_id}\b", state.user_message or ""):
-                    state.selected_product_id = rr.product_id
-
-                if _can_accept_intent(state, rr.intent):
-                    state.last_intent = rr.intent.value
-                    state.last_confidence = rr.confidence
-                    state.next_node = _INTENT_TO_NODE.get(rr.intent, "echo")
-                    return state
-
+            if _apply_router_result(state, interpret_with_openai(state)):
+                return state
         except Exception:
-            # Intentionally silent: deterministic rules already cover core behavior.
-            # In production, this would be logged/observed; for the coding challenge we keep output clean.
-            pass
+            # Deterministic rules already cover core behavior: log and fall back.
+            logger.warning("LLM router failed; falling back to echo", exc_info=True)
 
     # 3) Fallback
     state.next_node = "echo"
     return state
+
+
+async def ainterpret_user_node(state: ConversationState) -> ConversationState:
+    """
+    Async variant of `interpret_user_node` (same priority order).
+
+    Used by `graph.ainvoke`: the optional LLM round-trip is awaited instead of
+    blocking a worker thread.
+    """
+    if _prepare_turn(state):
+        return state
+
+    if llm_enabled():
+        try:
+            if _apply_router_result(state, await ainterpret_with_openai(state)):
+                return state
+        except Exception:
+            # Same policy as the sync path: log and fall back.
+            logger.warning("LLM router failed; falling back to echo", exc_info=True)
+
+    state.next_node = "echo"
+    return state
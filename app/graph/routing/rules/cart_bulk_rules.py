@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import re
-
 from app.engine.state import ConversationState
 from app.utils import parse_cart_commands_by_name
+from .common_rules import msg_features
 
 
 def rule_pending_bulk(state: ConversationState) -> bool:
@@ -16,7 +15,7 @@ def rule_pending_bulk(state: ConversationState) -> bool:
     # Defensive access to support state evolution (avoids AttributeError if field is missing).
     if getattr(state, "pending_bulk_op", None) and state.candidate_products:
         # Detect a standalone numeric quantity (1-3 digits) in the user message.
-        if re.search(r"\b(\d{1,3})\b", state.user_message or ""):
+        if msg_features(state).raw_has_short_number:
             state.next_node = "bulk_cart_update"
             return True
 
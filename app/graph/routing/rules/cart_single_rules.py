@@ -1,19 +1,40 @@
 from __future__ import annotations
 
-import re
-
 from app.engine.state import ConversationState
 from app.tools import tool_get_product
 from app.ux import t
 from app.utils import parse_cart_commands, parse_adjustment, parse_qty_only
-from .common_rules import msg_l
+from app.utils.message_features import keyword_set
+from .common_rules import msg_features
 
 
 # Verbs commonly used to express item removal from the cart (ES/EN).
-_REMOVE_VERBS = [
-    "quitame", "quítame", "quita",
-    "remove", "delete", "saca", "borra", "elimina",
-]
+_REMOVE_VERBS = keyword_set(
+    "remove_verbs",
+    [
+        "quitame", "quítame", "quita",
+        "remove", "delete", "saca", "borra", "elimina",
+    ],
+)
+
+# Remove-like verbs accepted together with a previously selected product.
+_REMOVE_SELECTED_VERBS = keyword_set(
+    "remove_selected_verbs",
+    ["quitame", "quítame", "quita", "remove", "delete", "saca", "borra"],
+)
+
+_ADD_VERBS = keyword_set(
+    "implicit_add_verbs",
+    ["añade", "anade", "añadir", "agrega", "mete", "pon", "add", "put", "take"],
+)
+
+_VIEW_CART_KEYWORDS = keyword_set(
+    "view_cart",
+    [
+        "carrito", "ver carrito", "muéstrame el carrito", "muestrame el carrito",
+        "cart", "show cart", "show me the cart", "view cart", "que llevo en el carrito",
+    ],
+)
 
 
 def rule_adjust_qty(state: ConversationState) -> bool:
@@ -36,7 +57,7 @@ def rule_single_cart_command(state: ConversationState) -> bool:
     an explicit product id reference, the flow is routed to a disambiguation step.
     """
     msg = state.user_message or ""
-    text = msg_l(state)
+    f = msg_features(state)
 
     actions = parse_cart_commands(msg)
 
@@ -48,7 +69,7 @@ def rule_single_cart_command(state: ConversationState) -> bool:
             cart_ids = [x.product_id for x in state.cart]
 
             # "Explicit" means the message contains one of the cart product ids as a whole word.
-            mentions_any_cart_id = any(re.search(rf"\b{pid}\b", text) for pid in cart_ids)
+            mentions_any_cart_id = any(f.mentions_number(pid) for pid in cart_ids)
 
             if not mentions_any_cart_id:
                 state.candidate_products = list(dict.fromkeys(cart_ids))
@@ -65,12 +86,8 @@ def rule_single_cart_command(state: ConversationState) -> bool:
 
     # If a product was previously selected and the user issues a remove-like command with a quantity.
     if state.selected_product_id is not None:
-        m = re.search(r"\b(\d+)\b", text)
-        if m and any(
-            k in text
-            for k in ["quitame", "quítame", "quita", "remove", "delete", "saca", "borra"]
-        ):
-            qty = int(m.group(1))
+        qty = f.first_number
+        if qty is not None and f.has(_REMOVE_SELECTED_VERBS):
 
             if len(state.cart) == 1:
                 state.pending_qty = qty
@@ -111,27 +128,23 @@ def rule_remove_qty_only_needs_disambiguation(state: ConversationState) -> bool:
     if state.pending_product_op and state.candidate_products:
         return False
 
-    text = msg_l(state)
-    if not text:
+    f = msg_features(state)
+    if not f.text:
         return False
 
     # Must resemble a remove intent.
-    if not any(v in text for v in _REMOVE_VERBS):
+    if not f.has(_REMOVE_VERBS):
         return False
 
     # Heuristic: accept 1-2 digit quantities but avoid 3-digit product IDs.
-    has_qty = re.search(r"\b\d{1,2}\b", text) is not None
-    has_product_id = re.search(r"\b\d{3}\b", text) is not None
-    if not has_qty or has_product_id:
+    qty = f.first_small_number
+    if qty is None or f.has_product_id:
         return False
 
     cart_ids = list(dict.fromkeys([x.product_id for x in state.cart]))
     if len(cart_ids) <= 1:
         return False
 
-    m = re.search(r"\b(\d{1,2})\b", text)
-    qty = int(m.group(1)) if m else 1
-
     # Persist disambiguation context for the next user reply.
     state.candidate_products = cart_ids
     state.pending_product_op = "remove"
@@ -158,12 +171,11 @@ def rule_implicit_cart_op(state: ConversationState) -> bool:
 
     Example: "añade 2" when the product context is already known.
     """
-    text = msg_l(state)
-    if not text:
+    f = msg_features(state)
+    if not f.text:
         return False
 
-    add_verbs = ["añade", "anade", "añadir", "agrega", "mete", "pon", "add", "put", "take"]
-    if not any(v in text for v in add_verbs):
+    if not f.has(_ADD_VERBS):
         return False
 
     qty = parse_qty_only(state.user_message) or 1
@@ -186,14 +198,7 @@ def rule_view_cart(state: ConversationState) -> bool:
     """
     Route to the cart view when the user asks to see the current cart contents.
     """
-    text = msg_l(state)
-    if any(
-        k in text
-        for k in [
-            "carrito", "ver carrito", "muéstrame el carrito", "muestrame el carrito",
-            "cart", "show cart", "show me the cart", "view cart", "que llevo en el carrito",
-        ]
-    ):
+    if msg_features(state).has(_VIEW_CART_KEYWORDS):
         state.next_node = "view_cart"
         return True
     return False
@@ -1,7 +1,22 @@
 from __future__ import annotations
 
 from app.engine.state import ConversationState
-from .common_rules import msg_l
+from app.utils.message_features import keyword_set
+from .common_rules import msg_features
+
+
+_CATALOG_KEYWORDS = keyword_set(
+    "show_catalog",
+    [
+        # ES
+        "catálogo", "catalogo", "ver el catálogo", "ver el catalogo", "el catálogo", "el catalogo",
+        "que perfumes tienes", "que tienes para mostrarme", "que vendes", "que productos tienes",
+        # EN
+        "catalog", "catalogue", "the catalog", "show the catalog", "show me the catalog",
+        "what perfumes do you have", "what do you have", "what do you sell",
+        "list perfumes", "show me what you have",
+    ],
+)
 
 
 def rule_show_catalog(state: ConversationState) -> bool:
@@ -11,20 +26,7 @@ def rule_show_catalog(state: ConversationState) -> bool:
     This rule uses a deterministic keyword match (ES/EN) to keep routing fast,
     predictable, and independent from the LLM.
     """
-    text = msg_l(state)
-
-    if any(
-        k in text
-        for k in [
-            # ES
-            "catálogo", "catalogo", "ver el catálogo", "ver el catalogo", "el catálogo", "el catalogo",
-            "que perfumes tienes", "que tienes para mostrarme", "que vendes", "que productos tienes",
-            # EN
-            "catalog", "catalogue", "the catalog", "show the catalog", "show me the catalog",
-            "what perfumes do you have", "what do you have", "what do you sell",
-            "list perfumes", "show me what you have",
-        ]
-    ):
+    if msg_features(state).has(_CATALOG_KEYWORDS):
         state.next_node = "show_catalog"
         return True
 
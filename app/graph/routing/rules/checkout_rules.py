@@ -4,7 +4,21 @@ import re
 
 from app.engine.state import ConversationState, Mode
 from app.ux import t
-from .common_rules import CHECKOUT_RE, msg_l
+from .common_rules import CHECKOUT_RE, msg_features
+
+
+# Common exit keywords in ES/EN (whole words), combined into a single regex.
+_EXIT_RE = re.compile(
+    r"\b(?:"
+    + "|".join(
+        re.escape(k)
+        for k in [
+            "salir", "terminar", "finalizar", "cerrar", "fin",
+            "exit", "end", "quit", "bye", "adiós", "adios",
+        ]
+    )
+    + r")\b"
+)
 
 
 def rule_exit(state: ConversationState) -> bool:
@@ -14,19 +28,13 @@ def rule_exit(state: ConversationState) -> bool:
     Note: checkout phrases (e.g., "finalizar compra") are explicitly excluded
     to avoid treating transactional intents as a session exit.
     """
-    text = msg_l(state)
+    f = msg_features(state)
 
     # If the message looks like a checkout intent, it is not treated as an exit.
-    if CHECKOUT_RE.search(text):
+    if f.search(CHECKOUT_RE):
         return False
 
-    # Common exit keywords in ES/EN.
-    EXIT_KEYWORDS = {
-        "salir", "terminar", "finalizar", "cerrar", "fin",
-        "exit", "end", "quit", "bye", "adiós", "adios",
-    }
-
-    if any(re.search(rf"\b{k}\b", text) for k in EXIT_KEYWORDS):
+    if f.search(_EXIT_RE):
         state.mode = Mode.END
         state.should_end = True
         state.assistant_message = t(state, "ended")
@@ -64,8 +72,8 @@ def rule_checkout(state: ConversationState) -> bool:
     """
     Detect checkout intent and route the user to the checkout confirmation step.
     """
-    msg = (state.user_message or "").strip().lower()
-    if msg and CHECKOUT_RE.search(msg):
+    f = msg_features(state)
+    if f.text and f.search(CHECKOUT_RE):
         state.next_node = "checkout_confirm"
         return True
     return False
@@ -3,6 +3,8 @@ from __future__ import annotations
 import re
 
 from app.engine.state import ConversationState
+from app.utils.message_features import MessageFeatures, analyze_message, keyword_set
+from app.utils.turn_context import turn_cached
 
 
 # Strong checkout intent detector (ES/EN).
@@ -17,9 +19,45 @@ CHECKOUT_RE = re.compile(
 )
 
 
+# Language keyword groups (substring match on the lowercased message).
+_SWITCH_TO_ES = keyword_set("lang_switch_es", ["en español", "en espanol", "habla español", "habla espanol"])
+_SWITCH_TO_EN = keyword_set("lang_switch_en", ["in english", "speak english", "english please"])
+_EN_HINTS = keyword_set(
+    "lang_hints_en",
+    [
+        "show", "tell me", "details", "add", "remove", "delete", "cart",
+        "pay", "recommend", "under", "cheaper", "please", "in english",
+        "make it", "set it", "change it", "only", "just", "instead",
+        "yes", "help",
+    ],
+)
+# Common Spanish punctuation/diacritics.
+_ES_CHARS = keyword_set("lang_chars_es", ["¿", "¡", "ñ", "á", "é", "í", "ó", "ú"])
+_ES_HINTS = keyword_set(
+    "lang_hints_es",
+    [
+        "añade","anade","añadir","quita","quitar","carrito",
+        "muestrame","muéstrame","ensename","enseñame","enséñame",
+        "recomendar","recomendarme","recomiendame","recomiéndame",
+        "precio","catalogo","catálogo","menos de","euros","hombre","mujer",
+        "quiero","puedes","me puedes","amaderado","amaderados","maderoso","maderosos",
+        "cítrico","citrico","cítricos","citricos","floral","florales",
+        "oriental","orientales","ámbar","ambar","acuático","acuatico","acuáticos","acuaticos",
+        "marino","marinos","aromático","aromatico","aromáticos","aromaticos",
+        "dulce","dulces","gourmand","afrutado","afrutados","frutal","frutales",
+        "cuero","mejor","solo","que sea","que sean","cámbialo","cambialo","en vez de",
+    ],
+)
+
+
+def msg_features(state: ConversationState) -> MessageFeatures:
+    """Pre-analyzed user message (computed once per distinct message, see `analyze_message`)."""
+    return analyze_message(state.user_message or "")
+
+
 def msg_l(state: ConversationState) -> str:
     """Lowercased and trimmed user message convenience helper."""
-    return (state.user_message or "").strip().lower()
+    return msg_features(state).text
 
 
 def explicit_language_switch(text: str) -> bool:
@@ -29,21 +67,11 @@ def explicit_language_switch(text: str) -> bool:
     This is handled deterministically to avoid any ambiguity before routing
     the turn through the graph/LLM.
     """
-    tt = (text or "").lower()
-    return any(
-        k in tt
-        for k in [
-            "en español",
-            "en espanol",
-            "habla español",
-            "habla espanol",
-            "in english",
-            "speak english",
-            "english please",
-        ]
-    )
+    f = analyze_message(text or "")
+    return f.has(_SWITCH_TO_ES) or f.has(_SWITCH_TO_EN)
 
 
+@turn_cached("detect_language_heuristic")
 def detect_language_heuristic(text: str) -> str | None:
     """
     Best-effort language detection heuristic (ES/EN).
@@ -51,43 +79,17 @@ def detect_language_heuristic(text: str) -> str | None:
     Used when the user did not explicitly request a language switch. This keeps
     routing fast and avoids spending an LLM call on language detection alone.
     """
-    tt = (text or "").lower()
+    f = analyze_message(text or "")
 
-    if any(k in tt for k in ["en español", "en espanol", "habla español", "habla espanol"]):
+    if f.has(_SWITCH_TO_ES):
         return "es"
-    if any(k in tt for k in ["in english", "speak english", "english please"]):
+    if f.has(_SWITCH_TO_EN):
         return "en"
-
-    if any(
-        k in tt
-        for k in [
-            "show", "tell me", "details", "add", "remove", "delete", "cart",
-            "pay", "recommend", "under", "cheaper", "please", "in english",
-            "make it", "set it", "change it", "only", "just", "instead",
-            "yes", "help",
-        ]
-    ):
+    if f.has(_EN_HINTS):
         return "en"
-
-    # Common Spanish punctuation/diacritics.
-    if any(ch in tt for ch in ["¿", "¡", "ñ", "á", "é", "í", "ó", "ú"]):
+    if f.has(_ES_CHARS):
         return "es"
-
-    if any(
-        k in tt
-        for k in [
-            "añade","anade","añadir","quita","quitar","carrito",
-            "muestrame","muéstrame","ensename","enseñame","enséñame",
-            "recomendar","recomendarme","recomiendame","recomiéndame",
-            "precio","catalogo","catálogo","menos de","euros","hombre","mujer",
-            "quiero","puedes","me puedes","amaderado","amaderados","maderoso","maderosos",
-            "cítrico","citrico","cítricos","citricos","floral","florales",
-            "oriental","orientales","ámbar","ambar","acuático","acuatico","acuáticos","acuaticos",
-            "marino","marinos","aromático","aromatico","aromáticos","aromaticos",
-            "dulce","dulces","gourmand","afrutado","afrutados","frutal","frutales",
-            "cuero","mejor","solo","que sea","que sean","cámbialo","cambialo","en vez de",
-        ]
-    ):
+    if f.has(_ES_HINTS):
         return "es"
 
     return None
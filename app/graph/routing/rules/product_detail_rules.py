@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-import re
-
 from app.engine.state import ConversationState
+from app.utils.message_features import keyword_set
+from .common_rules import msg_features
+
+
+_SHOW_ME_KEYWORDS = keyword_set("show_me", ["muestrame", "muéstrame", "enseñame", "enséñame", "show me"])
 
 
 def rule_pending_product(state: ConversationState) -> bool:
@@ -14,7 +17,7 @@ def rule_pending_product(state: ConversationState) -> bool:
     message is treated as a selection signal (e.g., index or product id).
     """
     if state.pending_product_op and state.candidate_products:
-        if re.search(r"\b(\d{1,3})\b", state.user_message or ""):
+        if msg_features(state).raw_has_short_number:
             state.next_node = (
                 "adjust_cart_qty"
                 if state.pending_product_op == "set_qty"
@@ -35,10 +38,8 @@ def rule_product_detail_by_id(state: ConversationState) -> bool:
 
     Heuristic: product IDs are expected to be 3 digits (catalog convention).
     """
-    msg_l = (state.user_message or "").strip().lower()
-    if re.search(r"\b\d{3}\b", state.user_message or "") and any(
-        k in msg_l for k in ["muestrame", "muéstrame", "enseñame", "enséñame", "show me"]
-    ):
+    f = msg_features(state)
+    if f.raw_has_product_id and f.has(_SHOW_ME_KEYWORDS):
         state.next_node = "show_product_detail"
         return True
     return False
@@ -50,9 +51,9 @@ def rule_product_detail_by_name(state: ConversationState) -> bool:
 
     This allows name-based matching/lookup inside the product detail node.
     """
-    msg_l = (state.user_message or "").strip().lower()
-    if any(k in msg_l for k in ["muestrame", "muéstrame", "enseñame", "enséñame", "show me"]):
-        if not re.search(r"\b\d{3}\b", state.user_message or ""):
+    f = msg_features(state)
+    if f.has(_SHOW_ME_KEYWORDS):
+        if not f.raw_has_product_id:
             state.next_node = "show_product_detail"
             return True
     return False
@@ -5,7 +5,10 @@ import re
 from app.engine.state import ConversationState
 from app.utils import parse_recommend_slots
 from app.ux import t
-from .common_rules import msg_l, detect_language_heuristic
+from .common_rules import msg_features, detect_language_heuristic
+
+
+_RECOMMEND_TRIGGER_RE = re.compile(r"\b(recom|recommend)\w*\b")
 
 
 def _ask_recommend_clarification(state: ConversationState) -> None:
@@ -58,10 +61,8 @@ def apply_recommend_heuristic(state: ConversationState) -> bool:
     It parses structured recommendation slots, asks for clarification if needed,
     and routes to the recommendation node once sufficient constraints exist.
     """
-    text = msg_l(state)
-
     pending = bool(getattr(state, "pending_recommend_clarification", False))
-    is_trigger = bool(re.search(r"\b(recom|recommend)\w*\b", text))
+    is_trigger = bool(msg_features(state).search(_RECOMMEND_TRIGGER_RE))
 
     if not pending and not is_trigger:
         return False
@@ -23,3 +23,14 @@ def llm_min_confidence() -> float:
     except ValueError:
         # Defensive fallback to avoid breaking routing due to misconfiguration.
         return 0.6
+
+
+def router_cache_enabled() -> bool:
+    """
+    Check whether LLM router results may be served from the router cache.
+
+    Controlled via the `ROUTER_CACHE_ENABLED` environment variable. Opt-in
+    (default: false): serving cached results changes routing behaviour, since
+    identical messages in the same flow context no longer reach the model.
+    """
+    return os.getenv("ROUTER_CACHE_ENABLED", "false").lower() == "true"
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import re
-from typing import Any
+import threading
+import time
+from typing import Any, Optional
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 
 from app.engine.state import ConversationState
+from app.llm.router_cache import RouterCache, get_router_cache
 from app.llm.router_schema import RouterResult, Intent
+from app.utils.metrics import get_metrics
+from app.utils.text import fold_text, word_tokens
 
 
 def _build_system_prompt() -> str:
@@ -111,18 +118,21 @@ def _build_system_prompt() -> str:
     )
 
 
-def _build_user_context(state: ConversationState) -> str:
+# The prompt is static: build it once per process instead of once per turn.
+_SYSTEM_MESSAGE = {"role": "system", "content": _build_system_prompt()}
+
+
+def _flow_context(state: ConversationState) -> dict[str, Any]:
     """
-    Build a compact JSON context payload for the router.
+    Flow-critical context sent to the router (everything except the message).
 
-    The context is intentionally minimal to reduce token usage while still
-    providing the router with flow-critical information.
+    This is also what makes a cached router result reusable: two turns with the
+    same normalized message and the same flow context get the same answer.
     """
     shipping = getattr(state, "shipping", None)
 
-    payload = {
+    return {
         "mode": getattr(state.mode, "value", str(state.mode)),
-        "user_message": state.user_message,
         "selected_product_id": state.selected_product_id,
         "cart_size": len(state.cart),
         "shipping_full_name_present": bool(getattr(shipping, "full_name", None)),
@@ -132,9 +142,31 @@ def _build_user_context(state: ConversationState) -> str:
         "shipping_phone_present": bool(getattr(shipping, "phone", None)),
         "ui_show_checkout_form": bool(getattr(state, "ui_show_checkout_form", False)),
     }
+
+
+def _build_user_context(state: ConversationState) -> str:
+    """
+    Build a compact JSON context payload for the router.
+
+    The context is intentionally minimal to reduce token usage while still
+    providing the router with flow-critical information.
+    """
+    context = _flow_context(state)
+    payload = {"mode": context.pop("mode"), "user_message": state.user_message, **context}
     return json.dumps(payload, ensure_ascii=False)
 
 
+def _cache_key(state: ConversationState, model: str) -> str:
+    """
+    Router-cache key: model + normalized message + flow context (incl. mode).
+
+    Normalization folds case/diacritics and drops punctuation and extra spaces,
+    so "¿Qué perfumes tenéis?" and "que perfumes teneis" share an entry.
+    """
+    message = " ".join(word_tokens(fold_text(state.user_message)))
+    return json.dumps([model, message, _flow_context(state)], ensure_ascii=False, sort_keys=True)
+
+
 def _extract_json(text: str) -> dict[str, Any]:
     """
     Defensive JSON extraction from model output.
@@ -152,32 +184,215 @@ def _extract_json(text: str) -> dict[str, Any]:
     return json.loads(m.group(0))
 
 
+def _model() -> str:
+    """Model used for routing (part of the request and of the cache key)."""
+    return os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+
+
+def _cache_entry(state: ConversationState) -> tuple[Optional[RouterCache], str]:
+    """Return `(cache, key)`; cache is None when caching is disabled."""
+    cache = get_router_cache()
+    if cache is None:
+        return None, ""
+    return cache, _cache_key(state, _model())
+
+
+def _count_cache_hit(cached: Optional[RouterResult]) -> None:
+    """Report a router-cache hit to the metrics registry."""
+    if cached is None:
+        return
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.llm_cache_hit()
+
+
+def _cache_lookup(state: ConversationState) -> tuple[Optional[RouterCache], str, Optional[RouterResult]]:
+    """Return `(cache, key, cached_result)`; cache is None when caching is disabled."""
+    cache, key = _cache_entry(state)
+    if cache is None:
+        return None, "", None
+    cached = cache.get(key)
+    _count_cache_hit(cached)
+    return cache, key, cached
+
+
+async def _acache_lookup(state: ConversationState) -> tuple[Optional[RouterCache], str, Optional[RouterResult]]:
+    """
+    Async `_cache_lookup`: a SQLite-backed cache is read in a worker thread so a
+    disk read-through never blocks the event loop (memory-only lookups stay inline).
+    """
+    cache, key = _cache_entry(state)
+    if cache is None:
+        return None, "", None
+    cached = await asyncio.to_thread(cache.get, key) if cache.persistent else cache.get(key)
+    _count_cache_hit(cached)
+    return cache, key, cached
+
+
+def _record_call(
+    started: float,
+    resp: Any = None,
+    result: Optional[RouterResult] = None,
+    error: Optional[BaseException] = None,
+) -> None:
+    """Report one completed (or failed) round-trip to the metrics registry."""
+    metrics = get_metrics()
+    if metrics is None:
+        return
+    usage = getattr(resp, "usage", None)
+    metrics.observe_llm(
+        time.perf_counter() - started,
+        error=error,
+        prompt_tokens=getattr(usage, "prompt_tokens", None),
+        completion_tokens=getattr(usage, "completion_tokens", None),
+        confidence=result.confidence if result is not None else None,
+    )
+
+
+def _build_request(state: ConversationState) -> dict[str, Any]:
+    """
+    Keyword arguments for `chat.completions.create`, shared by the sync and async routers.
+    """
+    return {
+        "model": _model(),
+        "messages": [
+            _SYSTEM_MESSAGE,
+            {"role": "user", "content": state.user_message},
+            {"role": "user", "content": f"Context: {_build_user_context(state)}"},
+        ],
+        "response_format": {"type": "json_object"},
+    }
+
+
+def _parse_response(resp: Any) -> RouterResult:
+    """Validate the model output into a RouterResult."""
+    text = resp.choices[0].message.content or "{}"
+    data = _extract_json(text)
+    return RouterResult.model_validate(data)
+
+
+# ---------------------------------------------------------------------------
+# Pooled clients
+# ---------------------------------------------------------------------------
+# Clients are long-lived so consecutive turns reuse the same keep-alive
+# connections (no new pool / TLS handshake per turn). They are rebuilt when the
+# connection-relevant configuration (API key, base URL) changes. Replaced
+# clients are not closed explicitly because in-flight requests on other threads
+# may still use them; their pools are released when they are garbage collected.
+_client_lock = threading.Lock()
+_client: Optional[OpenAI] = None
+_client_config: Optional[tuple[str, Optional[str]]] = None
+_async_client: Optional[AsyncOpenAI] = None
+_async_client_config: Optional[tuple[str, Optional[str]]] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _connection_limits() -> httpx.Limits:
+    """
+    Connection pool limits (env-tunable).
+
+    Keep-alive expiry is longer than the SDK default (5s) so that connections
+    survive the think time between user turns.
+    """
+    return httpx.Limits(
+        max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "1000")),
+        max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", "100")),
+        keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60")),
+    )
+
+
+def _get_client(api_key: str) -> OpenAI:
+    """Return the shared sync client, rebuilding it if the configuration changed."""
+    global _client, _client_config
+    config = (api_key, os.getenv("OPENAI_BASE_URL"))
+    with _client_lock:
+        if _client is None or _client_config != config:
+            _client = OpenAI(
+                api_key=api_key,
+                base_url=config[1] or None,
+                http_client=DefaultHttpxClient(limits=_connection_limits()),
+            )
+            _client_config = config
+        return _client
+
+
+def _get_async_client(api_key: str) -> AsyncOpenAI:
+    """
+    Return the shared async client for the running event loop.
+
+    httpx async connections belong to the loop that opened them, so the client
+    is also rebuilt when called from a different loop.
+    """
+    global _async_client, _async_client_config, _async_client_loop
+    config = (api_key, os.getenv("OPENAI_BASE_URL"))
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        if _async_client is None or _async_client_config != config or _async_client_loop is not loop:
+            _async_client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=config[1] or None,
+                http_client=DefaultAsyncHttpxClient(limits=_connection_limits()),
+            )
+            _async_client_config = config
+            _async_client_loop = loop
+        return _async_client
+
+
 def interpret_with_openai(state: ConversationState) -> RouterResult:
     """
     Run intent routing and slot extraction via OpenAI.
 
     If OPENAI_API_KEY is not set, the router degrades gracefully to UNKNOWN.
+    Results are served from / stored in the router cache when it is enabled.
     """
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return RouterResult(intent=Intent.UNKNOWN, confidence=0.0)
 
-    model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
-    client = OpenAI(api_key=api_key)
+    cache, key, cached = _cache_lookup(state)
+    if cached is not None:
+        return cached
 
-    schema = RouterResult.model_json_schema()
-    schema["additionalProperties"] = False
+    started = time.perf_counter()
+    try:
+        resp = _get_client(api_key).chat.completions.create(**_build_request(state))
+        result = _parse_response(resp)
+    except Exception as exc:
+        _record_call(started, error=exc)
+        raise
+    _record_call(started, resp, result)
+    if cache is not None:
+        cache.put(key, result)
+    return result
 
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": _build_system_prompt()},
-            {"role": "user", "content": state.user_message},
-            {"role": "user", "content": f"Context: {_build_user_context(state)}"},
-        ],
-        response_format={"type": "json_object"},
-    )
 
-    text = resp.choices[0].message.content or "{}"
-    data = _extract_json(text)
-    return RouterResult.model_validate(data)
+async def ainterpret_with_openai(state: ConversationState) -> RouterResult:
+    """
+    Async variant of `interpret_with_openai`.
+
+    Awaiting the round-trip releases the event loop, so a single worker can keep
+    many LLM-routed turns in flight instead of parking one thread per request.
+    With SQLite persistence the router-cache get/put also run off the loop.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return RouterResult(intent=Intent.UNKNOWN, confidence=0.0)
+
+    cache, key, cached = await _acache_lookup(state)
+    if cached is not None:
+        return cached
+
+    started = time.perf_counter()
+    try:
+        resp = await _get_async_client(api_key).chat.completions.create(**_build_request(state))
+        result = _parse_response(resp)
+    except Exception as exc:
+        _record_call(started, error=exc)
+        raise
+    _record_call(started, resp, result)
+    if cache is not None:
+        if cache.persistent:
+            await asyncio.to_thread(cache.put, key, result)
+        else:
+            cache.put(key, result)
+    return result
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.llm.config import router_cache_enabled
+from app.llm.router_schema import RouterResult
+
+
+"""
+Router-result cache (opt-in).
+
+Many users send near-identical messages that miss the deterministic rules
+("what perfumes do you have", "show catalog please"); each miss used to cost a
+full LLM round-trip. This cache stores the validated `RouterResult` for a
+(normalized message, flow context) key.
+
+Rationale:
+- The key is built by the router (`openai_router._cache_key`) and includes the
+  conversation mode and the rest of the flow context sent to the model, so a
+  result is never served across modes (or cart/checkout situations) it was not
+  produced for.
+- Eviction is LRU (`max_entries`) plus an absolute TTL per entry.
+- Optional persistence in a SQLite file: entries survive restarts and are
+  shared by the workers of one host. Memory is checked first; disk is read
+  through on a memory miss and written through on every put. Those calls block
+  on disk I/O, so the async router runs them in a worker thread (`persistent`).
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS router_cache (
+    cache_key  TEXT PRIMARY KEY,
+    result     TEXT NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+class RouterCache:
+    """
+    LRU + TTL cache of validated router results, with optional SQLite persistence.
+
+    Values are returned as deep copies: callers may mutate the result (e.g.
+    assign `family` lists into the conversation state) without touching the
+    cached entry.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl_seconds: float = 3600.0,
+        path: str | Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        # cache_key -> (result, expires_at)
+        self._entries: OrderedDict[str, tuple[RouterResult, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.execute(_SCHEMA)
+
+    @property
+    def persistent(self) -> bool:
+        """True when entries are backed by SQLite (`get`/`put` may block on disk I/O)."""
+        return self._conn is not None
+
+    def get(self, key: str) -> Optional[RouterResult]:
+        """Return a copy of the cached result for `key`, or None (counts a hit/miss)."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                entry = None
+
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT result, expires_at FROM router_cache WHERE cache_key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+                if row is not None:
+                    entry = (RouterResult.model_validate_json(row[0]), row[1])
+                    self._remember(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0].model_copy(deep=True)
+
+    def put(self, key: str, result: RouterResult) -> None:
+        """Store a validated router result under `key`."""
+        entry = (result.model_copy(deep=True), self._clock() + self._ttl)
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO router_cache (cache_key, result, expires_at) VALUES (?, ?, ?)",
+                    (key, entry[0].model_dump_json(), entry[1]),
+                )
+
+    def clear(self) -> None:
+        """Drop every entry (memory and disk) and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM router_cache")
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss counters and current in-memory size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def _remember(self, key: str, entry: tuple[RouterResult, float]) -> None:
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+@lru_cache(maxsize=1)
+def get_router_cache() -> Optional[RouterCache]:
+    """
+    Process-wide router cache configured from the environment (None if disabled).
+
+    - ROUTER_CACHE_ENABLED (default false)
+    - ROUTER_CACHE_SIZE (default 4096 entries)
+    - ROUTER_CACHE_TTL_SECONDS (default 3600)
+    - ROUTER_CACHE_PATH (optional SQLite file for persistence)
+    """
+    if not router_cache_enabled():
+        return None
+    return RouterCache(
+        max_entries=int(os.getenv("ROUTER_CACHE_SIZE", "4096")),
+        ttl_seconds=float(os.getenv("ROUTER_CACHE_TTL_SECONDS", "3600")),
+        path=os.getenv("ROUTER_CACHE_PATH") or None,
+    )
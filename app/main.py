@@ -1,10 +1,16 @@
+import os
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 from typing import Any, Literal
 from pathlib import Path
 from dotenv import load_dotenv
+from app.engine.memory import InMemorySessionStore, SessionStore
 from app.engine.service import ChatEngine
+from app.engine.sqlite_store import SqliteSessionStore
 from app.engine.state import Mode
+from app.services.catalog_service import get_catalog_manager
+from app.utils.metrics import CONTENT_TYPE, get_metrics
 
 
 # Load environment variables explicitly from .env located next to this file.
@@ -14,9 +20,38 @@ load_dotenv(ENV_PATH, override=True)
 
 app = FastAPI(title="E-commerce Cart Chatbot", version="0.1.0")
 
+def _build_session_store() -> SessionStore:
+    """
+    Select the session backend from the environment.
+
+    - SESSION_STORE=memory (default): process-local, single worker only.
+      Idle sessions expire after SESSION_TTL_SECONDS and at most SESSION_MAX
+      sessions are kept (least recently used are evicted first).
+    - SESSION_STORE=sqlite: SQLite file at SESSION_DB_PATH, shared by all
+      workers running on the same host.
+    """
+    backend = os.getenv("SESSION_STORE", "memory").strip().lower()
+    if backend == "sqlite":
+        return SqliteSessionStore(os.getenv("SESSION_DB_PATH", "sessions.db"))
+    return InMemorySessionStore(
+        ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", "1800")),
+        max_sessions=int(os.getenv("SESSION_MAX", "10000")),
+    )
+
 # ChatEngine is instantiated once and reused across requests.
-# Session state is managed internally by the engine.
-engine = ChatEngine()
+# Session state is kept in the configured store. TURN_EXECUTOR=direct runs the
+# graph nodes through the direct-dispatch executor instead of LangGraph.
+engine = ChatEngine(
+    store=_build_session_store(),
+    executor="direct" if os.getenv("TURN_EXECUTOR", "graph").strip().lower() == "direct" else "graph",
+)
+
+# Catalog hot reload: with CATALOG_RELOAD_SECONDS > 0 a watcher thread polls the
+# catalog file and swaps in a new snapshot (catalog + indexes) when it changes.
+# The catalog is loaded here, at startup, rather than by the first request.
+catalog_manager = get_catalog_manager()
+catalog_manager.snapshot()
+catalog_manager.start()
 
 class StartRequest(BaseModel):
     session_id: str = Field(min_length=1)
@@ -42,18 +77,34 @@ class CheckoutFormRequest(BaseModel):
     phone: str
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health():
+    return {"status": "ok", "catalog": catalog_manager.status()}
+
+# Session store gauge (live sessions, evictions, process RSS).
+@app.get("/stats/sessions")
+async def session_stats():
+    stats = getattr(engine._store, "stats", None)
+    return stats() if callable(stats) else {}
+
+# Prometheus scrape endpoint: per-rule/per-node/LLM histograms of this worker.
+# Empty unless instrumentation is enabled (METRICS_ENABLED=true).
+@app.get("/metrics")
+async def metrics():
+    registry = get_metrics()
+    body = registry.render() if registry is not None else ""
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
 
 # Main chat endpoint.
 # Handles conversational turns and returns both assistant reply and UI state
 # required by the frontend (products, cart, checkout flags, etc.).
+# Endpoints are async: turns that reach the LLM router await it on the event
+# loop instead of holding a threadpool worker for the whole round-trip.
 @app.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
 
     # If the conversation has already reached an end state,
     # return the last assistant message without processing a new turn.
-    state = engine._store.get(req.session_id)
+    state = await engine.aget_session(req.session_id)
     if state and (state.should_end or state.mode == Mode.END):
         return ChatResponse(
             reply=state.assistant_message,
@@ -63,7 +114,7 @@ def chat(req: ChatRequest):
                 "form_error": None,
             },
         )
-    state = engine.process_turn(session_id=req.session_id, user_message=req.message)
+    state = await engine.aprocess_turn(session_id=req.session_id, user_message=req.message)
 
     # Build UI payload expected by the frontend.
     # This includes conversational state, cart information and
@@ -84,8 +135,8 @@ def chat(req: ChatRequest):
 # Initializes a new chat session.
 # Optionally sets the language for the assistant on first interaction.
 @app.post("/start", response_model=ChatResponse)
-def start(req: StartRequest):
-    state = engine.start_session(session_id=req.session_id, language=req.language)
+async def start(req: StartRequest):
+    state = await engine.astart_session(session_id=req.session_id, language=req.language)
 
     ui_payload = {
         "products": [p.model_dump() for p in (state.ui_products or [])],
@@ -102,15 +153,15 @@ def start(req: StartRequest):
 
 # Resets the session state, clearing any stored conversation or cart data.
 @app.post("/reset")
-def reset(req: ResetRequest):
-    engine.reset(req.session_id)
+async def reset(req: ResetRequest):
+    await engine.areset(req.session_id)
     return {"status": "ok", "session_id": req.session_id}
 
 # Receives and processes checkout form data.
 # Validation is handled at the API layer via Pydantic models.
 @app.post("/checkout/submit", response_model=ChatResponse)
-def checkout_submit(req: CheckoutFormRequest):
-    state = engine.submit_checkout_form(
+async def checkout_submit(req: CheckoutFormRequest):
+    state = await engine.asubmit_checkout_form(
         session_id=req.session_id,
         full_name=req.full_name,
         address_line1=req.address_line1,
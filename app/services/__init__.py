@@ -1,5 +1,13 @@
-from .catalog_service import get_catalog, get_product_by_id
-from .cart_service import calculate_cart_total
+from .catalog_service import (
+    get_catalog,
+    get_catalog_index,
+    get_catalog_manager,
+    get_catalog_snapshot,
+    get_product_by_id,
+    get_recommend_index,
+    get_search_index,
+)
+from .cart_service import CartActionResult, apply_cart_actions, calculate_cart_total, get_cart
 from .recommend_service import recommend_products
 
 """
@@ -11,7 +19,15 @@ and graph nodes, acting as a façade over the internal service implementations.
 
 __all__ = [
     "get_catalog",
+    "get_catalog_index",
+    "get_catalog_manager",
+    "get_catalog_snapshot",
     "get_product_by_id",
+    "get_search_index",
+    "get_recommend_index",
     "calculate_cart_total",
+    "apply_cart_actions",
+    "CartActionResult",
+    "get_cart",
     "recommend_products",
 ]
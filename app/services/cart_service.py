@@ -1,22 +1,205 @@
 from __future__ import annotations
 
-from app.engine.state import ConversationState
-from app.services.catalog_service import get_product_by_id
+from dataclasses import dataclass, replace
+from typing import Literal, Optional
+
+from app.domain.product import Product
+from app.engine.state import Cart, ConversationState
+from app.llm.router_schema import CartAction, CartOp
+from app.services.catalog_service import get_catalog_index
+from app.services.inventory import get_inventory
+
+
+CartActionStatus = Literal["added", "removed", "not_found", "no_stock", "not_in_cart", "cannot_remove"]
+
+
+@dataclass(frozen=True)
+class CartActionResult:
+    """
+    Outcome of one action in `apply_cart_actions`.
+
+    `qty` is the quantity actually added/removed (0 for rejected actions) and
+    `current_qty` the quantity in the cart when the action was evaluated.
+    `product` is None only for `not_found`.
+    """
+    action: CartAction
+    status: CartActionStatus
+    qty: int = 0
+    current_qty: int = 0
+    product: Optional[Product] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("added", "removed")
+
+
+def get_cart(state: ConversationState) -> Cart:
+    """
+    Return `state.cart` as a `Cart`, converting a plain list assigned to it.
+
+    The state model does not validate assignments, so `state.cart = [...]` leaves a
+    plain list behind; tools go through this helper before using the cart index.
+    """
+    cart = state.cart
+    if not isinstance(cart, Cart):
+        cart = state.cart = Cart(cart)
+    return cart
+
+
+def stock_limit(state: ConversationState, product: Product) -> int:
+    """
+    Largest quantity of `product` this session's cart may hold right now.
+
+    `Product.stock` without an inventory ledger; with one, the units not held by
+    other sessions (see `app.services.inventory`).
+    """
+    ledger = get_inventory()
+    return product.stock if ledger is None else ledger.limit(state.session_id, product.id)
+
+
+def reserve_stock(state: ConversationState, product: Product, qty: int) -> int:
+    """
+    Back a cart quantity of `qty` units of `product`; return the quantity the line gets.
+
+    Without a ledger this only clamps to `Product.stock`. With one, it sets the
+    session's hold to what can be granted. Either way reductions are always
+    granted: the line never ends below `min(qty, current line qty)`, even if its
+    hold expired and the units went to another session (the ledger then holds
+    what it can and `checkout_cart` re-acquires the rest). Call it before
+    writing the line.
+    """
+    qty = max(qty, 0)
+    line = get_cart(state).line(product.id)
+    kept = min(qty, line.qty) if line else 0
+    ledger = get_inventory()
+    if ledger is None:
+        return max(kept, min(qty, product.stock))
+    return max(kept, ledger.hold(state.session_id, product.id, qty))
+
+
+def checkout_cart(state: ConversationState) -> list[tuple[Product, int, int]]:
+    """
+    Complete the order: held units become sales and the cart is emptied.
+
+    With an inventory ledger every line is held again first, since a hold may
+    have expired and its units gone to another session. If any line cannot be
+    fully held, no order is placed and the cart is left as it is; the short
+    lines are returned as `(product, qty in cart, units available)`. Returns an
+    empty list once the order is completed.
+    """
+    ledger = get_inventory()
+    if ledger is not None:
+        index = get_catalog_index()
+        short: list[tuple[Product, int, int]] = []
+        for item in get_cart(state):
+            product = index.get(item.product_id)
+            if product is None:
+                continue
+            granted = ledger.hold(state.session_id, product.id, item.qty)
+            if granted < item.qty:
+                short.append((product, item.qty, granted))
+        if short:
+            return short
+        ledger.commit(state.session_id)
+    state.cart = Cart()
+    return []
 
 
 def calculate_cart_total(state: ConversationState) -> float:
     """
     Calculate the total price of the current cart.
 
-    The total is computed dynamically from product prices in the catalog
-    to avoid trusting potentially stale client-side data.
+    The total is computed from product prices in the catalog to avoid trusting
+    potentially stale client-side data. It is maintained incrementally by the cart
+    and recomputed only when the catalog has been reloaded since it was priced.
+    Products missing from the catalog are skipped defensively, so a catalog change
+    does not break the flow.
+    """
+    index = get_catalog_index()
+    return get_cart(state).total(index.price_of, index.version)
+
+
+def apply_cart_actions(state: ConversationState, actions: list[CartAction]) -> list[CartActionResult]:
     """
-    total = 0.0
-    for item in state.cart:
-        p = get_product_by_id(item.product_id)
-        if not p:
-            # Skip missing products defensively to avoid breaking the flow
-            # if the catalog changes or data becomes inconsistent.
+    Apply a batch of cart actions as one transaction and report each action's outcome.
+
+    Semantics (per action, in order, as in the bulk cart flow):
+    - Unknown product: `not_found`.
+    - ADD: adds up to the remaining stock (`stock_limit`); `no_stock` if nothing can be added.
+    - REMOVE: `not_in_cart` if the product is not in the cart, `cannot_remove` if
+      more units are requested than are in the cart (nothing is removed).
+
+    Rationale:
+    - Actions are evaluated against a projected quantity per product, so the
+      product is looked up and its stock checked once, and the cart is not
+      rescanned per action.
+    - Actions are netted per product (e.g. add 3, remove 1 -> +2): the cart is
+      written once per touched product, after every action has been evaluated,
+      so a failure part-way leaves the cart untouched.
+
+    Notes:
+    - New products are appended in the order of their first successful change;
+      a product removed and re-added within the batch keeps its cart position.
+    - Runs in O(len(cart) + len(actions)).
+    """
+    cart = get_cart(state)
+    products: dict[int, Optional[Product]] = {}
+    limits: dict[int, int] = {}
+    projected: dict[int, int] = {}
+    touched: dict[int, None] = {}
+    report: list[CartActionResult] = []
+
+    for a in actions:
+        product_id = a.product_id
+        if product_id not in products:
+            product = products[product_id] = get_catalog_index().get(product_id)
+            line = cart.line(product_id)
+            projected[product_id] = line.qty if line else 0
+            if product is not None:
+                limits[product_id] = stock_limit(state, product)
+
+        product = products[product_id]
+        current = projected[product_id]
+        if product is None:
+            report.append(CartActionResult(a, "not_found"))
             continue
-        total += p.price * item.qty
-    return total
+
+        if a.op == CartOp.ADD:
+            added = min(a.qty, max(0, limits[product_id] - current))
+            if added <= 0:
+                report.append(CartActionResult(a, "no_stock", 0, current, product))
+                continue
+            projected[product_id] = current + added
+            report.append(CartActionResult(a, "added", added, current, product))
+        else:
+            if current <= 0:
+                report.append(CartActionResult(a, "not_in_cart", 0, current, product))
+                continue
+            if a.qty > current:
+                report.append(CartActionResult(a, "cannot_remove", 0, current, product))
+                continue
+            projected[product_id] = current - a.qty
+            report.append(CartActionResult(a, "removed", a.qty, current, product))
+        touched[product_id] = None
+
+    # With an inventory ledger another session may have taken units since the limit
+    # was read: the cart then keeps what could actually be reserved, and the report
+    # says so.
+    final = {pid: reserve_stock(state, products[pid], projected[pid]) for pid in touched}
+    for pid, qty in final.items():
+        if qty < projected[pid]:
+            _trim_added(report, pid, projected[pid] - qty)
+    cart.set_many((pid, qty, products[pid].price) for pid, qty in final.items())
+    return report
+
+
+def _trim_added(report: list[CartActionResult], product_id: int, short: int) -> None:
+    """Take `short` units that could not be reserved off the last `added` results of a product."""
+    for i in range(len(report) - 1, -1, -1):
+        if short <= 0:
+            return
+        r = report[i]
+        if r.status == "added" and r.action.product_id == product_id:
+            cut = min(short, r.qty)
+            short -= cut
+            report[i] = replace(r, status="added" if cut < r.qty else "no_stock", qty=r.qty - cut)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from itertools import count
+from typing import Iterable, Optional
+
+from app.domain.product import Product
+
+
+# Every index gets a new version, so derived caches (e.g. cart totals) can tell
+# that the catalog they were computed from has been replaced.
+_VERSIONS = count(1)
+
+
+def _key(value: str | None) -> str:
+    """Normalize a facet value (brand/family/audience) for case-insensitive lookups."""
+    return (value or "").strip().lower()
+
+
+class CatalogIndex:
+    """
+    In-memory lookup structures over a loaded catalog.
+
+    The index is built once per loaded catalog and is read-only afterwards, so it
+    can be shared across requests without locking.
+
+    Rationale:
+    - Nodes and services resolve products by id many times per turn (cart totals,
+      candidate lists, bulk updates); a dict lookup keeps that cost independent
+      of the catalog size.
+    - Secondary indexes (brand, family, audience, price) avoid full scans for the
+      common filtering paths.
+
+    Notes:
+    - Facet keys are normalized with `strip().lower()`; products without a value
+      are indexed under the empty string.
+    - Every list preserves catalog order (price ties keep catalog order as well),
+      so results are identical to a linear scan over `products`.
+    - `version` is unique per index instance and changes whenever the catalog is
+      reloaded.
+    """
+
+    __slots__ = ("products", "version", "_by_id", "_by_brand", "_by_family", "_by_audience", "_by_price", "_prices")
+
+    def __init__(self, products: Iterable[Product]) -> None:
+        self.products: list[Product] = list(products)
+        self.version: int = next(_VERSIONS)
+
+        self._by_id: dict[int, Product] = {}
+        self._by_brand: dict[str, list[Product]] = {}
+        self._by_family: dict[str, list[Product]] = {}
+        self._by_audience: dict[str, list[Product]] = {}
+
+        for p in self.products:
+            # First occurrence wins, mirroring the previous `next(...)` scan.
+            self._by_id.setdefault(p.id, p)
+            self._by_brand.setdefault(_key(p.brand), []).append(p)
+            self._by_family.setdefault(_key(p.family), []).append(p)
+            self._by_audience.setdefault(_key(p.audience), []).append(p)
+
+        # `sorted` is stable, so equal prices keep catalog order.
+        self._by_price: list[Product] = sorted(self.products, key=lambda p: p.price)
+        self._prices: list[float] = [p.price for p in self._by_price]
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def get(self, product_id: int) -> Optional[Product]:
+        """Return the product with the given id, or None if it does not exist."""
+        return self._by_id.get(product_id)
+
+    def price_of(self, product_id: int) -> Optional[float]:
+        """Return the price of the given product, or None if it does not exist."""
+        p = self._by_id.get(product_id)
+        return p.price if p is not None else None
+
+    def by_brand(self, brand: str | None) -> list[Product]:
+        """Return products whose brand matches `brand` (case-insensitive)."""
+        return list(self._by_brand.get(_key(brand), ()))
+
+    def by_family(self, family: str | None) -> list[Product]:
+        """Return products in the given olfactory family (case-insensitive)."""
+        return list(self._by_family.get(_key(family), ()))
+
+    def by_audience(self, audience: str | None) -> list[Product]:
+        """Return products for the given audience (case-insensitive)."""
+        return list(self._by_audience.get(_key(audience), ()))
+
+    def in_price_range(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> list[Product]:
+        """
+        Return products with `min_price <= price <= max_price`, sorted by price.
+
+        Both bounds are optional and inclusive. The range is resolved with binary
+        search over the price-sorted array.
+        """
+        lo = 0 if min_price is None else bisect_left(self._prices, min_price)
+        hi = len(self._prices) if max_price is None else bisect_right(self._prices, max_price)
+        return self._by_price[lo:hi]
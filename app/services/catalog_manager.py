@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.data.catalog_loader import CATALOG_PATH, load_catalog, log_progress
+from app.domain.product import Product
+from app.services.catalog_index import CatalogIndex
+from app.services.recommend_index import RecommendIndex
+from app.services.search_index import ProductSearchIndex
+
+
+"""
+Catalog hot reload: versioned, immutable snapshots swapped atomically.
+
+A `CatalogSnapshot` bundles the validated products with every index built from
+them (lookup, name search, recommendation facets). `CatalogManager` owns the
+current snapshot and replaces it when the catalog file changes.
+
+Rationale:
+- Reloads happen off the request path: a watcher thread polls the file's
+  (mtime, size) every `poll_seconds`, loads and indexes the new catalog, and
+  only then publishes it with a single reference assignment. Requests never
+  wait for a rebuild; the swap itself is one attribute store.
+- Snapshots are never mutated after publication, so readers need no lock. A
+  turn pins the snapshot it first sees (see `catalog_service`), which keeps
+  its view consistent even if a swap lands mid-turn.
+- A catalog that fails to load or validate is not published: the previous
+  snapshot keeps serving and the error is reported by `status()`.
+- Every snapshot carries `CatalogIndex.version`, so caches keyed by it (cart
+  totals) are recomputed against the new prices.
+
+Notes:
+- Polling (no inotify dependency) works on every platform and filesystem,
+  including bind mounts and network volumes; replace the file atomically
+  (write + rename) so a poll never sees a half-written catalog.
+- An inventory ledger picks up stock edits on its next operation on the SKU:
+  the change in `Product.stock` is applied to its `on_hand` (units already
+  sold stay sold, see `app.services.inventory`).
+"""
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[Path], list[Product]]
+
+
+def _load_logged(path: Path) -> list[Product]:
+    """Default loader: streamed load that logs progress every 10% of the file."""
+    return load_catalog(path, progress=log_progress())
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """One loaded catalog with all of its indexes (read-only once published)."""
+    index: CatalogIndex
+    search: ProductSearchIndex
+    recommend: RecommendIndex
+    source_mtime_ns: int
+    loaded_at: float
+    build_seconds: float
+
+    @property
+    def version(self) -> int:
+        return self.index.version
+
+    @classmethod
+    def build(cls, products: list[Product], source_mtime_ns: int = 0) -> CatalogSnapshot:
+        """Build every index over `products`."""
+        started = time.perf_counter()
+        index = CatalogIndex(products)
+        search = ProductSearchIndex(index.products)
+        recommend = RecommendIndex(index.products)
+        return cls(
+            index=index,
+            search=search,
+            recommend=recommend,
+            source_mtime_ns=source_mtime_ns,
+            loaded_at=time.time(),
+            build_seconds=time.perf_counter() - started,
+        )
+
+
+class CatalogManager:
+    """
+    Holds the current `CatalogSnapshot` of a catalog file and reloads it on change.
+
+    The first `snapshot()` call loads the catalog synchronously (startup);
+    afterwards `reload()` (called by the watcher thread started with `start()`,
+    or directly) rebuilds it in the calling thread and swaps it in.
+    """
+
+    def __init__(
+        self,
+        path: Path = CATALOG_PATH,
+        poll_seconds: float = 0.0,
+        loader: Loader = _load_logged,
+    ) -> None:
+        self.path = Path(path)
+        self.poll_seconds = poll_seconds
+        self._loader = loader
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._signature: Optional[tuple[int, int]] = None
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Return the current snapshot (loading the catalog on first use)."""
+        snap = self._snapshot
+        if snap is None:
+            with self._build_lock:
+                if self._snapshot is None:
+                    self._load(self._stat())
+            snap = self._snapshot
+            assert snap is not None
+        return snap
+
+    def _stat(self) -> tuple[int, int]:
+        st = self.path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self, signature: tuple[int, int]) -> None:
+        # Called with `_build_lock` held. The signature is taken before reading,
+        # so a write racing with the load triggers another reload on next poll.
+        snap = CatalogSnapshot.build(self._loader(self.path), source_mtime_ns=signature[0])
+        self._signature = signature
+        self._snapshot = snap
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild and swap in the catalog if the file changed (or if `force`).
+
+        Returns True when a new snapshot was published. Load or validation
+        errors keep the current snapshot and are recorded in `last_error`.
+        """
+        with self._build_lock:
+            signature: Optional[tuple[int, int]] = None
+            try:
+                signature = self._stat()
+                if not force and self._snapshot is not None and signature == self._signature:
+                    return False
+                self._load(signature)
+            except Exception as exc:
+                # Remember the broken file so it is not retried (and logged) on every poll.
+                if signature is not None:
+                    self._signature = signature
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                logger.warning("Catalog reload failed; keeping version %s", self.version, exc_info=True)
+                return False
+            self.reloads += 1
+            self.last_error = None
+            return True
+
+    @property
+    def version(self) -> Optional[int]:
+        snap = self._snapshot
+        return snap.version if snap is not None else None
+
+    def start(self) -> None:
+        """Start the polling watcher thread (no-op if polling is disabled or running)."""
+        if self.poll_seconds <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the watcher thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            self.reload()
+
+    def status(self) -> dict[str, Any]:
+        """Version and reload information, as reported by `/health`."""
+        snap = self.snapshot()
+        return {
+            "version": snap.version,
+            "products": len(snap.index),
+            "loaded_at": snap.loaded_at,
+            "source_mtime_ns": snap.source_mtime_ns,
+            "build_seconds": round(snap.build_seconds, 6),
+            "reloads": self.reloads,
+            "watching": self._thread is not None and self._thread.is_alive(),
+            "last_error": self.last_error,
+        }
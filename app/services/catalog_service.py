@@ -1,21 +1,84 @@
 from __future__ import annotations
 
+import os
 from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
-from app.data.catalog_loader import load_catalog
+from app.data.catalog_loader import CATALOG_PATH
 from app.domain.product import Product
+from app.services.catalog_index import CatalogIndex
+from app.services.catalog_manager import CatalogManager, CatalogSnapshot
+from app.services.recommend_index import RecommendIndex
+from app.services.search_index import ProductSearchIndex
+from app.utils.turn_context import current_turn
+
+
+# Key of the snapshot pinned in the turn scratch context.
+_SNAPSHOT_KEY = ("catalog_snapshot",)
 
 
 @lru_cache(maxsize=1)
-def get_catalog() -> list[Product]:
+def get_catalog_manager() -> CatalogManager:
+    """
+    Process-wide catalog manager selected from the environment.
+
+    - `CATALOG_PATH`: catalog file (default `app/data/catalog.json`).
+    - `CATALOG_RELOAD_SECONDS`: polling interval of the hot-reload watcher;
+      0 (default) loads the catalog once, as a restart-only deployment would.
+    """
+    return CatalogManager(
+        path=Path(os.getenv("CATALOG_PATH") or CATALOG_PATH),
+        poll_seconds=float(os.getenv("CATALOG_RELOAD_SECONDS", "0")),
+    )
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """
+    Return the catalog snapshot of the current turn.
+
+    Within a turn (see `app.utils.turn_context`) the first snapshot seen is
+    pinned, so every lookup of the turn uses the same catalog version even if a
+    reload is swapped in meanwhile. Outside a turn the latest snapshot is used.
+    """
+    ctx = current_turn()
+    if ctx is None:
+        return get_catalog_manager().snapshot()
+    snap = ctx.cache.get(_SNAPSHOT_KEY)
+    if snap is None:
+        snap = ctx.cache[_SNAPSHOT_KEY] = get_catalog_manager().snapshot()
+    return snap
+
+
+def get_catalog_index() -> CatalogIndex:
     """
-    Load and cache the product catalog.
+    Return the lookup index of the current catalog snapshot.
 
-    The catalog is cached in memory to avoid repeated disk or I/O access
-    during a single application lifecycle.
+    The catalog is loaded and indexed once per catalog version (by the
+    `CatalogManager`), never per request.
+    """
+    return get_catalog_snapshot().index
+
+
+def get_search_index() -> ProductSearchIndex:
+    """
+    Return the name search index of the current catalog snapshot.
+    """
+    return get_catalog_snapshot().search
+
+
+def get_recommend_index() -> RecommendIndex:
+    """
+    Return the recommendation facet index of the current catalog snapshot.
+    """
+    return get_catalog_snapshot().recommend
+
+
+def get_catalog() -> list[Product]:
+    """
+    Return the current product catalog (in catalog order).
     """
-    return load_catalog()
+    return get_catalog_index().products
 
 
 def get_product_by_id(product_id: int) -> Optional[Product]:
@@ -24,5 +87,4 @@ def get_product_by_id(product_id: int) -> Optional[Product]:
 
     Returns None if the product does not exist in the current catalog.
     """
-    catalog = get_catalog()
-    return next((p for p in catalog if p.id == product_id), None)
+    return get_catalog_index().get(product_id)
@@ -0,0 +1,472 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional, Protocol
+
+from app.services.catalog_service import get_catalog_index, get_product_by_id
+
+
+"""
+Stock reservation ledger shared by every session of the process (or host).
+
+Without it, stock is the static `Product.stock` from the catalog and each cart
+is only clamped against that number, so any number of concurrent sessions can
+each put every unit of a product in their cart. With a ledger, a cart line is
+backed by a *hold* (a reservation of units for one session) and a product can
+only be held up to its units on hand.
+
+Per SKU the ledger keeps:
+- `on_hand`: units not sold yet (seeded from `Product.stock` on first use,
+  decreased when a checkout commits its holds),
+- `reserved`: units held by carts, i.e. the sum of live holds,
+- the `Product.stock` it last applied, so that a catalog reload changing a
+  SKU's stock moves `on_hand` by the same amount (never below `reserved`).
+A session may hold up to `on_hand - reserved + its own hold`.
+
+Rationale:
+- Holds have a TTL, refreshed whenever the session changes its cart or sends a
+  turn. Abandoned carts therefore give their units back once the session would
+  have expired anyway (use the session TTL), and checkout or session reset
+  releases them immediately.
+- `InMemoryInventoryLedger` serves one process: per-SKU counters guarded by a
+  fixed pool of striped locks, so operations on different products never
+  contend and memory does not grow with the number of locks.
+- `SqliteInventoryLedger` shares stock between the workers of one host (same
+  idea as `SqliteSessionStore`); each operation is one short write
+  transaction.
+
+Notes:
+- Disabled by default (`INVENTORY_LEDGER=off`): carts are then clamped against
+  `Product.stock` per session, exactly as before.
+- Expired holds are reclaimed lazily, when a request for a product cannot be
+  fully granted, and by `sweep()`.
+- The cart stays the source of truth for quantities: if a hold expires while
+  its session lives on (e.g. a store without TTL), the units are re-acquired,
+  subject to availability, the next time that cart line grows (a reduction is
+  always applied to the cart, whatever the ledger grants) and at checkout,
+  which fails if they cannot all be held again.
+"""
+
+StockOf = Callable[[int], Optional[int]]
+VersionOf = Callable[[], int]
+
+
+def _catalog_stock(product_id: int) -> Optional[int]:
+    product = get_product_by_id(product_id)
+    return product.stock if product is not None else None
+
+
+def _catalog_version() -> int:
+    return get_catalog_index().version
+
+
+class InventoryLedger(Protocol):
+    """Reservation contract used by the cart service (see module notes)."""
+
+    def hold(self, session_id: str, product_id: int, qty: int) -> int:
+        """
+        Set the session's hold on a product to `qty` units, as far as stock allows.
+
+        Returns the units now held (<= qty; reductions are always granted).
+        Unknown products are never held (returns 0).
+        """
+        ...
+
+    def limit(self, session_id: str, product_id: int) -> int:
+        """Largest hold the session could get on the product right now."""
+        ...
+
+    def touch(self, session_id: str) -> None:
+        """Extend the expiry of every live hold of the session."""
+        ...
+
+    def release(self, session_id: str) -> None:
+        """Drop every hold of the session (the units become available again)."""
+        ...
+
+    def commit(self, session_id: str) -> dict[int, int]:
+        """Turn the session's holds into sales (on-hand units decrease); return them."""
+        ...
+
+    def available(self, product_id: int) -> int:
+        """Units neither sold nor held by a live hold."""
+        ...
+
+
+# ---------------------------------------------------------------------------
+# In-process ledger
+# ---------------------------------------------------------------------------
+class _Sku:
+    __slots__ = ("on_hand", "reserved", "holds", "stock", "version")
+
+    def __init__(self, stock: int, version: int) -> None:
+        self.on_hand = stock
+        self.reserved = 0
+        # session_id -> [qty, expires_at]
+        self.holds: dict[str, list] = {}
+        # Catalog stock applied to `on_hand`, and the catalog version it came from.
+        self.stock = stock
+        self.version = version
+
+    def restock(self, stock: int, version: int) -> None:
+        """Apply a catalog stock change to `on_hand` (never below the units held)."""
+        self.on_hand = max(self.on_hand + stock - self.stock, self.reserved)
+        self.stock = stock
+        self.version = version
+
+    def purge(self, now: float) -> int:
+        expired = [sid for sid, (_, expires) in self.holds.items() if expires <= now]
+        for sid in expired:
+            self.reserved -= self.holds.pop(sid)[0]
+        return len(expired)
+
+
+class InMemoryInventoryLedger:
+    """
+    Process-local ledger: per-SKU counters under striped locks.
+
+    - A SKU maps onto one of `lock_stripes` locks (by product id); every
+      counter update of that SKU happens under its stripe, so grants are
+      atomic and stock can never be oversold.
+    - The session -> held products index (used by touch/release/commit) has its
+      own stripes, keyed by session id, and is never locked together with a SKU
+      stripe.
+    - `version_of` returns the current catalog version; a SKU re-reads its stock
+      only when that version is newer than the one it was last synced with.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 1800.0,
+        lock_stripes: int = 64,
+        stock_of: StockOf = _catalog_stock,
+        clock: Callable[[], float] = time.monotonic,
+        version_of: VersionOf = _catalog_version,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._stock_of = stock_of
+        self._clock = clock
+        self._version_of = version_of
+
+        self._skus: dict[int, _Sku] = {}
+        self._skus_lock = threading.Lock()
+        self._sku_locks = [threading.Lock() for _ in range(max(1, lock_stripes))]
+
+        self._sessions: dict[str, set[int]] = {}
+        self._session_locks = [threading.Lock() for _ in range(max(1, lock_stripes))]
+
+    def _sku_lock(self, product_id: int) -> threading.Lock:
+        return self._sku_locks[product_id % len(self._sku_locks)]
+
+    def _session_lock(self, session_id: str) -> threading.Lock:
+        return self._session_locks[hash(session_id) % len(self._session_locks)]
+
+    def _sku(self, product_id: int) -> Optional[_Sku]:
+        version = self._version_of()
+        sku = self._skus.get(product_id)
+        if sku is None:
+            stock = self._stock_of(product_id)
+            if stock is None:
+                return None
+            with self._skus_lock:
+                sku = self._skus.setdefault(product_id, _Sku(stock, version))
+        elif version > sku.version:
+            # Versions only grow, so a turn still pinned to an older catalog never rolls stock back.
+            stock = self._stock_of(product_id)
+            with self._sku_lock(product_id):
+                if version > sku.version:
+                    sku.restock(sku.stock if stock is None else stock, version)
+        return sku
+
+    def _own(self, sku: _Sku, session_id: str, now: float) -> int:
+        """Live hold of the session on `sku` (an expired one is dropped). Caller holds the stripe."""
+        h = sku.holds.get(session_id)
+        if h is None:
+            return 0
+        if h[1] <= now:
+            sku.reserved -= sku.holds.pop(session_id)[0]
+            return 0
+        return h[0]
+
+    def hold(self, session_id: str, product_id: int, qty: int) -> int:
+        sku = self._sku(product_id)
+        if sku is None:
+            return 0
+        qty = max(qty, 0)
+        if qty:
+            # Indexed before the grant, so the index never misses a live hold
+            # (stale entries are harmless: touch/release skip products without one).
+            with self._session_lock(session_id):
+                self._sessions.setdefault(session_id, set()).add(product_id)
+        now = self._clock()
+        with self._sku_lock(product_id):
+            own = self._own(sku, session_id, now)
+            granted = min(qty, own + sku.on_hand - sku.reserved)
+            if granted < qty and sku.purge(now):
+                granted = min(qty, own + sku.on_hand - sku.reserved)
+            granted = max(granted, 0)
+            sku.reserved += granted - own
+            if granted:
+                sku.holds[session_id] = [granted, now + self._ttl]
+            else:
+                sku.holds.pop(session_id, None)
+        return granted
+
+    def limit(self, session_id: str, product_id: int) -> int:
+        sku = self._sku(product_id)
+        if sku is None:
+            return 0
+        now = self._clock()
+        with self._sku_lock(product_id):
+            sku.purge(now)
+            return max(0, self._own(sku, session_id, now) + sku.on_hand - sku.reserved)
+
+    def _held_products(self, session_id: str, drop: bool) -> set[int]:
+        with self._session_lock(session_id):
+            if drop:
+                return self._sessions.pop(session_id, set())
+            return set(self._sessions.get(session_id, ()))
+
+    def touch(self, session_id: str) -> None:
+        now = self._clock()
+        for product_id in self._held_products(session_id, drop=False):
+            sku = self._skus[product_id]
+            with self._sku_lock(product_id):
+                if self._own(sku, session_id, now):
+                    sku.holds[session_id][1] = now + self._ttl
+
+    def _drop_holds(self, session_id: str, sold: bool) -> dict[int, int]:
+        now = self._clock()
+        dropped: dict[int, int] = {}
+        for product_id in self._held_products(session_id, drop=True):
+            sku = self._skus[product_id]
+            with self._sku_lock(product_id):
+                qty = self._own(sku, session_id, now)
+                if qty:
+                    del sku.holds[session_id]
+                    sku.reserved -= qty
+                    if sold:
+                        sku.on_hand -= qty
+                    dropped[product_id] = qty
+        return dropped
+
+    def release(self, session_id: str) -> None:
+        self._drop_holds(session_id, sold=False)
+
+    def commit(self, session_id: str) -> dict[int, int]:
+        return self._drop_holds(session_id, sold=True)
+
+    def available(self, product_id: int) -> int:
+        sku = self._sku(product_id)
+        if sku is None:
+            return 0
+        with self._sku_lock(product_id):
+            sku.purge(self._clock())
+            return sku.on_hand - sku.reserved
+
+    def sweep(self) -> int:
+        """Reclaim every expired hold; return how many were dropped."""
+        now = self._clock()
+        removed = 0
+        for product_id, sku in list(self._skus.items()):
+            with self._sku_lock(product_id):
+                removed += sku.purge(now)
+        return removed
+
+
+# ---------------------------------------------------------------------------
+# SQLite ledger (shared by the workers of one host)
+# ---------------------------------------------------------------------------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory (
+    product_id INTEGER PRIMARY KEY,
+    on_hand    INTEGER NOT NULL,
+    stock      INTEGER
+);
+CREATE TABLE IF NOT EXISTS holds (
+    session_id TEXT    NOT NULL,
+    product_id INTEGER NOT NULL,
+    qty        INTEGER NOT NULL,
+    expires_at REAL    NOT NULL,
+    PRIMARY KEY (session_id, product_id)
+);
+CREATE INDEX IF NOT EXISTS holds_by_product ON holds (product_id, expires_at);
+"""
+
+
+class SqliteInventoryLedger:
+    """
+    Ledger stored in an SQLite file (WAL mode) shared by several processes.
+
+    Every operation runs in one `BEGIN IMMEDIATE` transaction, which takes the
+    database write lock up front: grants are serialized across workers, so
+    stock can never be oversold. Expiry uses wall-clock time, since the
+    deadlines are compared across processes.
+
+    Notes:
+    - A single connection per ledger, guarded by a lock.
+    - Expired holds of a product are deleted inside the transaction that reads
+      its availability.
+    - Catalog versions are per process, so a stock edit is detected by
+      comparing `Product.stock` with the `stock` column (the catalog stock last
+      applied to `on_hand`) in that same transaction.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float = 1800.0,
+        stock_of: StockOf = _catalog_stock,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._stock_of = stock_of
+        self._clock = clock
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(inventory)")}
+        if "stock" not in columns:  # database created before stock edits were tracked
+            self._conn.execute("ALTER TABLE inventory ADD COLUMN stock INTEGER")
+        self._lock = threading.Lock()
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection, float], object]) -> object:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn, self._clock())
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def _free(self, conn: sqlite3.Connection, product_id: int, now: float) -> Optional[int]:
+        """On-hand minus live holds of the product (None for unknown products)."""
+        stock = self._stock_of(product_id)
+        row = conn.execute("SELECT on_hand, stock FROM inventory WHERE product_id = ?", (product_id,)).fetchone()
+        if row is None:
+            if stock is None:
+                return None
+            conn.execute(
+                "INSERT INTO inventory (product_id, on_hand, stock) VALUES (?, ?, ?)", (product_id, stock, stock)
+            )
+            row = (stock, stock)
+        conn.execute("DELETE FROM holds WHERE product_id = ? AND expires_at <= ?", (product_id, now))
+        (reserved,) = conn.execute(
+            "SELECT COALESCE(SUM(qty), 0) FROM holds WHERE product_id = ?", (product_id,)
+        ).fetchone()
+        on_hand, applied = row
+        if stock is not None and stock != applied:
+            # The catalog stock changed since it was last applied (a row without one adopts it as is).
+            if applied is not None:
+                on_hand = max(on_hand + stock - applied, reserved)
+            conn.execute(
+                "UPDATE inventory SET on_hand = ?, stock = ? WHERE product_id = ?", (on_hand, stock, product_id)
+            )
+        return on_hand - reserved
+
+    @staticmethod
+    def _own(conn: sqlite3.Connection, session_id: str, product_id: int) -> int:
+        row = conn.execute(
+            "SELECT qty FROM holds WHERE session_id = ? AND product_id = ?", (session_id, product_id)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def hold(self, session_id: str, product_id: int, qty: int) -> int:
+        def tx(conn: sqlite3.Connection, now: float) -> int:
+            free = self._free(conn, product_id, now)
+            if free is None:
+                return 0
+            granted = max(0, min(max(qty, 0), self._own(conn, session_id, product_id) + free))
+            if granted:
+                conn.execute(
+                    "INSERT INTO holds (session_id, product_id, qty, expires_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (session_id, product_id) DO UPDATE SET qty = excluded.qty, "
+                    "expires_at = excluded.expires_at",
+                    (session_id, product_id, granted, now + self._ttl),
+                )
+            else:
+                conn.execute("DELETE FROM holds WHERE session_id = ? AND product_id = ?", (session_id, product_id))
+            return granted
+
+        return self._transaction(tx)
+
+    def limit(self, session_id: str, product_id: int) -> int:
+        def tx(conn: sqlite3.Connection, now: float) -> int:
+            free = self._free(conn, product_id, now)
+            return 0 if free is None else max(0, self._own(conn, session_id, product_id) + free)
+
+        return self._transaction(tx)
+
+    def touch(self, session_id: str) -> None:
+        self._transaction(
+            lambda conn, now: conn.execute(
+                "UPDATE holds SET expires_at = ? WHERE session_id = ? AND expires_at > ?",
+                (now + self._ttl, session_id, now),
+            )
+        )
+
+    def _drop_holds(self, session_id: str, sold: bool) -> dict[int, int]:
+        def tx(conn: sqlite3.Connection, now: float) -> dict[int, int]:
+            rows = conn.execute(
+                "SELECT product_id, qty FROM holds WHERE session_id = ? AND expires_at > ?", (session_id, now)
+            ).fetchall()
+            conn.execute("DELETE FROM holds WHERE session_id = ?", (session_id,))
+            if sold:
+                conn.executemany(
+                    "UPDATE inventory SET on_hand = on_hand - ? WHERE product_id = ?",
+                    [(qty, product_id) for product_id, qty in rows],
+                )
+            return dict(rows)
+
+        return self._transaction(tx)
+
+    def release(self, session_id: str) -> None:
+        self._drop_holds(session_id, sold=False)
+
+    def commit(self, session_id: str) -> dict[int, int]:
+        return self._drop_holds(session_id, sold=True)
+
+    def available(self, product_id: int) -> int:
+        return self._transaction(lambda conn, now: self._free(conn, product_id, now) or 0)
+
+    def sweep(self) -> int:
+        """Delete every expired hold; return how many were dropped."""
+        return self._transaction(
+            lambda conn, now: conn.execute("DELETE FROM holds WHERE expires_at <= ?", (now,)).rowcount
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Process-wide ledger
+# ---------------------------------------------------------------------------
+@lru_cache(maxsize=1)
+def get_inventory() -> Optional[InventoryLedger]:
+    """
+    Process-wide inventory ledger selected from the environment.
+
+    - `INVENTORY_LEDGER`: `off` (default, no ledger: returns None), `memory` or
+      `sqlite` (file at `INVENTORY_DB_PATH`, default `inventory.db`).
+    - `INVENTORY_HOLD_TTL_SECONDS`: hold expiry; defaults to
+      `SESSION_TTL_SECONDS` (1800) so holds outlive idle sessions by no more
+      than the session store does.
+    """
+    backend = os.getenv("INVENTORY_LEDGER", "off").strip().lower()
+    ttl = float(os.getenv("INVENTORY_HOLD_TTL_SECONDS") or os.getenv("SESSION_TTL_SECONDS") or "1800")
+    if backend == "memory":
+        return InMemoryInventoryLedger(ttl_seconds=ttl)
+    if backend == "sqlite":
+        return SqliteInventoryLedger(os.getenv("INVENTORY_DB_PATH", "inventory.db"), ttl_seconds=ttl)
+    return None
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Iterable, Optional
+
+from app.domain.product import Product
+
+
+# (price, catalog position, product): tuples sort by price and keep catalog
+# order for equal prices, matching a stable sort over the catalog.
+_Entry = tuple[float, int, Product]
+
+
+def _key(value: str | None) -> str:
+    """Normalize a facet value the same way the recommender compares them."""
+    return (value or "").strip().lower()
+
+
+class RecommendIndex:
+    """
+    Precomputed facet index for recommendations: family -> audience -> price-sorted entries.
+
+    Built once per loaded catalog. A query resolves the matching facet buckets,
+    narrows each bucket to the price range with binary search and merges the
+    (already sorted) slices lazily, so only the first `limit` results are
+    materialized.
+    """
+
+    def __init__(self, products: Iterable[Product]) -> None:
+        buckets: dict[str, dict[str, list[_Entry]]] = {}
+        for pos, p in enumerate(products):
+            buckets.setdefault(_key(p.family), {}).setdefault(_key(p.audience), []).append((p.price, pos, p))
+
+        for by_audience in buckets.values():
+            for entries in by_audience.values():
+                entries.sort(key=lambda e: (e[0], e[1]))
+
+        self._buckets = buckets
+
+    def query(
+        self,
+        families: Optional[list[str]],
+        audiences: Optional[Iterable[str]],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        limit: int,
+    ) -> list[Product]:
+        """
+        Return up to `limit` products sorted by price (catalog order on ties).
+
+        - families: normalized family keys; None or empty means any family.
+        - audiences: normalized audience keys; None means any audience.
+        - min_price / max_price: inclusive bounds; None means unbounded.
+        """
+        if families:
+            family_buckets = [self._buckets[f] for f in dict.fromkeys(families) if f in self._buckets]
+        else:
+            family_buckets = list(self._buckets.values())
+
+        limit = max(limit, 0)
+        ranges: list[tuple[list[_Entry], int, int]] = []
+        for by_audience in family_buckets:
+            if audiences is None:
+                lists = list(by_audience.values())
+            else:
+                lists = [by_audience[a] for a in dict.fromkeys(audiences) if a in by_audience]
+
+            for entries in lists:
+                lo = 0 if min_price is None else bisect_left(entries, (min_price,))
+                hi = len(entries) if max_price is None else bisect_right(entries, (max_price, float("inf")))
+                if lo < hi:
+                    ranges.append((entries, lo, hi))
+
+        if not ranges:
+            return []
+        if len(ranges) == 1:
+            entries, lo, hi = ranges[0]
+            return [e[2] for e in entries[lo:min(hi, lo + limit)]]
+
+        # K-way heap merge over lazy views of each range; stops after `limit` items
+        # so only the returned entries are ever touched.
+        streams = [map(entries.__getitem__, range(lo, hi)) for entries, lo, hi in ranges]
+        return [e[2] for e in islice(heapq.merge(*streams), limit)]
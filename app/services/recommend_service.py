@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Optional
 
 from app.domain.product import Product
-from app.services.catalog_service import get_catalog
+from app.services.catalog_service import get_recommend_index
 
 
 def recommend_products(
@@ -21,51 +21,27 @@ def recommend_products(
     2) Relaxed audience (male/female -> allow unisex) while keeping family + price.
     3) No fallback to unrelated families or arbitrary "cheapest" items.
 
+    Both passes are range reads over the precomputed facet index (see
+    `RecommendIndex`), returning the cheapest `limit` matches.
+
     Returning an empty list is intentional: the calling node can decide how to
     message the user (e.g., ask to relax constraints) without making assumptions.
     """
-    catalog = get_catalog()
+    index = get_recommend_index()
 
     norm_families = [f.strip().lower() for f in (families or []) if (f or "").strip()]
 
-    def _family_ok(p: Product) -> bool:
-        if not norm_families:
-            return True
-        pf = (p.family or "").strip().lower()
-        return pf in norm_families
-
-    def _matches(p: Product) -> bool:
-        if not _family_ok(p):
-            return False
-        if audience and (p.audience or "").strip().lower() != audience.strip().lower():
-            return False
-        if min_price is not None and p.price < min_price:
-            return False
-        if max_price is not None and p.price > max_price:
-            return False
-        return True
-
     # 1) Strict: respect all constraints.
-    strict = [p for p in catalog if _matches(p)]
+    audiences = [audience.strip().lower()] if audience else None
+    strict = index.query(norm_families, audiences, min_price, max_price, limit)
     if strict:
-        return sorted(strict, key=lambda x: x.price)[:limit]
+        return strict
 
     # 2) Relax audience (male/female -> allow unisex) while keeping family + price constraints.
     if audience in ("male", "female"):
-        aud = audience.strip().lower()
-
-        def _matches_relaxed_audience(p: Product) -> bool:
-            if not _family_ok(p):
-                return False
-            if min_price is not None and p.price < min_price:
-                return False
-            if max_price is not None and p.price > max_price:
-                return False
-            return (p.audience or "").strip().lower() in (aud, "unisex")
-
-        relaxed = [p for p in catalog if _matches_relaxed_audience(p)]
+        relaxed = index.query(norm_families, [audience, "unisex"], min_price, max_price, limit)
         if relaxed:
-            return sorted(relaxed, key=lambda x: x.price)[:limit]
+            return relaxed
 
     # 3) No fallback to unrelated families or arbitrary "cheapest" items.
     # If no match exists, return [] and let the caller decide the next UX step.
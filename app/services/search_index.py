@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+from app.domain.product import Product
+from app.utils.text import fold_text, word_tokens
+
+
+# BM25 parameters (standard defaults).
+_K1 = 1.2
+_B = 0.75
+
+# Typo tolerance: minimum Dice similarity over padded trigrams for a fuzzy term match.
+_FUZZY_MIN_SIMILARITY = 0.5
+_FUZZY_MIN_LEN = 4
+_FUZZY_MAX_LEN_DIFF = 2
+
+
+def _trigrams(term: str) -> set[str]:
+    """Unpadded trigrams, used to find terms that contain a query token as substring."""
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+def _padded_trigrams(term: str) -> set[str]:
+    """Padded trigrams, used for typo-tolerant similarity ("acqa" ~ "acqua")."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProductSearchIndex:
+    """
+    Inverted index over product brand + name for deterministic name search.
+
+    Documents are the folded (lowercase, accent-free) `"{brand} {name}"` strings,
+    tokenized into words. The index is built once per loaded catalog.
+
+    Matching, per query token:
+    1) Substring match against indexed terms ("sauv" -> "sauvage"), resolved via
+       trigram postings instead of scanning every product.
+    2) If no term contains the token, a typo-tolerant match against terms with a
+       similar trigram profile ("chanell" -> "chanel").
+
+    Ranking:
+    - Products are grouped by how many query tokens they match; only the best
+      group is returned (ties allowed), as in the original token-count scoring.
+    - Within that group, products are ordered by BM25 score (fuzzy matches are
+      down-weighted by their similarity), then by catalog order.
+    """
+
+    def __init__(self, products: Iterable[Product]) -> None:
+        self._ids: list[int] = []
+        self._doc_len: list[int] = []
+        self._brands: dict[str, list[int]] = {}
+
+        # term -> {doc position: term frequency}
+        self._postings: dict[str, dict[int, int]] = {}
+
+        for pos, p in enumerate(products):
+            self._ids.append(p.id)
+            self._brands.setdefault(fold_text(p.brand), []).append(pos)
+
+            terms = word_tokens(fold_text(f"{p.brand or ''} {p.name}"))
+            self._doc_len.append(len(terms))
+            for term in terms:
+                tf = self._postings.setdefault(term, {})
+                tf[pos] = tf.get(pos, 0) + 1
+
+        n_docs = len(self._ids)
+        self._avg_dl = (sum(self._doc_len) / n_docs) if n_docs else 0.0
+        self._idf: dict[str, float] = {
+            term: math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self._postings.items()
+        }
+
+        # Trigram -> terms containing it (substring lookup) and
+        # padded trigram -> terms (fuzzy lookup).
+        self._substr_grams: dict[str, set[str]] = {}
+        self._fuzzy_grams: dict[str, set[str]] = {}
+        self._fuzzy_profile: dict[str, frozenset[str]] = {}
+        for term in self._postings:
+            for g in _trigrams(term):
+                self._substr_grams.setdefault(g, set()).add(term)
+            if len(term) >= _FUZZY_MIN_LEN - _FUZZY_MAX_LEN_DIFF:
+                padded = frozenset(_padded_trigrams(term))
+                self._fuzzy_profile[term] = padded
+                for g in padded:
+                    self._fuzzy_grams.setdefault(g, set()).add(term)
+
+    def brand_matches(self, token: str) -> list[int]:
+        """Return product ids whose full brand equals `token` (folded), in catalog order."""
+        return [self._ids[pos] for pos in self._brands.get(fold_text(token), ())]
+
+    def search(self, tokens: list[str], limit: int = 5) -> list[int]:
+        """
+        Return the ids of the best-matching products for already-cleaned query tokens.
+
+        Tokens are expected to be folded and filtered (no stopwords, length >= 3).
+        """
+        coverage: dict[int, int] = {}
+        scores: dict[int, float] = {}
+
+        for tok in tokens:
+            weights = self._match_terms(tok)
+            if not weights:
+                continue
+
+            # A product counts once per query token, using its best matching term.
+            best: dict[int, float] = {}
+            for term, similarity in weights.items():
+                idf = self._idf[term]
+                for pos, tf in self._postings[term].items():
+                    norm = 1 - _B + _B * (self._doc_len[pos] / self._avg_dl)
+                    s = similarity * idf * (tf * (_K1 + 1)) / (tf + _K1 * norm)
+                    if s > best.get(pos, 0.0):
+                        best[pos] = s
+
+            for pos, s in best.items():
+                coverage[pos] = coverage.get(pos, 0) + 1
+                scores[pos] = scores.get(pos, 0.0) + s
+
+        if not coverage:
+            return []
+
+        top = max(coverage.values())
+        hits = [pos for pos, c in coverage.items() if c == top]
+        hits.sort(key=lambda pos: (-scores[pos], pos))
+        return [self._ids[pos] for pos in hits[:limit]]
+
+    def _match_terms(self, tok: str) -> dict[str, float]:
+        """
+        Return `{term: similarity}` for indexed terms matching a query token.
+
+        Substring matches have similarity 1.0; fuzzy matches are only considered
+        when no indexed term contains the token.
+        """
+        grams = _trigrams(tok)
+        if grams:
+            candidates: set[str] | None = None
+            # Intersect starting from the rarest trigram to keep the candidate set small.
+            for g in sorted(grams, key=lambda x: len(self._substr_grams.get(x, ()))):
+                terms = self._substr_grams.get(g)
+                if not terms:
+                    candidates = set()
+                    break
+                candidates = set(terms) if candidates is None else candidates & terms
+                if not candidates:
+                    break
+            substr = {term: 1.0 for term in (candidates or ()) if tok in term}
+            if substr:
+                return substr
+
+        if len(tok) < _FUZZY_MIN_LEN:
+            return {}
+
+        padded = _padded_trigrams(tok)
+        n_grams = len(padded)
+
+        # Prefix filtering: candidates have a length within `_FUZZY_MAX_LEN_DIFF`,
+        # hence at least `n_grams - _FUZZY_MAX_LEN_DIFF` grams, so reaching the
+        # similarity threshold requires `min_shared` common grams. Any such term
+        # must contain one of the `n_grams - min_shared + 1` rarest query grams.
+        min_shared = math.ceil(_FUZZY_MIN_SIMILARITY * (2 * n_grams - _FUZZY_MAX_LEN_DIFF) / 2)
+        rarest = sorted(padded, key=lambda g: len(self._fuzzy_grams.get(g, ())))
+        candidates: set[str] = set()
+        for g in rarest[: max(1, n_grams - min_shared + 1)]:
+            candidates.update(self._fuzzy_grams.get(g, ()))
+
+        fuzzy: dict[str, float] = {}
+        for term in candidates:
+            if abs(len(term) - len(tok)) > _FUZZY_MAX_LEN_DIFF:
+                continue
+            profile = self._fuzzy_profile[term]
+            similarity = 2 * len(padded & profile) / (n_grams + len(profile))
+            if similarity >= _FUZZY_MIN_SIMILARITY:
+                fuzzy[term] = similarity
+        return fuzzy
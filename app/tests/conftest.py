@@ -9,6 +9,8 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 from app.engine.service import ChatEngine
+from app.llm.router_cache import get_router_cache
+from app.services.inventory import get_inventory
 
 
 @pytest.fixture(autouse=True)
@@ -17,6 +19,22 @@ def disable_llm(monkeypatch):
     monkeypatch.delenv("OPENAI_API_KEY", raising=False)
 
 
+@pytest.fixture(autouse=True)
+def fresh_router_cache():
+    # Router results must not leak between tests (and env overrides must apply).
+    get_router_cache.cache_clear()
+    yield
+    get_router_cache.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_inventory():
+    # Stock holds are process-wide: each test starts from a fresh (or disabled) ledger.
+    get_inventory.cache_clear()
+    yield
+    get_inventory.cache_clear()
+
+
 @pytest.fixture()
 def engine():
     return ChatEngine()
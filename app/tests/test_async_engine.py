@@ -0,0 +1,135 @@
+# tests/test_async_engine.py
+import asyncio
+import time
+
+import pytest
+
+from app.engine.memory import InMemorySessionStore
+from app.engine.service import ChatEngine
+from app.engine.state import Mode
+from app.graph.routing.rules import RULES
+from app.graph.routing.rules.out_of_scope_rules import rule_out_of_scope
+from app.llm.router_schema import Intent, RouterResult
+from app.services.inventory import InMemoryInventoryLedger
+
+
+def test_aprocess_turn_matches_sync_path(engine, session_id):
+    async def run():
+        await engine.astart_session(session_id)
+        await engine.aprocess_turn(session_id, "añade 2 del 301")
+        return await engine.aprocess_turn(session_id, "ver carrito")
+
+    state = asyncio.run(run())
+    assert state.mode == Mode.CART
+    assert [(item.product_id, item.qty) for item in state.cart] == [(301, 2)]
+
+
+def test_llm_routed_turns_run_concurrently(engine, monkeypatch):
+    monkeypatch.setenv("LLM_ROUTER_ENABLED", "true")
+
+    async def slow_router(state):
+        await asyncio.sleep(0.2)
+        return RouterResult(intent=Intent.VIEW_CART, confidence=0.9)
+
+    monkeypatch.setattr("app.graph.nodes.interpret.ainterpret_with_openai", slow_router)
+    # The catch-all out-of-scope rule answers before the router; drop it so turns reach the LLM.
+    monkeypatch.setattr(
+        "app.graph.nodes.interpret.RULES", [r for r in RULES if r is not rule_out_of_scope]
+    )
+
+    async def run():
+        return await asyncio.gather(
+            *(engine.aprocess_turn(f"llm-{i}", "me apetece algo especial hoy") for i in range(200))
+        )
+
+    start = time.perf_counter()
+    states = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    assert all(s.last_intent == Intent.VIEW_CART.value for s in states)
+    # 200 turns x 0.2s of router latency would take 40s if serialized.
+    assert elapsed < 5
+
+
+class _SlowStore:
+    """In-memory store whose calls block like disk I/O (not an `InMemorySessionStore`)."""
+
+    def __init__(self, delay: float) -> None:
+        self._inner = InMemorySessionStore()
+        self._delay = delay
+
+    def get(self, session_id):
+        time.sleep(self._delay)
+        return self._inner.get(session_id)
+
+    def set(self, state):
+        time.sleep(self._delay)
+        self._inner.set(state)
+
+    def reset(self, session_id):
+        time.sleep(self._delay)
+        self._inner.reset(session_id)
+
+
+class _SlowLedger:
+    """In-memory ledger whose calls block like a contended SQLite ledger."""
+
+    def __init__(self, delay: float) -> None:
+        self._inner = InMemoryInventoryLedger()
+        self._delay = delay
+
+    def __getattr__(self, name):
+        fn = getattr(self._inner, name)
+
+        def slow(*args, **kwargs):
+            time.sleep(self._delay)
+            return fn(*args, **kwargs)
+
+        return slow
+
+
+def _max_loop_gap(engine) -> float:
+    """Largest event-loop stall while 4 sessions add to their cart, re-read and reset it."""
+    # Warm up lazy catalog/graph initialization, which is CPU work on the loop anyway.
+    engine.process_turn("warm-up", "añade 1 del 301")
+    gaps = []
+
+    async def ticker(stop):
+        last = time.perf_counter()
+        while not stop.is_set():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    async def session(sid):
+        await engine.astart_session(sid)
+        await engine.aprocess_turn(sid, "añade 1 del 301")
+        assert (await engine.aprocess_turn(sid, "ver carrito")).cart
+        assert (await engine.aget_session(sid)).cart
+        await engine.areset(sid)
+        assert await engine.aget_session(sid) is None
+
+    async def run():
+        stop = asyncio.Event()
+        tick = asyncio.create_task(ticker(stop))
+        await asyncio.gather(*(session(f"slow-{i}") for i in range(4)))
+        stop.set()
+        await tick
+
+    asyncio.run(run())
+    return max(gaps)
+
+
+def test_blocking_store_calls_stay_off_the_event_loop():
+    # Every store call sleeps 50ms; on the loop thread they would stall the ticker.
+    assert _max_loop_gap(ChatEngine(store=_SlowStore(0.05))) < 0.045
+
+
+@pytest.mark.parametrize("executor", ["graph", "direct"])
+def test_blocking_ledger_calls_stay_off_the_event_loop(monkeypatch, executor):
+    ledger = _SlowLedger(0.05)
+    monkeypatch.setattr("app.engine.service.get_inventory", lambda: ledger)
+    monkeypatch.setattr("app.services.cart_service.get_inventory", lambda: ledger)
+    # In-memory session store: only the ledger (touch/release, and holds in the cart node) blocks.
+    assert _max_loop_gap(ChatEngine(executor=executor)) < 0.045
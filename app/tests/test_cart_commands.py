@@ -0,0 +1,34 @@
+# tests/test_cart_commands.py
+from app.llm.router_schema import CartAction, CartOp
+from app.utils.cart_commands import parse_cart_commands
+from app.utils.cart_commands_by_name import parse_cart_commands_by_name
+from app.utils.cart_lexer import lex_cart_message
+
+
+def test_both_parsers_share_one_lexing_pass():
+    lex_cart_message.cache_clear()
+    message = "Añade 2 del 310, 1 x 302 y quita 1 del 307"
+
+    assert parse_cart_commands(message) == [
+        CartAction(op=CartOp.ADD, product_id=310, qty=2),
+        CartAction(op=CartOp.ADD, product_id=302, qty=1),
+        CartAction(op=CartOp.REMOVE, product_id=307, qty=1),
+    ]
+    ids, names = parse_cart_commands_by_name(message)
+    assert [(a.op, a.product_id, a.qty) for a in ids] == [
+        (CartOp.ADD, 310, 2), (CartOp.ADD, 302, 1), (CartOp.REMOVE, 307, 1),
+    ]
+    assert names == []
+
+    info = lex_cart_message.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+
+def test_name_hints_drop_whole_verbs_and_numbers():
+    ids, names = parse_cart_commands_by_name("añademe 2 sauvage y quita el perfume bleu")
+    assert ids == []
+    assert names == [(CartOp.ADD, 2, "sauvage"), (CartOp.REMOVE, 1, "el perfume bleu")]
+
+    # Only whitespace-delimited "y"/"and" split name fragments; "anade" is an add verb for both parsers.
+    assert parse_cart_commands_by_name("anademe") == ([], [])
+    assert parse_cart_commands("anade 2 del 306") == [CartAction(op=CartOp.ADD, product_id=306, qty=2)]
@@ -1,6 +1,16 @@
 # tests/test_cart_tools.py
+import pytest
+
 from app.engine.state import ConversationState
-from app.tools import tool_add_to_cart, tool_remove_from_cart, tool_set_cart_qty, tool_cart_total
+from app.llm.router_schema import CartAction, CartOp
+from app.services import apply_cart_actions, get_catalog_index, get_product_by_id
+from app.services.catalog_index import CatalogIndex
+from app.tools import (
+    tool_add_to_cart,
+    tool_cart_total,
+    tool_remove_from_cart,
+    tool_set_cart_qty,
+)
 
 
 def test_add_to_cart_updates_cart_and_total():
@@ -37,3 +47,52 @@ def test_set_cart_qty_zero_removes_item():
     assert new_qty == 0
 
     assert all(x.product_id != 301 for x in state.cart)
+
+
+def _recomputed_total(state: ConversationState) -> float:
+    return sum(get_product_by_id(x.product_id).price * x.qty for x in state.cart)
+
+
+def test_running_total_tracks_every_cart_operation():
+    state = ConversationState(session_id="s1")
+    ops = [
+        (tool_add_to_cart, 301, 3), (tool_add_to_cart, 306, 2), (tool_set_cart_qty, 301, 5),
+        (tool_remove_from_cart, 306, 1), (tool_add_to_cart, 316, 1), (tool_set_cart_qty, 306, 0),
+        (tool_remove_from_cart, 316, 4), (tool_add_to_cart, 320, 2),
+    ]
+    for op, product_id, qty in ops:
+        op(state, product_id=product_id, qty=qty)
+        assert tool_cart_total(state) == pytest.approx(_recomputed_total(state))
+    assert [(x.product_id, x.qty) for x in state.cart] == [(301, 5), (320, 2)]
+
+
+def test_total_is_repriced_when_the_catalog_changes(monkeypatch):
+    state = ConversationState(session_id="s1")
+    tool_add_to_cart(state, product_id=301, qty=2)
+    before = tool_cart_total(state)
+
+    repriced = [p.model_copy(update={"price": p.price + 10}) for p in get_catalog_index().products]
+    monkeypatch.setattr("app.services.cart_service.get_catalog_index", lambda: CatalogIndex(repriced))
+    assert tool_cart_total(state) == pytest.approx(before + 20)
+
+
+def test_apply_cart_actions_nets_per_product_and_reports_each_action():
+    state = ConversationState(session_id="s1")
+    tool_add_to_cart(state, product_id=306, qty=1)
+    actions = [
+        CartAction(op=CartOp.ADD, product_id=301, qty=3),
+        CartAction(op=CartOp.REMOVE, product_id=301, qty=1),
+        CartAction(op=CartOp.REMOVE, product_id=306, qty=5),
+        CartAction(op=CartOp.ADD, product_id=301, qty=20),
+        CartAction(op=CartOp.REMOVE, product_id=320, qty=1),
+        CartAction(op=CartOp.ADD, product_id=999, qty=1),
+    ]
+    report = apply_cart_actions(state, actions)
+
+    assert [(r.status, r.qty) for r in report] == [
+        ("added", 3), ("removed", 1), ("cannot_remove", 0), ("added", 10), ("not_in_cart", 0), ("not_found", 0),
+    ]
+    assert report[2].current_qty == 1
+    assert [(x.product_id, x.qty) for x in state.cart] == [(306, 1), (301, 12)]
+    assert [state.cart.position(x.product_id) for x in state.cart] == [0, 1]
+    assert tool_cart_total(state) == pytest.approx(_recomputed_total(state))
@@ -0,0 +1,29 @@
+# tests/test_catalog_index.py
+from app.domain.product import Product
+from app.services import get_catalog, get_catalog_index, get_product_by_id
+from app.services.catalog_index import CatalogIndex
+
+
+def _p(pid: int, price: float, brand: str = "Dior", family: str = "woody", audience: str = "male") -> Product:
+    return Product(id=pid, name=f"P{pid}", price=price, brand=brand, family=family, audience=audience)
+
+
+def test_index_lookups_match_linear_scan():
+    catalog = get_catalog()
+    index = get_catalog_index()
+
+    for p in catalog:
+        assert get_product_by_id(p.id) is p
+    assert get_product_by_id(999) is None
+
+    assert index.by_brand("chanel") == [p for p in catalog if (p.brand or "").lower() == "chanel"]
+    assert index.by_family("Citrus") == [p for p in catalog if p.family == "citrus"]
+
+
+def test_price_range_is_inclusive_and_stable():
+    index = CatalogIndex([_p(1, 50), _p(2, 30), _p(3, 50), _p(4, 80)])
+
+    assert [p.id for p in index.in_price_range()] == [2, 1, 3, 4]
+    assert [p.id for p in index.in_price_range(min_price=50)] == [1, 3, 4]
+    assert [p.id for p in index.in_price_range(max_price=50)] == [2, 1, 3]
+    assert [p.id for p in index.in_price_range(60, 70)] == []
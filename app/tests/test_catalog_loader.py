@@ -0,0 +1,66 @@
+# tests/test_catalog_loader.py
+import gc
+import json
+
+import pytest
+
+from app.data import catalog_loader
+from app.data.catalog_loader import CATALOG_PATH, load_catalog
+from app.domain.product import Product
+
+
+def _legacy() -> list[Product]:
+    return [Product.model_validate(item) for item in json.loads(CATALOG_PATH.read_text(encoding="utf-8"))]
+
+
+def test_streamed_array_and_json_lines_match_the_full_load(tmp_path, monkeypatch):
+    expected = _legacy()
+
+    # Tiny chunks put chunk boundaries inside strings, numbers and separators.
+    monkeypatch.setattr(catalog_loader, "_CHUNK_SIZE", 7)
+    for batch_size in (1, 3, 1000):
+        assert load_catalog(batch_size=batch_size) == expected
+
+    lines = tmp_path / "catalog.jsonl"
+    items = json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
+    lines.write_text("\n".join(json.dumps(x, ensure_ascii=False) for x in items) + "\n\n", encoding="utf-8")
+    events = []
+    assert load_catalog(lines, batch_size=6, progress=lambda *e: events.append(e)) == expected
+    assert [e[0] for e in events] == [6, 12, 18, 20]
+    assert events[-1][1] == events[-1][2] == lines.stat().st_size
+
+
+def test_braces_inside_strings_at_any_chunk_boundary(tmp_path, monkeypatch):
+    items = [
+        {"id": i, "name": f"n{i}", "price": 1, "description": ["x", 'a}, {"id": 9}', "}\\\"}", "{"][i % 4]}
+        for i in range(40)
+    ]
+    expected = [Product.model_validate(x) for x in items]
+    path = tmp_path / "catalog.json"
+    for indent in (None, 1):
+        path.write_text(json.dumps(items, indent=indent) + "\n", encoding="utf-8")
+        for chunk in (1, 5, 16, 23, 64, 1 << 20):
+            monkeypatch.setattr(catalog_loader, "_CHUNK_SIZE", chunk)
+            assert load_catalog(path, batch_size=7) == expected
+    assert gc.isenabled()
+
+
+def test_invalid_items_name_their_position(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps([{"id": 1, "name": "a", "price": 1}] * 3 + [{"id": 4, "name": "b", "price": -1}]))
+    with pytest.raises(ValueError, match=r"items 2\.\.3"):
+        load_catalog(path, batch_size=2)
+
+
+def test_malformed_array_fails_early_naming_the_byte_offset(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_loader, "_CHUNK_SIZE", 16)
+    monkeypatch.setattr(catalog_loader, "_MAX_PENDING", 64)
+    good = json.dumps({"id": 1, "name": "a", "price": 1})
+    bad = '{"id": 2 "name": "b", "price": 1}'
+    path = tmp_path / "catalog.json"
+
+    for tail in (200_000, 0):  # caught while streaming / in the last piece
+        text = "[" + ",\n".join([good, bad] + [good] * tail) + "]"
+        path.write_text(text, encoding="utf-8")
+        with pytest.raises(ValueError, match=rf"Expecting ',' delimiter at byte {text.index(bad) + 9}$"):
+            load_catalog(path)
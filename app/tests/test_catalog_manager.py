@@ -0,0 +1,53 @@
+# tests/test_catalog_manager.py
+import json
+import os
+
+from app.data.catalog_loader import CATALOG_PATH
+from app.services import catalog_service
+from app.services.catalog_manager import CatalogManager
+from app.utils.turn_context import turn_scope
+
+
+def _write(path, items, mtime_ns):
+    path.write_text(json.dumps(items), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_reload_swaps_snapshot_only_when_the_file_changes(tmp_path):
+    items = json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
+    path = tmp_path / "catalog.json"
+    _write(path, items, 1_000_000_000)
+
+    manager = CatalogManager(path)
+    first = manager.snapshot()
+    assert manager.reload() is False and manager.snapshot() is first
+
+    items[0]["price"] += 5
+    _write(path, items, 2_000_000_000)
+    assert manager.reload() is True
+    second = manager.snapshot()
+    assert second.version > first.version
+    assert second.index.price_of(items[0]["id"]) == first.index.price_of(items[0]["id"]) + 5
+    assert second.search is not first.search and second.recommend is not first.recommend
+
+    # A broken catalog is not published, and not retried until the file changes again.
+    path.write_text("[{", encoding="utf-8")
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    assert manager.reload() is False and manager.snapshot() is second
+    assert manager.status()["last_error"].startswith("ValueError: Invalid catalog")
+    assert manager.status()["last_error"].endswith("at byte 2")
+    assert manager.reload() is False
+
+
+def test_turn_keeps_the_snapshot_it_started_with(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.json"
+    _write(path, json.loads(CATALOG_PATH.read_text(encoding="utf-8")), 1_000_000_000)
+    manager = CatalogManager(path)
+    monkeypatch.setattr(catalog_service, "get_catalog_manager", lambda: manager)
+
+    with turn_scope():
+        before = catalog_service.get_catalog_index()
+        assert manager.reload(force=True)
+        assert catalog_service.get_catalog_index() is before
+
+    assert catalog_service.get_catalog_index() is manager.snapshot().index is not before
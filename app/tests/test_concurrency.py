@@ -0,0 +1,27 @@
+# tests/test_concurrency.py
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_parallel_add_turns_on_one_session_are_not_lost(engine, session_id):
+    engine.start_session(session_id)
+
+    # 320 has stock 19 and 306 has stock 14: totals stay below both limits.
+    messages = ["añade 1 del 320"] * 16 + ["añade 1 del 306"] * 12
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda m: engine.process_turn(session_id, m), messages))
+
+    state = engine._store.get(session_id)
+    assert {item.product_id: item.qty for item in state.cart} == {320: 16, 306: 12}
+
+
+def test_parallel_sessions_stay_isolated(engine):
+    def run(i: int):
+        sid = f"s-{i}"
+        engine.process_turn(sid, "añade 2 del 301")
+        return engine.process_turn(sid, "añade 1 del 316")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        states = list(pool.map(run, range(16)))
+
+    for state in states:
+        assert {item.product_id: item.qty for item in state.cart} == {301: 2, 316: 1}
@@ -0,0 +1,82 @@
+# tests/test_executor.py
+"""
+Differential check: the direct-dispatch executor must leave every session in
+exactly the state the compiled LangGraph produces, turn after turn.
+
+Messages of `data/routing_corpus.txt` are replayed in order as multi-turn
+conversations (a new session starts every few turns or when a conversation
+ends), through one engine per executor.
+"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.engine.service import ChatEngine
+from app.graph.builder import NODES
+from app.graph.executor import DirectExecutor, build_executor
+
+
+CORPUS_PATH = Path(__file__).resolve().parent / "data" / "routing_corpus.txt"
+TURNS_PER_SESSION = 12
+
+
+def _messages() -> list[str]:
+    return [line for line in CORPUS_PATH.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_direct_executor_matches_graph_turn_by_turn():
+    graph, direct = ChatEngine(executor="graph"), ChatEngine(executor="direct")
+    session, turns = 0, 0
+    for i, message in enumerate(_messages()):
+        if turns == TURNS_PER_SESSION:
+            session, turns = session + 1, 0
+        sid = f"diff-{session}"
+        expected = graph.process_turn(sid, message)
+        actual = direct.process_turn(sid, message)
+        assert actual.model_dump() == expected.model_dump(), f"turn {i}: {message!r}"
+        turns += 1
+        if expected.should_end:
+            turns = TURNS_PER_SESSION
+
+
+def test_direct_executor_async_path_matches_graph():
+    async def replay(engine: ChatEngine) -> list[dict]:
+        states = []
+        for message in ["hola", "ver el catálogo", "añade 2 del 301", "quita 1 del 301", "Finalizar compra", "si"]:
+            states.append((await engine.aprocess_turn("async-diff", message)).model_dump())
+        return states
+
+    assert asyncio.run(replay(ChatEngine(executor="direct"))) == asyncio.run(replay(ChatEngine(executor="graph")))
+
+
+def test_build_executor_kinds():
+    assert isinstance(build_executor("direct"), DirectExecutor)
+    with pytest.raises(ValueError):
+        build_executor("turbo")
+
+
+@pytest.mark.parametrize("executor", ["graph", "direct"])
+@pytest.mark.parametrize("use_async", [False, True])
+def test_failed_turn_leaves_stored_session_unchanged(executor, use_async, monkeypatch):
+    def boom(state):
+        state.assistant_message = "partial"
+        state.cart.clear()
+        state.candidate_products = [301, 302]
+        raise RuntimeError("node failed")
+
+    monkeypatch.setitem(NODES, "view_cart", boom)
+    engine = ChatEngine(executor=executor)
+    engine.process_turn("s", "añade 2 del 301")
+    before = engine.get_session("s").model_dump(exclude={"user_message", "next_node"})
+    assert before["cart"]
+
+    with pytest.raises(RuntimeError, match="node failed"):
+        if use_async:
+            asyncio.run(engine.aprocess_turn("s", "ver carrito"))
+        else:
+            engine.process_turn("s", "ver carrito")
+
+    after = engine.get_session("s")
+    assert after.model_dump(exclude={"user_message", "next_node"}) == before
+    assert after.user_message == "ver carrito"
@@ -0,0 +1,199 @@
+# tests/test_inventory.py
+import json
+import os
+import threading
+
+from app.data.catalog_loader import CATALOG_PATH
+from app.engine.memory import InMemorySessionStore
+from app.engine.service import ChatEngine
+from app.engine.state import ConversationState, Mode
+from app.graph.nodes import handle_checkout_review_node
+from app.llm.router_schema import CartAction, CartOp
+from app.services import apply_cart_actions, catalog_service
+from app.services.catalog_manager import CatalogManager
+from app.services.inventory import InMemoryInventoryLedger, SqliteInventoryLedger, get_inventory
+from app.tools import tool_add_to_cart, tool_checkout_cart, tool_remove_from_cart, tool_set_cart_qty
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _ledgers(tmp_path, clock):
+    stock = {1: 5}.get
+    return [
+        InMemoryInventoryLedger(ttl_seconds=60, lock_stripes=4, stock_of=stock, clock=clock),
+        SqliteInventoryLedger(tmp_path / "inventory.db", ttl_seconds=60, stock_of=stock, clock=clock),
+    ]
+
+
+def test_concurrent_holds_never_oversell(tmp_path):
+    for ledger in _ledgers(tmp_path, FakeClock()):
+        granted = []
+        barrier = threading.Barrier(20)
+
+        def shopper(i):
+            barrier.wait()
+            granted.append(ledger.hold(f"s{i}", 1, 1 + i % 3))
+
+        threads = [threading.Thread(target=shopper, args=(i,)) for i in range(20)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        assert sum(granted) == 5
+        assert ledger.available(1) == 0
+        assert ledger.hold("late", 1, 1) == 0
+        assert ledger.hold("unknown-product", 2, 1) == 0
+
+
+def test_holds_expire_unless_touched_and_are_released_or_sold(tmp_path):
+    clock = FakeClock()
+    for ledger in _ledgers(tmp_path, clock):
+        clock.now += 1000
+        assert ledger.hold("a", 1, 3) == 3
+        assert ledger.hold("b", 1, 3) == 2
+        assert ledger.limit("b", 1) == 2
+
+        clock.now += 45
+        ledger.touch("a")
+        clock.now += 30  # b expired, a was refreshed
+        assert ledger.limit("c", 1) == 2
+        assert ledger.hold("c", 1, 2) == 2
+
+        ledger.release("c")
+        assert ledger.commit("a") == {1: 3}
+        assert ledger.available(1) == 2
+
+
+def test_sessions_compete_for_stock_through_the_engine(monkeypatch):
+    monkeypatch.setenv("INVENTORY_LEDGER", "memory")
+    get_inventory.cache_clear()
+    engine = ChatEngine(executor="direct")
+    for sid in ("alice", "bob"):
+        engine.start_session(sid, language="en")
+
+    engine.process_turn("alice", "add 10 of 301")
+    engine.process_turn("bob", "add 5 of 301")
+    assert [(x.product_id, x.qty) for x in engine.process_turn("bob", "view cart").cart] == [(301, 2)]
+
+    engine.reset("alice")
+    state = engine.process_turn("bob", "add 5 of 301")
+    assert [(x.product_id, x.qty) for x in state.cart] == [(301, 7)]
+    assert get_inventory().available(301) == 5
+
+
+def test_removals_apply_in_full_after_the_hold_expired(monkeypatch):
+    clock = FakeClock()
+    ledger = InMemoryInventoryLedger(ttl_seconds=60, clock=clock)
+    monkeypatch.setattr("app.services.cart_service.get_inventory", lambda: ledger)
+    bulk, single = ConversationState(session_id="a"), ConversationState(session_id="b")
+    for state in (bulk, single):
+        tool_add_to_cart(state, product_id=301, qty=3)
+
+    clock.now += 120  # both holds expired; another session takes every unit
+    assert ledger.hold("other", 301, 12) == 12
+
+    report = apply_cart_actions(bulk, [CartAction(op=CartOp.REMOVE, product_id=301, qty=1)])
+    assert [(r.status, r.qty) for r in report] == [("removed", 1)]
+    assert tool_remove_from_cart(single, product_id=301, qty=1) == (True, 1)
+    assert [(x.product_id, x.qty) for x in bulk.cart] == [(x.product_id, x.qty) for x in single.cart] == [(301, 2)]
+
+    # Growing the line still needs free units; the cart keeps what it had.
+    assert tool_set_cart_qty(single, product_id=301, qty=5) == (True, 2)
+    report = apply_cart_actions(bulk, [CartAction(op=CartOp.ADD, product_id=301, qty=1)])
+    assert [(r.status, r.qty) for r in report] == [("no_stock", 0)]
+    assert [(x.product_id, x.qty) for x in bulk.cart] == [(301, 2)]
+
+
+def test_bulk_report_matches_what_could_be_reserved(monkeypatch):
+    # Stock taken by another session between the limit check and the reservation.
+    monkeypatch.setattr("app.services.cart_service.stock_limit", lambda state, product: 100)
+    state = ConversationState(session_id="s1")
+    actions = [
+        CartAction(op=CartOp.ADD, product_id=301, qty=5),
+        CartAction(op=CartOp.ADD, product_id=301, qty=4),
+        CartAction(op=CartOp.ADD, product_id=301, qty=6),
+    ]
+    report = apply_cart_actions(state, actions)
+
+    assert [(r.status, r.qty) for r in report] == [("added", 5), ("added", 4), ("added", 3)]
+    assert [(x.product_id, x.qty) for x in state.cart] == [(301, 12)]
+
+
+def test_checkout_fails_when_an_expired_hold_cannot_be_taken_again(monkeypatch):
+    clock = FakeClock()
+    ledger = InMemoryInventoryLedger(ttl_seconds=60, clock=clock)
+    monkeypatch.setattr("app.services.cart_service.get_inventory", lambda: ledger)
+    state = ConversationState(session_id="a", preferred_language="en")
+    tool_add_to_cart(state, product_id=301, qty=2)
+    tool_add_to_cart(state, product_id=306, qty=1)
+
+    clock.now += 120  # holds expired; another session takes every unit of 306
+    assert ledger.hold("other", 306, 14) == 14
+    state.mode = Mode.CHECKOUT_REVIEW
+    state.user_message = "yes"
+    state = handle_checkout_review_node(state)
+
+    assert state.mode == Mode.CART
+    assert "1 in your cart, 0 available" in state.assistant_message
+    assert [(x.product_id, x.qty) for x in state.cart] == [(301, 2), (306, 1)]
+    assert ledger.available(306) == 0
+
+    ledger.release("other")
+    assert tool_checkout_cart(state) == []
+    assert state.cart == []
+    assert (ledger.available(301), ledger.available(306)) == (10, 13)
+
+
+def test_stock_edits_in_a_reloaded_catalog_reach_tracked_skus(tmp_path, monkeypatch):
+    items = json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
+    path = tmp_path / "catalog.json"
+
+    def write(stock, mtime_ns):
+        next(x for x in items if x["id"] == 301)["stock"] = stock
+        path.write_text(json.dumps(items), encoding="utf-8")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    write(12, 1_000_000_000)
+    manager = CatalogManager(path)
+    monkeypatch.setattr(catalog_service, "get_catalog_manager", lambda: manager)
+
+    for ledger in (InMemoryInventoryLedger(), SqliteInventoryLedger(tmp_path / "inventory.db")):
+        write(12, 1_000_000_000)
+        manager.reload(force=True)
+        assert ledger.hold("a", 301, 4) == 4
+        ledger.commit("a")  # 8 left, none held
+        assert ledger.hold("b", 301, 6) == 6
+        assert ledger.limit("c", 301) == 2
+
+        write(20, 2_000_000_000)  # restocked: +8 units
+        assert manager.reload()
+        assert ledger.limit("c", 301) == 10
+        assert ledger.available(301) == 10
+
+        write(2, 3_000_000_000)  # cut below what is held: b keeps its units
+        assert manager.reload()
+        assert ledger.limit("c", 301) == 0
+        assert ledger.limit("b", 301) == 6
+
+
+def test_sessions_dropped_by_the_store_release_their_holds(monkeypatch):
+    monkeypatch.setenv("INVENTORY_LEDGER", "memory")
+    clock = FakeClock()
+    store = InMemorySessionStore(ttl_seconds=60, max_sessions=1, sweep_interval=0, clock=clock)
+    engine = ChatEngine(store=store, executor="direct")
+
+    engine.process_turn("alice", "add 10 of 301")
+    assert get_inventory().available(301) == 2
+    engine.process_turn("bob", "add 3 of 301")  # alice is evicted (max_sessions=1)
+    assert store.get("alice") is None
+    assert get_inventory().available(301) == 9
+
+    clock.now += 120
+    assert store.sweep() == 1
+    assert get_inventory().available(301) == 12
@@ -0,0 +1,44 @@
+# tests/test_memory_store.py
+from app.engine.memory import InMemorySessionStore
+from app.engine.state import ConversationState
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_idle_sessions_expire_and_sweeper_removes_them():
+    clock = FakeClock()
+    store = InMemorySessionStore(ttl_seconds=10, sweep_interval=0, clock=clock)
+    store.set(ConversationState(session_id="a"))
+    store.set(ConversationState(session_id="b"))
+
+    clock.now = 8
+    assert store.get("a") is not None  # touching "a" keeps it alive
+
+    clock.now = 15
+    assert store.sweep() == 1
+    assert store.get("b") is None
+    assert store.get("a") is not None
+
+    clock.now = 40
+    assert store.get("a") is None
+    assert store.stats()["sessions"] == 0
+    assert store.stats()["expired_total"] == 2
+
+
+def test_least_recently_used_session_is_evicted_when_full():
+    store = InMemorySessionStore(max_sessions=2)
+    store.set(ConversationState(session_id="a"))
+    store.set(ConversationState(session_id="b"))
+    store.get("a")
+    store.set(ConversationState(session_id="c"))
+
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.get("c") is not None
+    assert store.stats()["evicted_total"] == 1
@@ -0,0 +1,31 @@
+# tests/test_message_features.py
+import random
+
+from app.utils.message_features import MessageFeatures, keyword_set
+
+
+def test_keyword_sets_match_like_substring_checks():
+    # Overlapping keywords, prefixes of each other and shared between sets.
+    groups = {
+        "a": ["car", "cart", "carrito", "ver carrito"],
+        "b": ["art", "carro", "to"],
+        "c": ["cart", "ñ", "rito v"],
+    }
+    sets = {name: keyword_set(f"test_{name}", kws) for name, kws in groups.items()}
+
+    rnd = random.Random(3)
+    alphabet = "carto ñiv"
+    for _ in range(2000):
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 14)))
+        f = MessageFeatures(text)
+        for name, kws in groups.items():
+            assert f.has(sets[name]) == any(k in f.text for k in kws), (text, name)
+
+
+def test_numbers_are_standalone_digit_runs():
+    f = MessageFeatures("Quita 2 del 301, x3 y 1000 (id_305)")
+    assert f.numbers == ("2", "301", "1000")
+    assert f.first_number == 2
+    assert f.first_small_number == 2
+    assert f.has_product_id
+    assert f.mentions_number(301) and not f.mentions_number(305)
@@ -0,0 +1,80 @@
+# tests/test_metrics.py
+import logging
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.engine.service import ChatEngine
+from app.graph.routing.rules import RULES
+from app.graph.routing.rules.out_of_scope_rules import rule_out_of_scope
+from app.utils.metrics import get_metrics
+
+
+@pytest.fixture()
+def metrics(monkeypatch):
+    monkeypatch.setenv("METRICS_ENABLED", "true")
+    get_metrics.cache_clear()
+    yield get_metrics()
+    get_metrics.cache_clear()
+
+
+def test_turn_records_rules_nodes_and_exposition(metrics):
+    engine = ChatEngine()
+    engine.start_session("m1")
+    engine.process_turn("m1", "añade 2 del 301")
+
+    assert metrics.turn_seconds.count() == 1
+    assert metrics.node_seconds.count("interpret_user") == 1
+    assert metrics.node_seconds.count("route") == 1
+    assert metrics.rule_seconds.count("rule_exit") == 1
+    text = metrics.render()
+    wins = [line for line in text.splitlines() if line.startswith("chatbot_rule_wins_total{")]
+    assert sum(float(line.rsplit(" ", 1)[1]) for line in wins) == 1
+    assert "# TYPE chatbot_node_seconds histogram" in text
+    assert 'chatbot_node_seconds_bucket{node="interpret_user",le="+Inf"} 1' in text
+    assert 'chatbot_rule_eval_seconds_count{rule="rule_exit"} 1' in text
+
+
+def test_llm_failure_is_logged_and_counted(metrics, monkeypatch, caplog):
+    monkeypatch.setattr(
+        "app.graph.nodes.interpret.RULES", [r for r in RULES if r is not rule_out_of_scope]
+    )
+    monkeypatch.setenv("LLM_ROUTER_ENABLED", "true")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    def boom(**kwargs):
+        raise RuntimeError("upstream down")
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=boom)))
+    monkeypatch.setattr("app.llm.openai_router._get_client", lambda api_key: client)
+
+    engine = ChatEngine()
+    engine.start_session("m2")
+    with caplog.at_level(logging.WARNING, logger="app.graph.nodes.interpret"):
+        state = engine.process_turn("m2", "tengo una cena importante el sábado")
+
+    assert state.next_node == "echo"
+    assert "LLM router failed" in caplog.text
+    assert metrics.llm_errors.value("RuntimeError") == 1
+    assert metrics.llm_requests.value("error") == 1
+    assert metrics.rule_wins.value("none") == 1
+
+
+def test_metrics_are_off_by_default_and_skip_instrumentation(monkeypatch):
+    monkeypatch.delenv("METRICS_ENABLED", raising=False)
+    get_metrics.cache_clear()
+    try:
+        assert get_metrics() is None
+        engine = ChatEngine()
+        engine.start_session("m3")
+        assert engine.process_turn("m3", "ver el catálogo").assistant_message
+
+        from app.main import app
+
+        resp = TestClient(app).get("/metrics")
+        assert resp.status_code == 200
+        assert resp.text == ""
+        assert resp.headers["content-type"].startswith("text/plain")
+    finally:
+        get_metrics.cache_clear()
@@ -0,0 +1,88 @@
+# tests/test_openai_router.py
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.engine.state import ConversationState
+from app.llm.openai_router import ainterpret_with_openai, interpret_with_openai
+from app.llm.router_schema import Intent
+
+
+_COMPLETION = json.dumps(
+    {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "stub",
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps({"intent": "view_cart", "confidence": 0.9})},
+            }
+        ],
+    }
+).encode("utf-8")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(_COMPLETION)))
+        self.end_headers()
+        self.wfile.write(_COMPLETION)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def stub_openai(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_router_reuses_one_connection(stub_openai, monkeypatch):
+    # Distinct messages so every turn misses the router cache and hits the server.
+    for i in range(1000):
+        state = ConversationState(session_id="s", user_message=f"me apetece algo {i}")
+        assert interpret_with_openai(state).intent == Intent.VIEW_CART
+    assert stub_openai.connections == 1
+
+    # A config change rebuilds the client (and therefore opens a new connection).
+    monkeypatch.setenv("OPENAI_API_KEY", "rotated-key")
+    interpret_with_openai(ConversationState(session_id="s", user_message="otra cosa"))
+    assert stub_openai.connections == 2
+
+
+def test_async_router_reuses_one_connection(stub_openai):
+    async def run():
+        for i in range(200):
+            state = ConversationState(session_id="s", user_message=f"me apetece algo {i}")
+            assert (await ainterpret_with_openai(state)).intent == Intent.VIEW_CART
+
+    asyncio.run(run())
+    assert stub_openai.connections == 1
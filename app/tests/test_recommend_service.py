@@ -0,0 +1,22 @@
+# tests/test_recommend_service.py
+from app.services import recommend_products
+from app.utils.recommend_parsing import parse_recommend_slots
+
+
+def test_strict_match_is_sorted_by_price_and_limited():
+    products = recommend_products(["citrus"], None, None, 100, limit=3)
+    assert [p.id for p in products] == [311, 310]
+
+
+def test_audience_is_relaxed_to_unisex_when_strict_match_is_empty():
+    # No male leather perfume exists; the unisex one is returned instead.
+    products = recommend_products(["leather"], "male", None, None)
+    assert [p.id for p in products] == [315]
+    assert recommend_products(["leather"], "male", None, 100) == []
+
+
+def test_recommend_slots_report_families_in_order_of_appearance():
+    slots = parse_recommend_slots("algo afrutado, floral o amaderado (nada woodyish) para mujer de 40 a 70€", "es")
+    assert slots.families == ["fruity", "floral", "woody"]
+    assert slots.audience == "female"
+    assert (slots.min_price, slots.max_price) == (40.0, 70.0)
@@ -0,0 +1,113 @@
+# tests/test_router_cache.py
+import asyncio
+import threading
+
+from app.engine.state import ConversationState, Mode
+from app.llm import openai_router
+from app.llm.router_cache import RouterCache
+from app.llm.router_schema import Intent, RouterResult
+
+
+class _FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        content = RouterResult(intent=Intent.SHOW_CATALOG, confidence=0.9, family=["woody"]).model_dump_json()
+        message = type("Message", (), {"content": content})
+        choice = type("Choice", (), {"message": message})
+        return type("Response", (), {"choices": [choice]})
+
+
+class _FakeAsyncCompletions(_FakeCompletions):
+    async def create(self, **kwargs):
+        return super().create(**kwargs)
+
+
+def _client(completions):
+    return type("Client", (), {"chat": type("Chat", (), {"completions": completions})})
+
+
+def test_router_cache_is_off_by_default(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.delenv("ROUTER_CACHE_ENABLED", raising=False)
+    completions = _FakeCompletions()
+    monkeypatch.setattr(openai_router, "_get_client", lambda api_key: _client(completions))
+
+    for _ in range(2):
+        openai_router.interpret_with_openai(ConversationState(session_id="s", user_message="que perfumes teneis"))
+    assert completions.calls == 2
+    assert openai_router.get_router_cache() is None
+
+
+def test_router_results_are_cached_per_normalized_message_and_mode(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("ROUTER_CACHE_ENABLED", "true")
+    completions = _FakeCompletions()
+    monkeypatch.setattr(openai_router, "_get_client", lambda api_key: _client(completions))
+
+    catalog = ConversationState(session_id="s", user_message="¿Qué perfumes tenéis?")
+    first = openai_router.interpret_with_openai(catalog)
+    first.family.append("citrus")  # callers may mutate results freely
+
+    again = ConversationState(session_id="t", user_message="que perfumes  teneis")
+    assert openai_router.interpret_with_openai(again).family == ["woody"]
+    assert completions.calls == 1
+
+    # Same message in a different mode is a different entry.
+    in_cart = ConversationState(session_id="u", user_message="que perfumes teneis", mode=Mode.CART)
+    openai_router.interpret_with_openai(in_cart)
+    assert completions.calls == 2
+
+    stats = openai_router.get_router_cache().stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_router_cache_ttl_lru_and_persistence(tmp_path):
+    now = [0.0]
+    path = tmp_path / "router_cache.db"
+    cache = RouterCache(max_entries=2, ttl_seconds=10, path=path, clock=lambda: now[0])
+    result = RouterResult(intent=Intent.VIEW_CART, confidence=0.8)
+
+    cache.put("a", result)
+    cache.put("b", result)
+    cache.put("c", result)  # evicts "a" from memory; disk still has it
+    assert cache.stats()["entries"] == 2
+    assert cache.get("a").intent == Intent.VIEW_CART
+
+    # A new process (fresh memory) reads through to disk.
+    restarted = RouterCache(path=path, clock=lambda: now[0])
+    assert restarted.get("b").intent == Intent.VIEW_CART
+
+    now[0] = 11
+    assert cache.get("c") is None
+    assert restarted.get("b") is None
+
+
+def test_async_router_reads_and_writes_a_persistent_cache_off_the_event_loop(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("ROUTER_CACHE_ENABLED", "true")
+    monkeypatch.setenv("ROUTER_CACHE_PATH", str(tmp_path / "router_cache.db"))
+    completions = _FakeAsyncCompletions()
+    monkeypatch.setattr(openai_router, "_get_async_client", lambda api_key: _client(completions))
+
+    threads = []
+    for name in ("get", "put"):
+        original = getattr(RouterCache, name)
+
+        def traced(self, *args, _original=original, _name=name):
+            threads.append((_name, threading.current_thread()))
+            return _original(self, *args)
+
+        monkeypatch.setattr(RouterCache, name, traced)
+
+    async def run():
+        for _ in range(2):
+            state = ConversationState(session_id="s", user_message="que perfumes teneis")
+            assert (await openai_router.ainterpret_with_openai(state)).family == ["woody"]
+
+    asyncio.run(run())
+    assert completions.calls == 1
+    assert [name for name, _ in threads] == ["get", "put", "get"]
+    assert all(thread is not threading.main_thread() for _, thread in threads)
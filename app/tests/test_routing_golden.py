@@ -0,0 +1,110 @@
+# tests/test_routing_golden.py
+"""
+Golden-corpus check for the deterministic routing rules.
+
+`data/routing_corpus.txt` holds user messages (chat transcripts, test phrases
+and every rule keyword in several surroundings). `data/routing_golden.json`
+records, for each message and each starting context, which state fields
+`interpret_user_node` changed. Refactors of the rule pipeline must reproduce
+it exactly. Assistant replies are stored once in `replies` and referenced by
+index to keep the fixture small.
+
+Regenerate (only when a routing change is intended):
+    LLM_ROUTER_ENABLED=false python -m app.tests.test_routing_golden
+"""
+import json
+from pathlib import Path
+
+from app.engine.state import CartItem, ConversationState, Mode
+from app.graph.nodes.interpret import interpret_user_node
+
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+CORPUS_PATH = DATA_DIR / "routing_corpus.txt"
+GOLDEN_PATH = DATA_DIR / "routing_golden.json"
+
+
+def _contexts() -> dict[str, ConversationState]:
+    fresh = ConversationState(session_id="golden")
+
+    cart = ConversationState(session_id="golden", preferred_language="es", mode=Mode.CART)
+    cart.cart = [CartItem(product_id=301, qty=2), CartItem(product_id=306, qty=1)]
+    cart.selected_product_id = 301
+    cart.last_cart_product_ids = [301]
+
+    pending_choice = ConversationState(session_id="golden", preferred_language="es", mode=Mode.CART)
+    pending_choice.cart = [CartItem(product_id=301, qty=2), CartItem(product_id=306, qty=1)]
+    pending_choice.pending_product_op = "remove"
+    pending_choice.candidate_products = [301, 306]
+
+    pending_recommend = ConversationState(session_id="golden", preferred_language="en")
+    pending_recommend.pending_recommend_clarification = True
+
+    return {
+        "fresh": fresh,
+        "cart": cart,
+        "pending_choice": pending_choice,
+        "pending_recommend": pending_recommend,
+    }
+
+
+def _route(context: ConversationState, message: str) -> dict:
+    """Run the rules on a copy of `context` and return the fields that changed."""
+    state = context.model_copy(deep=True)
+    state.user_message = message
+    before = state.model_dump(mode="json")
+    after = interpret_user_node(state).model_dump(mode="json")
+    return {k: v for k, v in after.items() if before.get(k) != v}
+
+
+def _corpus() -> list[str]:
+    return [line for line in CORPUS_PATH.read_text(encoding="utf-8").split("\n") if line]
+
+
+def _compute(replies: list[str]) -> dict[str, list[dict]]:
+    """Route the corpus in every context; replies are interned into `replies`."""
+    index = {reply: i for i, reply in enumerate(replies)}
+    contexts = list(_contexts().values())
+    cases: dict[str, list[dict]] = {}
+    for msg in _corpus():
+        row = []
+        for ctx in contexts:
+            diff = _route(ctx, msg)
+            if "assistant_message" in diff:
+                reply = diff["assistant_message"]
+                if reply not in index:
+                    index[reply] = len(replies)
+                    replies.append(reply)
+                diff["assistant_message"] = index[reply]
+            row.append(diff)
+        cases[msg] = row
+    return cases
+
+
+def test_routing_matches_golden_corpus():
+    golden = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+    assert golden["contexts"] == list(_contexts())
+
+    current = _compute(list(golden["replies"]))
+    assert current.keys() == golden["cases"].keys()
+
+    mismatches = [msg for msg, row in golden["cases"].items() if current[msg] != row]
+    assert not mismatches, f"{len(mismatches)} routing changes, e.g. {mismatches[:5]}"
+
+
+def _write_golden() -> None:
+    replies: list[str] = []
+    cases = _compute(replies)
+    lines = [json.dumps(msg, ensure_ascii=False) + ": " + json.dumps(row, ensure_ascii=False, sort_keys=True)
+             for msg, row in cases.items()]
+    GOLDEN_PATH.write_text(
+        "{\n"
+        f'"contexts": {json.dumps(list(_contexts()))},\n'
+        f'"replies": {json.dumps(replies, ensure_ascii=False, indent=0)},\n'
+        '"cases": {\n' + ",\n".join(lines) + "\n}\n}\n",
+        encoding="utf-8",
+    )
+
+
+if __name__ == "__main__":
+    _write_golden()
@@ -0,0 +1,20 @@
+# tests/test_search_tools.py
+from app.tools import tool_find_products_by_name
+
+
+def test_single_brand_token_returns_all_brand_products():
+    assert tool_find_products_by_name("añade chanel") == [302, 307]
+    # Accent-insensitive brand match.
+    assert tool_find_products_by_name("hermes") == [305]
+
+
+def test_name_search_is_accent_and_typo_tolerant():
+    assert tool_find_products_by_name("Añádeme el Acqua di Gio al carrito") == [303]
+    assert tool_find_products_by_name("acqua di giò") == [303]
+    assert tool_find_products_by_name("flowrbomb") == [319]
+
+
+def test_ties_are_returned_and_noise_is_ignored():
+    assert sorted(tool_find_products_by_name("the one")) == [311, 318]
+    assert tool_find_products_by_name("añade 1 del 301") == []
+    assert tool_find_products_by_name("quiero comprar algo") == []
@@ -0,0 +1,135 @@
+# tests/test_session_store.py
+import sqlite3
+import time
+
+import pytest
+
+from app.engine.service import ChatEngine
+from app.engine.sqlite_store import SqliteSessionStore
+from app.engine.state import ConversationState, Mode
+
+
+def test_sqlite_store_round_trip_and_reset(tmp_path):
+    store = SqliteSessionStore(tmp_path / "sessions.db")
+    try:
+        assert store.get("s1") is None
+
+        state = ConversationState(session_id="s1", preferred_language="en")
+        state.mode = Mode.CART
+        store.set(state)
+
+        loaded = store.get("s1")
+        assert loaded is not None
+        assert loaded.preferred_language == "en"
+        assert loaded.mode == Mode.CART
+
+        store.reset("s1")
+        assert store.get("s1") is None
+    finally:
+        store.close()
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    db = tmp_path / "sessions.db"
+    a = SqliteSessionStore(db)
+    b = SqliteSessionStore(db)
+    try:
+        a.set(ConversationState(session_id="s1", preferred_language="es"))
+        assert b.get("s1").preferred_language == "es"
+
+        # A newer write from another instance must invalidate b's cached copy.
+        a.set(ConversationState(session_id="s1", preferred_language="en"))
+        assert b.get("s1").preferred_language == "en"
+
+        b.reset("s1")
+        assert a.get("s1") is None
+    finally:
+        a.close()
+        b.close()
+
+
+def test_engine_with_sqlite_store_survives_restart(tmp_path):
+    db = tmp_path / "sessions.db"
+    store = SqliteSessionStore(db)
+    engine = ChatEngine(store=store)
+    engine.start_session("s1")
+    state = engine.process_turn("s1", "añade 1 del 301")
+    assert [item.product_id for item in state.cart] == [301]
+    store.close()
+
+    # A fresh engine (e.g. another worker) continues the same conversation.
+    store = SqliteSessionStore(db)
+    try:
+        state = ChatEngine(store=store).process_turn("s1", "ver carrito")
+        assert [(item.product_id, item.qty) for item in state.cart] == [(301, 1)]
+    finally:
+        store.close()
+
+
+def test_sqlite_reset_with_a_queued_write_does_not_hang(tmp_path):
+    import threading
+
+    store = SqliteSessionStore(tmp_path / "sessions.db", durable_writes=False)
+    resetter = threading.Thread(target=store.reset, args=("s1",), daemon=True)
+    try:
+        # Block the writer on a first batch so the write of "s1" stays queued.
+        with store._db_lock:
+            store.set(ConversationState(session_id="other"))
+            time.sleep(0.05)
+            store.set(ConversationState(session_id="s1"))
+            assert "s1" in store._pending
+            resetter.start()
+            time.sleep(0.05)
+        resetter.join(timeout=5)
+        assert not resetter.is_alive()
+
+        assert store.get("s1") is None
+        assert store.get("other") is not None
+        store.flush()
+    finally:
+        if not resetter.is_alive():  # a hung reset holds the store's condition
+            store.close()
+
+    reopened = SqliteSessionStore(tmp_path / "sessions.db")
+    try:
+        assert reopened.get("s1") is None and reopened.get("other") is not None
+    finally:
+        reopened.close()
+
+
+class _FailingConnection:
+    """Connection proxy whose next write batches fail like a full disk would."""
+
+    def __init__(self, conn, failures):
+        self._conn = conn
+        self.failures = failures
+
+    def executemany(self, sql, rows):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database or disk is full")
+        return self._conn.executemany(sql, rows)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_sqlite_failed_batch_is_reported_once_and_close_still_shuts_down(tmp_path):
+    store = SqliteSessionStore(tmp_path / "sessions.db", durable_writes=False)
+    conn = store._conn = _FailingConnection(store._conn, failures=1)
+    store.set(ConversationState(session_id="s1"))
+    with pytest.raises(RuntimeError, match="Failed to persist"):
+        store.flush()
+    store.flush()  # already reported: nothing newer to wait for
+
+    store.set(ConversationState(session_id="s2"))
+    store.flush()
+    assert store.get("s1") is None and store.get("s2") is not None
+
+    conn.failures = 1
+    store.set(ConversationState(session_id="s3"))
+    with pytest.raises(RuntimeError, match="Failed to persist"):
+        store.close()
+    assert not store._writer.is_alive()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
@@ -0,0 +1,77 @@
+# tests/test_state_codec.py
+import zlib
+
+import pytest
+
+from app.engine import state_codec
+from app.engine.sqlite_store import _decode_state
+from app.engine.state import CartItem, ConversationState, Mode
+from app.engine.state_codec import STATE_TAGS, TRANSIENT_FIELDS, decode_state, encode_state
+from app.services import get_product_by_id
+from app.services.catalog_index import CatalogIndex
+
+
+def _persistent(state: ConversationState) -> dict:
+    return state.model_dump(exclude=set(TRANSIENT_FIELDS))
+
+
+def test_round_trip_over_a_conversation(engine):
+    engine.start_session("codec")
+    for message in ["ver el catálogo", "añade 2 del 301", "Recomiéndame algo cítrico", "Finalizar compra", "si"]:
+        state = engine.process_turn("codec", message)
+        blob = encode_state(state)
+        assert _persistent(decode_state(blob)) == _persistent(state)
+        assert len(blob) < len(state.model_dump_json())
+
+
+def test_products_round_trip_as_saved_whatever_the_catalog(monkeypatch):
+    repriced = get_product_by_id(301).model_copy(update={"price": 1.5, "stock": 0})
+    gone = get_product_by_id(306).model_copy(update={"id": 999, "description": None})
+    state = ConversationState(session_id="p", ui_products=[repriced, gone], ui_product=repriced)
+    blob = encode_state(state)
+
+    # Decoding never consults the catalog: neither an empty one nor the live one changes the cards.
+    monkeypatch.setattr("app.services.catalog_service.get_catalog_index", lambda: CatalogIndex([]))
+    decoded = decode_state(blob)
+    assert decoded.ui_products == [repriced, gone]
+    assert decoded.ui_product == repriced
+
+
+def test_version_1_product_ids_are_dropped():
+    body = bytearray()
+    state_codec._write_varint(body, 3)
+    for tag, value in [(STATE_TAGS["session_id"], "old"), (STATE_TAGS["ui_products"], [301, 306]), (STATE_TAGS["ui_product"], 301)]:
+        state_codec._write_varint(body, tag)
+        state_codec._write(body, value)
+
+    decoded = decode_state(state_codec.MAGIC + bytes((1, 0)) + bytes(body))
+    assert decoded.session_id == "old"
+    assert decoded.ui_products == [] and decoded.ui_product is None
+
+
+def test_every_field_is_tagged_or_transient():
+    fields = set(ConversationState.model_fields)
+    assert fields == set(STATE_TAGS) | TRANSIENT_FIELDS
+    assert len(set(STATE_TAGS.values())) == len(STATE_TAGS)
+
+
+def test_unknown_tags_are_skipped_and_newer_versions_rejected():
+    body = bytearray()
+    state_codec._write_varint(body, 3)
+    for tag, value in [(STATE_TAGS["session_id"], "fwd"), (999, {"future": [1, 2.5, None]}), (STATE_TAGS["mode"], "cart")]:
+        state_codec._write_varint(body, tag)
+        state_codec._write(body, value)
+    blob = state_codec.MAGIC + bytes((state_codec.VERSION, 0)) + bytes(body)
+
+    decoded = decode_state(blob)
+    assert decoded.session_id == "fwd" and decoded.mode == Mode.CART
+
+    with pytest.raises(ValueError):
+        decode_state(state_codec.MAGIC + bytes((state_codec.VERSION + 1, 0)) + bytes(body))
+
+
+def test_sqlite_store_reads_legacy_json_rows():
+    state = ConversationState(session_id="legacy", cart=[CartItem(product_id=301, qty=2)])
+    legacy = zlib.compress(state.model_dump_json(exclude_defaults=True).encode("utf-8"))
+    assert _decode_state(legacy) == state
+    assert _decode_state(encode_state(state)) == state
@@ -0,0 +1,47 @@
+# tests/test_turn_context.py
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.engine import service
+from app.engine.service import ChatEngine
+from app.utils import parse_cart_commands_by_name
+from app.utils.turn_context import current_turn, turn_scope
+
+
+CORPUS_PATH = Path(__file__).resolve().parent / "data" / "routing_corpus.txt"
+
+
+def test_parsers_run_at_most_once_per_turn(monkeypatch):
+    contexts = []
+
+    @contextmanager
+    def recording_scope():
+        with turn_scope() as ctx:
+            contexts.append(ctx)
+            yield ctx
+
+    monkeypatch.setattr(service, "turn_scope", recording_scope)
+    engine = ChatEngine(executor="direct")
+    messages = [m for m in CORPUS_PATH.read_text(encoding="utf-8").splitlines() if m.strip()]
+    for i, message in enumerate(messages):
+        engine.process_turn(f"scratch-{i // 12}", message)
+
+    assert len(contexts) == len(messages)
+    for message, ctx in zip(messages, contexts):
+        # Name search also runs on per-action hints; every parser sees only the user message.
+        parsers = {name: n for name, n in ctx.runs.items() if name != "tool_find_products_by_name"}
+        assert all(n == 1 for n in parsers.values()), (message, ctx.runs)
+    assert sum(sum(ctx.hits.values()) for ctx in contexts) > 0
+    assert current_turn() is None
+
+
+def test_cached_lists_are_not_shared_between_callers():
+    with turn_scope() as ctx:
+        ids, names = parse_cart_commands_by_name("añade 2 del 310 y quita el perfume bleu")
+        ids.append("mutated")
+        names.clear()
+        again = parse_cart_commands_by_name("añade 2 del 310 y quita el perfume bleu")
+
+    assert ctx.runs == {"parse_cart_commands_by_name": 1}
+    assert ctx.hits == {"parse_cart_commands_by_name": 1}
+    assert len(again[0]) == 1 and len(again[1]) == 1
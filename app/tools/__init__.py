@@ -1,5 +1,12 @@
 from .catalog_tools import tool_get_product, tool_list_catalog
-from .cart_tools import tool_add_to_cart, tool_cart_total, tool_remove_from_cart, tool_set_cart_qty
+from .cart_tools import (
+    tool_add_to_cart,
+    tool_bulk_update_cart,
+    tool_cart_total,
+    tool_checkout_cart,
+    tool_remove_from_cart,
+    tool_set_cart_qty,
+)
 from .recommend_tools import tool_recommend_products
 from .search_tools import tool_find_products_by_name
 
@@ -19,5 +26,7 @@ __all__ = [
     "tool_cart_total",
     "tool_recommend_products",
     "tool_find_products_by_name",
-    "tool_set_cart_qty"
+    "tool_set_cart_qty",
+    "tool_bulk_update_cart",
+    "tool_checkout_cart",
 ]
@@ -1,8 +1,17 @@
 from __future__ import annotations
 
-from app.engine.state import ConversationState, CartItem
+from app.domain.product import Product
+from app.engine.state import ConversationState
+from app.llm.router_schema import CartAction
 from app.tools.catalog_tools import tool_get_product
-from app.services.cart_service import calculate_cart_total
+from app.services.cart_service import (
+    CartActionResult,
+    apply_cart_actions,
+    calculate_cart_total,
+    checkout_cart,
+    get_cart,
+    reserve_stock,
+)
 
 
 def tool_cart_total(state: ConversationState) -> float:
@@ -10,6 +19,7 @@ def tool_cart_total(state: ConversationState) -> float:
     Compute the current cart total.
 
     Delegates the calculation to the cart service to keep pricing logic centralized.
+    The cart keeps a running total, so this is O(1) after the first call.
     """
     return calculate_cart_total(state)
 
@@ -32,22 +42,16 @@ def tool_set_cart_qty(
     if not product:
         return False, 0
 
+    cart = get_cart(state)
     if qty <= 0:
         # Remove item entirely if present.
-        for i, item in enumerate(state.cart):
-            if item.product_id == product_id:
-                state.cart.pop(i)
-                return True, 0
+        reserve_stock(state, product, 0)
+        cart.set_qty(product_id, 0, product.price)
         return True, 0
 
     # Clamp requested quantity to available stock.
-    new_qty = min(qty, product.stock)
-
-    existing = next((x for x in state.cart if x.product_id == product_id), None)
-    if existing:
-        existing.qty = new_qty
-    else:
-        state.cart.append(CartItem(product_id=product_id, qty=new_qty))
+    new_qty = reserve_stock(state, product, qty)
+    cart.set_qty(product_id, new_qty, product.price)
 
     return True, new_qty
 
@@ -69,19 +73,17 @@ def tool_add_to_cart(
     if not product:
         return False, 0
 
-    existing = next((x for x in state.cart if x.product_id == product_id), None)
+    cart = get_cart(state)
+    existing = cart.line(product_id)
     current = existing.qty if existing else 0
 
-    can_add = max(0, product.stock - current)
-    added = min(qty, can_add)
+    # Clamp to available stock (and reserve it when an inventory ledger is enabled).
+    added = reserve_stock(state, product, current + qty) - current
 
     if added <= 0:
         return False, 0
 
-    if existing:
-        existing.qty += added
-    else:
-        state.cart.append(CartItem(product_id=product_id, qty=added))
+    cart.set_qty(product_id, current + added, product.price)
 
     return True, added
 
@@ -99,12 +101,40 @@ def tool_remove_from_cart(
     if qty < 1:
         return False, 0
 
-    for i, item in enumerate(state.cart):
-        if item.product_id == product_id:
-            removed = min(qty, item.qty)
-            item.qty -= removed
-            if item.qty == 0:
-                state.cart.pop(i)
-            return True, removed
+    cart = get_cart(state)
+    item = cart.line(product_id)
+    if item is None:
+        return False, 0
+
+    removed = min(qty, item.qty)
+    # A product dropped from the catalog has no price (the total is then recomputed)
+    # and no stock to give back.
+    product = tool_get_product(product_id)
+    if product:
+        reserve_stock(state, product, item.qty - removed)
+    cart.set_qty(product_id, item.qty - removed, product.price if product else None)
+    return True, removed
+
+
+def tool_bulk_update_cart(
+    state: ConversationState,
+    actions: list[CartAction],
+) -> list[CartActionResult]:
+    """
+    Apply a bulk-cart batch as one transaction, with a per-action outcome report.
+
+    Delegates to `apply_cart_actions` in the cart service (netting per product,
+    one stock check per product, all-or-nothing write).
+    """
+    return apply_cart_actions(state, actions)
+
 
-    return False, 0
+def tool_checkout_cart(state: ConversationState) -> list[tuple[Product, int, int]]:
+    """
+    Complete the order for the current cart and empty it.
+
+    With an inventory ledger the cart is held again and committed as sales; if a
+    line is short of stock nothing is sold and the short lines are returned as
+    `(product, qty in cart, units available)` (see `checkout_cart`).
+    """
+    return checkout_cart(state)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Optional
 
 from app.domain.product import Product
-from app.services.catalog_service import get_catalog, get_product_by_id
+from app.services.catalog_service import get_catalog_index
 
 
 def tool_list_catalog() -> list[Product]:
@@ -12,7 +12,7 @@ def tool_list_catalog() -> list[Product]:
 
     This tool provides read-only access to the catalog for graph nodes.
     """
-    return get_catalog()
+    return get_catalog_index().products
 
 
 def tool_get_product(product_id: int) -> Optional[Product]:
@@ -21,4 +21,4 @@ def tool_get_product(product_id: int) -> Optional[Product]:
 
     Returns None if the product does not exist.
     """
-    return get_product_by_id(product_id)
+    return get_catalog_index().get(product_id)
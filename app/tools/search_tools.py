@@ -3,8 +3,9 @@ from __future__ import annotations
 import re
 from typing import List
 
-from app.domain.product import Product
-from app.tools.catalog_tools import tool_list_catalog
+from app.services.catalog_service import get_search_index
+from app.utils.text import fold_text, word_tokens
+from app.utils.turn_context import turn_cached
 
 
 """
@@ -25,53 +26,42 @@ _STOPWORDS = {
     "show", "me", "my", "please", "pls", "ur", "u", "want", "would", "like",
 }
 
+# Query tokens are folded before the stopword check, so fold the list once.
+_FOLDED_STOPWORDS = {fold_text(w) for w in _STOPWORDS}
 
-def tool_find_products_by_name(query: str, limit: int = 5) -> List[int]:
+_NUMBER_RE = re.compile(r"\b\d+\b")
+
+
+def _query_tokens(query: str) -> list[str]:
     """
-    Return product IDs whose brand or name best match tokens extracted from the query.
+    Extract search tokens from a free-text query.
 
-    The function applies simple token-based scoring and returns only the
-    highest-scoring matches (ties allowed).
+    Numeric tokens (product IDs, quantities), punctuation, stopwords and very
+    short tokens are dropped to reduce false positives.
     """
-    text = (query or "").lower().strip()
-    if not text:
-        return []
+    text = _NUMBER_RE.sub(" ", fold_text((query or "").strip()))
+    return [t for t in word_tokens(text) if len(t) >= 3 and t not in _FOLDED_STOPWORDS]
 
-    # Remove numeric tokens (e.g. product IDs or quantities) and punctuation.
-    text = re.sub(r"\b\d+\b", " ", text)
-    tokens = [t for t in re.split(r"\s+", text) if t and t not in _STOPWORDS]
 
-    # Ignore very short tokens to reduce false positives.
-    tokens = [t for t in tokens if len(t) >= 3]
+@turn_cached("tool_find_products_by_name")
+def tool_find_products_by_name(query: str, limit: int = 5) -> List[int]:
+    """
+    Return product IDs whose brand or name best match tokens extracted from the query.
 
+    Matching is accent-insensitive and tolerates small typos. Only the products
+    matching the most query tokens are returned (ties allowed), ordered by
+    relevance. See `ProductSearchIndex` for the scoring details.
+    """
+    tokens = _query_tokens(query)
     if not tokens:
         return []
 
-    catalog = tool_list_catalog()
+    index = get_search_index()
 
     # If a single token is provided, prioritize exact brand matches.
     if len(tokens) == 1:
-        tok = tokens[0]
-        brand_hits = [p.id for p in catalog if (p.brand or "").lower() == tok]
+        brand_hits = index.brand_matches(tokens[0])
         if brand_hits:
             return brand_hits[:limit]
 
-    scored: list[tuple[int, Product]] = []
-
-    for p in catalog:
-        hay = f"{p.brand or ''} {p.name}".lower()
-
-        # Token-in-string scoring.
-        score = sum(1 for tok in tokens if tok in hay)
-        if score > 0:
-            scored.append((score, p))
-
-    if not scored:
-        return []
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-
-    best_score = scored[0][0]
-    best = [p.id for s, p in scored if s == best_score]
-
-    return best[:limit]
+    return index.search(tokens, limit=limit)
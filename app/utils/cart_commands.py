@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-import re
 from typing import List, Optional
 
 from app.llm.router_schema import CartAction, CartOp
 
+from .cart_lexer import lex_cart_message, fragment_op
+from .turn_context import turn_cached
+
 
 """
 Deterministic cart command parser (ES/EN).
@@ -15,55 +17,29 @@ Parses multi-action messages such as:
 
 Supports "verb carry-over": if a fragment has no explicit operation verb,
 it inherits the last detected operation.
-"""
 
-# Split on common separators and conjunctions (ES/EN).
-_SPLIT_RE = re.compile(
-    r"(?:,|;|\n|\s*\by\b\s*|\s*\band\b\s*)",
-    flags=re.IGNORECASE,
-)
-
-# Detect optional quantity + product id (3 digits).
-# Examples:
-# - "3 del 310"
-# - "add 2 of 310"
-# - "remove 3 x 310"
-# - "310"  -> qty defaults to 1
-_QTY_ID_RE = re.compile(
-    r"\b(?:(?P<qty>\d+)\s*(?:x|of|del|de|units?|productos?)\s*)?(?P<id>\d{3})\b",
-    flags=re.IGNORECASE,
-)
-
-_ADD_KEYWORDS = [
-    "add", "añade", "añademe", "añádeme", "agrega", "agrégame",
-    "mete", "pon", "quiero", "llévame", "lleva", "buy", "take", "purchase",
-]
-
-_REMOVE_KEYWORDS = [
-    "remove", "quita", "quítame", "quitame", "quiteme", "elimina", "saca",
-    "borra", "delete", "drop",
-]
+The message is tokenized once by `app.utils.cart_lexer` (shared with
+`parse_cart_commands_by_name`); fragments are split at `,` `;` newlines and
+every "y"/"and".
+"""
 
 
+@turn_cached("parse_cart_commands")
 def parse_cart_commands(text: str) -> List[CartAction]:
     """
     Parse a user message into a list of cart actions (ADD/REMOVE).
+
+    Each fragment contributes its first "[qty <x|of|de|del|...>] id" phrase;
+    qty defaults to 1.
     """
     if not text:
         return []
 
-    text = text.lower()
-    parts = _SPLIT_RE.split(text)
-
     actions: List[CartAction] = []
     last_op: Optional[CartOp] = None
 
-    for part in parts:
-        part = part.strip()
-        if not part:
-            continue
-
-        op = _detect_op(part)
+    for _, _, tokens in lex_cart_message(text).fragments(loose_conj=True):
+        op = fragment_op(tokens)
 
         # Carry-over rule: inherit the last operation if none is present.
         if op is None:
@@ -74,10 +50,11 @@ def parse_cart_commands(text: str) -> List[CartAction]:
         if op is None:
             continue
 
-        qty, product_id = _extract_qty_and_id(part)
-        if product_id is None:
+        pair = next((tok.value for tok in tokens if tok.kind == "pair"), None)
+        if pair is None:
             continue
 
+        qty, product_id = pair
         actions.append(
             CartAction(
                 op=op,
@@ -87,23 +64,3 @@ def parse_cart_commands(text: str) -> List[CartAction]:
         )
 
     return actions
-
-
-def _detect_op(fragment: str) -> Optional[CartOp]:
-    """Infer whether a fragment represents an ADD or REMOVE operation."""
-    if any(k in fragment for k in _REMOVE_KEYWORDS):
-        return CartOp.REMOVE
-    if any(k in fragment for k in _ADD_KEYWORDS):
-        return CartOp.ADD
-    return None
-
-
-def _extract_qty_and_id(fragment: str) -> tuple[Optional[int], Optional[int]]:
-    """Extract (qty, product_id) from a text fragment."""
-    m = _QTY_ID_RE.search(fragment)
-    if not m:
-        return None, None
-
-    qty = int(m.group("qty")) if m.group("qty") else None
-    product_id = int(m.group("id"))
-    return qty, product_id
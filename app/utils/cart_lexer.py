@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from app.llm.router_schema import CartOp
+
+from .message_features import _trie_pattern
+
+
+"""
+Single-pass lexer shared by the deterministic cart command parsers.
+
+`parse_cart_commands` (ids only) and `parse_cart_commands_by_name` (ids or
+product names) used to split the same message with their own separators and
+scan every fragment for every verb keyword. `lex_cart_message` now turns a
+message into one token stream, and both parsers are small derivations over it:
+- `sep`:  hard separator (`,` `;` newline),
+- `conj`: the words "y"/"and" (`value`: True when surrounded by whitespace),
+- `verb`: a cart verb keyword starting here (`value`: `VERB_ADD`/`VERB_REMOVE`
+  bits of the longest keyword at this position and of its prefixes),
+- `pair`: "[qty <x|of|de|del|unit(s)|producto(s)>] id" (`value`: (qty or None, id)),
+- `num`:  a digit run (`value`: True if it is a standalone `\\b\\d+\\b` token);
+  the digits of a `pair` are reported as `num` tokens too.
+
+Rationale:
+- One compiled scanner visits the text once; verbs are matched by a
+  trie-shaped regex inside a lookahead (as in `message_features`), which keeps
+  the substring semantics of `k in fragment` for every keyword.
+- Streams are memoized per message, so routing rules and nodes that parse the
+  same message in one turn share a single lexing pass.
+- Both parsers use the same verb vocabulary (`ADD_KEYWORDS`/`REMOVE_KEYWORDS`).
+"""
+
+ADD_KEYWORDS: tuple[str, ...] = (
+    "add", "añade", "anade", "añadir", "añademe", "añádeme", "anademe", "añadme", "anadme",
+    "agrega", "agrégame", "agregame", "mete", "meteme", "pon", "quiero", "llévame", "lleva",
+    "buy", "take", "purchase",
+)
+REMOVE_KEYWORDS: tuple[str, ...] = (
+    "remove", "quita", "quitar", "quítame", "quitame", "quiteme", "elimina", "saca", "borra",
+    "delete", "drop",
+)
+
+VERB_ADD = 1
+VERB_REMOVE = 2
+
+
+def _verb_masks() -> dict[str, int]:
+    own: dict[str, int] = {}
+    for keywords, bit in ((ADD_KEYWORDS, VERB_ADD), (REMOVE_KEYWORDS, VERB_REMOVE)):
+        for kw in keywords:
+            own[kw] = own.get(kw, 0) | bit
+    # The lookahead reports the longest keyword at a position; its prefixes occur there too.
+    return {kw: _prefix_mask(kw, own) for kw in own}
+
+
+def _prefix_mask(kw: str, own: dict[str, int]) -> int:
+    mask = 0
+    for i in range(1, len(kw) + 1):
+        mask |= own.get(kw[:i], 0)
+    return mask
+
+
+def _verb_trie() -> dict:
+    trie: dict = {}
+    for kw in (*ADD_KEYWORDS, *REMOVE_KEYWORDS):
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return trie
+
+
+_VERB_MASKS = _verb_masks()
+
+# Alternatives are tried in this order at every position. Whitespace inside a
+# `pair` excludes newlines, which are separators.
+_SCAN_RE = re.compile(
+    r"(?P<sep>[,;\n])"
+    r"|(?P<conj>\b(?:y|and)\b)"
+    r"|(?P<pair>\b(?:(?P<qty>\d+)[^\S\n]*(?:x|of|del|de|units?|productos?)[^\S\n]*)?(?P<id>\d{3})\b)"
+    r"|(?P<num>\d+)"
+    rf"|(?=(?P<verb>{_trie_pattern(_verb_trie())}))"
+)
+_WORD_CHAR_RE = re.compile(r"\w")
+
+
+@dataclass(frozen=True)
+class CartToken:
+    """One lexical token of a cart message (see module notes for `kind`/`value`)."""
+    kind: str
+    start: int
+    end: int
+    value: object = None
+
+
+@dataclass(frozen=True)
+class CartLex:
+    """Token stream of a lowercased message."""
+    text: str
+    tokens: tuple[CartToken, ...]
+
+    def fragments(self, loose_conj: bool) -> list[tuple[int, int, list[CartToken]]]:
+        """
+        Split into non-blank (start, end, tokens) fragments at separators.
+
+        Every "y"/"and" splits with `loose_conj`; otherwise only whitespace-delimited
+        ones do (`conj` tokens that do not split stay inside their fragment).
+        """
+        out: list[tuple[int, int, list[CartToken]]] = []
+        start = 0
+        current: list[CartToken] = []
+        for tok in self.tokens:
+            if tok.kind == "sep" or (tok.kind == "conj" and (loose_conj or tok.value)):
+                out.append((start, tok.start, current))
+                start, current = tok.end, []
+            else:
+                current.append(tok)
+        out.append((start, len(self.text), current))
+        return [f for f in out if not self.text[f[0]:f[1]].isspace() and f[0] < f[1]]
+
+
+def _bounded(text: str, start: int, end: int) -> bool:
+    return not (
+        (start > 0 and _WORD_CHAR_RE.match(text, start - 1))
+        or (end < len(text) and _WORD_CHAR_RE.match(text, end))
+    )
+
+
+@lru_cache(maxsize=1024)
+def lex_cart_message(message: str) -> CartLex:
+    """Return the (cached) token stream of `message` (lowercased)."""
+    text = (message or "").lower()
+    tokens: list[CartToken] = []
+    for m in _SCAN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "verb":
+            kw = m.group("verb")
+            tokens.append(CartToken("verb", m.start(), m.start() + len(kw), _VERB_MASKS[kw]))
+        elif kind == "pair":
+            qty = m.group("qty")
+            tokens.append(CartToken("pair", m.start(), m.end(), (int(qty) if qty else None, int(m.group("id")))))
+            for group in ("qty", "id"):
+                if m.group(group):
+                    s, e = m.span(group)
+                    tokens.append(CartToken("num", s, e, _bounded(text, s, e)))
+        elif kind == "num":
+            tokens.append(CartToken("num", m.start(), m.end(), _bounded(text, m.start(), m.end())))
+        elif kind == "conj":
+            s, e = m.span()
+            spaced = s > 0 and text[s - 1].isspace() and e < len(text) and text[e].isspace()
+            tokens.append(CartToken("conj", s, e, spaced))
+        else:
+            tokens.append(CartToken("sep", m.start(), m.end()))
+    return CartLex(text, tuple(tokens))
+
+
+def fragment_op(tokens: list[CartToken]) -> Optional[CartOp]:
+    """REMOVE if any remove verb occurs in the fragment, else ADD if an add verb does."""
+    mask = 0
+    for tok in tokens:
+        if tok.kind == "verb":
+            mask |= tok.value
+    if mask & VERB_REMOVE:
+        return CartOp.REMOVE
+    if mask & VERB_ADD:
+        return CartOp.ADD
+    return None
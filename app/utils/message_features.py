@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import re
+import threading
+from functools import lru_cache
+from typing import Iterable, Optional
+
+
+"""
+Single-pass pre-analysis of a user message for the routing rules.
+
+Each rule used to lowercase `user_message` again and run its own
+`any(k in text for k in [...])` scans and regex searches, so one message was
+scanned dozens of times per turn. `analyze_message` now does the shared work
+once per distinct message:
+- lowercases/trims the text,
+- finds every registered keyword in one regex pass,
+- extracts the standalone numbers (`\\b\\d+\\b` tokens),
+and rules read the resulting `MessageFeatures`.
+
+Rationale:
+- Keywords stay next to the rule that uses them: a module declares
+  `KEYWORDS = keyword_set("name", [...])` at import time and later asks
+  `features.has(KEYWORDS)`. All sets are merged into one matcher.
+- Semantics are exactly those of `k in text` (substring, not word match):
+  the matcher is a trie-shaped regex inside a lookahead, so it reports the
+  longest keyword starting at every position; keywords that are prefixes of
+  that match also occur there and are added from a precomputed table.
+- Numbers are maximal digit runs delimited by non-word characters, which is
+  what every `\\b\\d{n}\\b` / `\\b(\\d+)\\b` search in the rules matches.
+"""
+
+_NUMBER_RE = re.compile(r"\b\d+\b")
+
+
+class KeywordSet:
+    """A named group of substring keywords registered with the shared matcher."""
+
+    __slots__ = ("name", "keywords", "bit")
+
+    def __init__(self, name: str, keywords: tuple[str, ...], bit: int) -> None:
+        self.name = name
+        self.keywords = keywords
+        self.bit = bit
+
+    def __repr__(self) -> str:
+        return f"KeywordSet({self.name!r}, {len(self.keywords)} keywords)"
+
+
+class _Matcher:
+    """Compiled form of every registered keyword set."""
+
+    __slots__ = ("pattern", "masks")
+
+    def __init__(self, sets: list[KeywordSet]) -> None:
+        own: dict[str, int] = {}
+        for ks in sets:
+            for kw in ks.keywords:
+                if kw:
+                    own[kw] = own.get(kw, 0) | ks.bit
+
+        # A match of `kw` at a position implies every keyword that is a prefix of `kw`.
+        masks: dict[str, int] = {}
+        for kw in own:
+            mask = 0
+            for i in range(1, len(kw) + 1):
+                mask |= own.get(kw[:i], 0)
+            masks[kw] = mask
+
+        trie: dict = {}
+        for kw in own:
+            node = trie
+            for ch in kw:
+                node = node.setdefault(ch, {})
+            node[""] = True
+
+        self.pattern = re.compile(f"(?=({_trie_pattern(trie)}))", re.DOTALL) if own else None
+        self.masks = masks
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex for a trie node; greedy optional groups make the longest keyword win."""
+    alternatives = [re.escape(ch) + _trie_pattern(child) for ch, child in node.items() if ch != ""]
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+_registry: list[KeywordSet] = []
+_registry_lock = threading.Lock()
+_matcher: Optional[_Matcher] = None
+
+
+def keyword_set(name: str, keywords: Iterable[str]) -> KeywordSet:
+    """
+    Register a keyword group with the shared matcher and return its handle.
+
+    Intended to be called at module import time.
+    """
+    global _matcher
+    with _registry_lock:
+        ks = KeywordSet(name, tuple(keywords), 1 << len(_registry))
+        _registry.append(ks)
+        _matcher = None
+    analyze_message.cache_clear()
+    return ks
+
+
+def _get_matcher() -> _Matcher:
+    global _matcher
+    with _registry_lock:
+        if _matcher is None:
+            _matcher = _Matcher(_registry)
+        return _matcher
+
+
+class MessageFeatures:
+    """
+    Pre-analysis of one user message (immutable, shared between rules).
+
+    - raw: the message as received.
+    - text: trimmed, lowercased message (what rules match against).
+    - numbers: standalone digit tokens of `text`, in order.
+    - raw_numbers: the same tokens computed on `raw` (identical for ASCII input).
+    """
+
+    __slots__ = ("raw", "text", "numbers", "raw_numbers", "_mask", "_searches")
+
+    def __init__(self, raw: str) -> None:
+        self.raw = raw
+        self.text = raw.strip().lower()
+
+        matcher = _get_matcher()
+        mask = 0
+        if matcher.pattern is not None:
+            for m in matcher.pattern.finditer(self.text):
+                mask |= matcher.masks[m.group(1)]
+        self._mask = mask
+
+        self.numbers: tuple[str, ...] = tuple(_NUMBER_RE.findall(self.text))
+        # Lowercasing can change word boundaries only for a few non-ASCII characters.
+        self.raw_numbers: tuple[str, ...] = (
+            self.numbers if raw.isascii() else tuple(_NUMBER_RE.findall(raw))
+        )
+        self._searches: dict[re.Pattern[str], Optional[re.Match[str]]] = {}
+
+    def has(self, keywords: KeywordSet) -> bool:
+        """True if any keyword of the set occurs in `text` (substring semantics)."""
+        return bool(self._mask & keywords.bit)
+
+    def search(self, pattern: re.Pattern[str]) -> Optional[re.Match[str]]:
+        """`pattern.search(text)`, memoized so rules sharing a regex scan once."""
+        try:
+            return self._searches[pattern]
+        except KeyError:
+            m = self._searches[pattern] = pattern.search(self.text)
+            return m
+
+    @property
+    def has_product_id(self) -> bool:
+        """A standalone 3-digit number (catalog product id convention)."""
+        return any(len(n) == 3 for n in self.numbers)
+
+    @property
+    def first_number(self) -> Optional[int]:
+        """First standalone number in the message, if any."""
+        return int(self.numbers[0]) if self.numbers else None
+
+    @property
+    def first_small_number(self) -> Optional[int]:
+        """First standalone 1-2 digit number (a quantity rather than an id)."""
+        return next((int(n) for n in self.numbers if len(n) <= 2), None)
+
+    @property
+    def raw_has_product_id(self) -> bool:
+        """`has_product_id` evaluated on the raw message."""
+        return any(len(n) == 3 for n in self.raw_numbers)
+
+    @property
+    def raw_has_short_number(self) -> bool:
+        """A standalone 1-3 digit number in the raw message (a selection or quantity)."""
+        return any(len(n) <= 3 for n in self.raw_numbers)
+
+    def mentions_number(self, value: int) -> bool:
+        """True if `value` appears as a standalone number (e.g. a product id)."""
+        return str(value) in self.numbers
+
+
+@lru_cache(maxsize=1024)
+def analyze_message(text: str) -> MessageFeatures:
+    """Return the (cached) features of `text`."""
+    return MessageFeatures(text or "")
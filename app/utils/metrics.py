@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+
+
+"""
+Per-turn instrumentation exposed in the Prometheus text format.
+
+Records, for every turn:
+- evaluation time of each routing rule and which rule decided the turn,
+- execution time of each LangGraph node and of the whole turn,
+- LLM router calls: latency, outcome (ok / error / cache hit), token usage,
+  confidence, and failures by exception type.
+
+Rationale:
+- Self-contained (no `prometheus_client` dependency): a handful of labelled
+  histograms and counters rendered as text exposition format 0.0.4 on
+  `GET /metrics`.
+- Opt-in and zero cost when disabled: `get_metrics()` returns None unless
+  METRICS_ENABLED=true, the graph builder then registers the plain node
+  functions and the rule loop runs without timers.
+- Values are per process: with several uvicorn workers every scrape reaches
+  one worker, so scrape each worker (or run one per port) when aggregating.
+"""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket upper bounds, in seconds unless stated otherwise.
+RULE_BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3)
+NODE_BUCKETS = (1e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 0.1)
+TURN_BUCKETS = (5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LLM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000)
+CONFIDENCE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels (rendered with a `_total` suffix)."""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name}_total {self.help}", f"# TYPE {self.name}_total counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}_total{_labels(self.labelnames, labels)} {_fmt(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float], labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(sorted(buckets))
+        # labels -> [count per bucket (last one is +Inf)..., sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.bounds) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            cumulative = 0
+            for bound, n in zip(self.bounds, series):
+                cumulative += n
+                le = 'le="' + _fmt(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            cumulative += series[len(self.bounds)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class ChatMetrics:
+    """The chatbot's instruments and the hooks used by the graph, rules and router."""
+
+    def __init__(self) -> None:
+        self.rule_seconds = Histogram(
+            "chatbot_rule_eval_seconds", "Evaluation time of each routing rule.", RULE_BUCKETS, ["rule"]
+        )
+        self.rule_wins = Counter(
+            "chatbot_rule_wins", "Turns decided by each routing rule (rule=\"none\": no rule matched).", ["rule"]
+        )
+        self.node_seconds = Histogram(
+            "chatbot_node_seconds", "Execution time of each LangGraph node.", NODE_BUCKETS, ["node"]
+        )
+        self.turn_seconds = Histogram(
+            "chatbot_turn_seconds", "Duration of graph turns (load, graph, persist).", TURN_BUCKETS
+        )
+        self.llm_requests = Counter(
+            "chatbot_llm_requests", "LLM router calls by outcome (ok, error, cache_hit).", ["outcome"]
+        )
+        self.llm_seconds = Histogram(
+            "chatbot_llm_request_seconds", "LLM router call latency.", LLM_BUCKETS, ["outcome"]
+        )
+        self.llm_tokens = Histogram(
+            "chatbot_llm_tokens", "Tokens per LLM router call.", TOKEN_BUCKETS, ["kind"]
+        )
+        self.llm_confidence = Histogram(
+            "chatbot_llm_confidence", "Confidence reported by the LLM router.", CONFIDENCE_BUCKETS
+        )
+        self.llm_errors = Counter("chatbot_llm_errors", "LLM router failures by exception type.", ["type"])
+        self._instruments = [
+            self.turn_seconds,
+            self.node_seconds,
+            self.rule_seconds,
+            self.rule_wins,
+            self.llm_requests,
+            self.llm_seconds,
+            self.llm_tokens,
+            self.llm_confidence,
+            self.llm_errors,
+        ]
+
+    # ------------------------------------------------------------------
+    # Hooks
+    # ------------------------------------------------------------------
+    def timed_node(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a node function (sync or async) so each run is observed under `name`."""
+        observe = self.node_seconds.observe
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(state):
+                start = time.perf_counter()
+                try:
+                    return await fn(state)
+                finally:
+                    observe(time.perf_counter() - start, name)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(state):
+            start = time.perf_counter()
+            try:
+                return fn(state)
+            finally:
+                observe(time.perf_counter() - start, name)
+
+        return wrapper
+
+    def observe_rule(self, rule: str, seconds: float) -> None:
+        self.rule_seconds.observe(seconds, rule)
+
+    def rule_won(self, rule: str) -> None:
+        self.rule_wins.inc(rule)
+
+    def observe_turn(self, seconds: float) -> None:
+        self.turn_seconds.observe(seconds)
+
+    def observe_llm(
+        self,
+        seconds: float,
+        *,
+        error: Optional[BaseException] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        confidence: Optional[float] = None,
+    ) -> None:
+        """Record one LLM round-trip (successful or failed)."""
+        outcome = "error" if error is not None else "ok"
+        self.llm_requests.inc(outcome)
+        self.llm_seconds.observe(seconds, outcome)
+        if error is not None:
+            self.llm_errors.inc(type(error).__name__)
+        if prompt_tokens is not None:
+            self.llm_tokens.observe(prompt_tokens, "prompt")
+        if completion_tokens is not None:
+            self.llm_tokens.observe(completion_tokens, "completion")
+        if confidence is not None:
+            self.llm_confidence.observe(confidence)
+
+    def llm_cache_hit(self) -> None:
+        self.llm_requests.inc("cache_hit")
+
+    # ------------------------------------------------------------------
+    # Exposition
+    # ------------------------------------------------------------------
+    def render(self) -> str:
+        """All instruments in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for instrument in self._instruments:
+            lines.extend(instrument.render())
+        return "\n".join(lines) + "\n"
+
+
+def metrics_enabled() -> bool:
+    """
+    Check whether per-turn instrumentation is enabled.
+
+    Controlled via the `METRICS_ENABLED` environment variable (default: false).
+    """
+    return os.getenv("METRICS_ENABLED", "false").lower() == "true"
+
+
+@lru_cache(maxsize=1)
+def get_metrics() -> Optional[ChatMetrics]:
+    """Process-wide metrics registry (None unless METRICS_ENABLED=true)."""
+    return ChatMetrics() if metrics_enabled() else None
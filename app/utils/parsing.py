@@ -3,19 +3,54 @@ from __future__ import annotations
 import re
 from typing import Optional
 
+from .message_features import analyze_message, keyword_set
+from .turn_context import turn_cached
 
-# Patterns to extract (qty, product_id) across EN/ES phrasing.
-_QTY_ID_PATTERNS: list[str] = [
+
+# Compiled once at import: every parser below runs on each routed message.
+
+# Patterns to extract (qty, product_id) across EN/ES phrasing, tried in order.
+_QTY_ID_RES: tuple[re.Pattern[str], ...] = (
     # EN: "add 2 of 310", "remove 3 x 310"
-    r"\b(?P<qty>\d+)\s*(?:x|of)\s*(?P<id>\d{3})\b",
+    re.compile(r"\b(?P<qty>\d+)\s*(?:x|of)\s*(?P<id>\d{3})\b"),
     # ES: "añade 2 del 310", "quita 3 de 310"
-    r"\b(?P<qty>\d+)\s*(?:del|de)\s*(?P<id>\d{3})\b",
-]
+    re.compile(r"\b(?P<qty>\d+)\s*(?:del|de)\s*(?P<id>\d{3})\b"),
+)
 
 # Product IDs are represented as 3-digit numbers in this catalog.
-_ID_ONLY_PATTERN = r"\b(?P<id>\d{3})\b"
+_ID_ONLY_RE = re.compile(r"\b(?P<id>\d{3})\b")
+
+# Standalone quantities (1-2 digits), in order of preference.
+_X_QTY_RE = re.compile(r"\bx\s*(\d{1,2})\b")
+_UNITS_QTY_RE = re.compile(r"\b(\d{1,2})\s*(?:unidades?|units?|pcs?)\b")
+_PLAIN_QTY_RE = re.compile(r"\b(\d{1,2})\b")
+
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_SPACES_RE = re.compile(r"\s+")
+
+# Common weak words removed from the product hint of an adjustment.
+_WEAK_WORDS = frozenset({
+    # ES
+    "mejor", "solo", "que", "sea", "sean", "cámbialo", "cambialo",
+    "en", "vez", "de", "uno", "una",
+    # EN
+    "make", "it", "just", "only", "change", "set", "to", "instead", "of",
+    "one",
+})
+
+# Keywords indicating the user is adjusting a previously discussed quantity.
+_ADJUST_KEYWORDS = keyword_set(
+    "adjust_qty",
+    [
+        # ES
+        "mejor", "solo", "que sea", "cámbialo", "cambialo", "en vez de",
+        # EN
+        "make it", "just", "only", "change it", "set it", "instead of", "better",
+    ],
+)
 
 
+@turn_cached("parse_qty_and_product_id")
 def parse_qty_and_product_id(text: str) -> tuple[Optional[int], Optional[int]]:
     """
     Extract (qty, product_id) from free-text.
@@ -27,12 +62,12 @@ def parse_qty_and_product_id(text: str) -> tuple[Optional[int], Optional[int]]:
     """
     t = (text or "").lower()
 
-    for pat in _QTY_ID_PATTERNS:
-        m = re.search(pat, t)
+    for pat in _QTY_ID_RES:
+        m = pat.search(t)
         if m:
             return int(m.group("qty")), int(m.group("id"))
 
-    m2 = re.search(_ID_ONLY_PATTERN, t)
+    m2 = _ID_ONLY_RE.search(t)
     if m2:
         return None, int(m2.group("id"))
 
@@ -50,17 +85,17 @@ def parse_qty_only(text: str) -> Optional[int]:
     t = (text or "").lower()
 
     # "x2"
-    m = re.search(r"\bx\s*(\d{1,2})\b", t)
+    m = _X_QTY_RE.search(t)
     if m:
         return int(m.group(1))
 
     # "2 unidades" / "2 unit" / "2 pcs"
-    m = re.search(r"\b(\d{1,2})\s*(?:unidades?|units?|pcs?)\b", t)
+    m = _UNITS_QTY_RE.search(t)
     if m:
         return int(m.group(1))
 
     # Plain number (1-2 digits).
-    m = re.search(r"\b(\d{1,2})\b", t)
+    m = _PLAIN_QTY_RE.search(t)
     if m:
         return int(m.group(1))
 
@@ -81,40 +116,25 @@ def parse_adjustment(text: str) -> tuple[Optional[int], Optional[str]]:
     Returns:
     - (target_qty, product_hint_text_or_none)
     """
-    t = (text or "").lower().strip()
+    f = analyze_message(text or "")
+    t = f.text
     if not t:
         return None, None
 
-    # Keywords indicating the user is adjusting a previously discussed quantity.
-    INTENT_KEYWORDS = [
-        # ES
-        "mejor", "solo", "que sea", "cámbialo", "cambialo", "en vez de",
-        # EN
-        "make it", "just", "only", "change it", "set it", "instead of", "better",
-    ]
-
-    if not any(k in t for k in INTENT_KEYWORDS):
+    if not f.has(_ADJUST_KEYWORDS):
         return None, None
 
     qty = parse_qty_only(t)
     if qty is None:
         return None, None
 
-    # Remove the quantity token from the hint text.
-    hint = re.sub(rf"\b{qty}\b", " ", t)
-    hint = re.sub(r"\s+", " ", hint).strip()
-
-    # Common weak words to reduce noise in the remaining hint.
-    WEAK_WORDS = {
-        # ES
-        "mejor", "solo", "que", "sea", "sean", "cámbialo", "cambialo",
-        "en", "vez", "de", "uno", "una",
-        # EN
-        "make", "it", "just", "only", "change", "set", "to", "instead", "of",
-        "one",
-    }
+    # Remove the quantity token (as a whole number) from the hint text.
+    token = str(qty)
+    hint = _NUMBER_RE.sub(lambda m: " " if m.group() == token else m.group(), t)
+    hint = _SPACES_RE.sub(" ", hint).strip()
 
-    tokens = [x for x in hint.split() if x and x not in WEAK_WORDS]
+    # Drop common weak words to reduce noise in the remaining hint.
+    tokens = [x for x in hint.split() if x and x not in _WEAK_WORDS]
     product_hint = " ".join(tokens).strip() or None
 
     return qty, product_hint
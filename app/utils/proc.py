@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+import sys
+
+
+"""
+Process-level resource readings used by memory gauges and soak benchmarks.
+"""
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    """
+    Return the current resident set size of this process in bytes.
+
+    Reads /proc/self/statm on Linux. Elsewhere falls back to the peak RSS from
+    `resource.getrusage` (an upper bound), or 0 if unavailable.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux/BSD.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def peak_rss_bytes() -> int:
+    """
+    Return the peak resident set size of this process in bytes.
+
+    Reads VmHWM from /proc/self/status on Linux, elsewhere `resource.getrusage`;
+    0 if unavailable.
+    """
+    try:
+        with open("/proc/self/status", "rb") as fh:
+            for line in fh:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
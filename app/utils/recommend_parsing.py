@@ -4,6 +4,8 @@ import re
 from dataclasses import dataclass
 from typing import Optional
 
+from .turn_context import turn_cached
+
 
 """
 Deterministic recommendation slot parsing (no LLM).
@@ -69,6 +71,31 @@ _FAMILY_SYNONYMS: dict[str, str] = {
 }
 
 
+# Every synonym in one alternation, longest first; matched as whole words (`\b`).
+_FAMILY_RE = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(raw) for raw in sorted(_FAMILY_SYNONYMS, key=len, reverse=True))
+    + r")\b"
+)
+
+# Audience cues in order of precedence (the first pattern that matches wins).
+_AUDIENCE_RES: tuple[tuple[re.Pattern[str], str], ...] = (
+    (re.compile(r"\bunisex\b"), "unisex"),
+    # EN ("for men" / "for women" are covered by the bare words).
+    (re.compile(r"\b(?:men|male)\b"), "male"),
+    (re.compile(r"\b(?:women|female)\b"), "female"),
+    # ES ("para hombre" / "para mujer" likewise).
+    (re.compile(r"\b(?:hombre|masculino)\b"), "male"),
+    (re.compile(r"\b(?:mujer|femenino)\b"), "female"),
+)
+
+_NUM = r"(\d+(?:[.,]\d+)?)"
+_PRICE_BETWEEN_RE = re.compile(rf"\b(?:between|entre|de)\s*{_NUM}\s*(?:and|y|a)\s*{_NUM}\b")
+_PRICE_UNDER_RE = re.compile(rf"\b(?:under|below|less than|menos de|por menos de|por debajo de)\s*{_NUM}\b")
+_PRICE_OVER_RE = re.compile(rf"\b(?:over|more than|mas de|más de|por encima de)\s*{_NUM}\b")
+_PRICE_AMOUNT_RE = re.compile(rf"\b{_NUM}\s*(?:€|eur|euros?)\b")
+
+
 @dataclass(frozen=True)
 class RecommendSlots:
     """Structured recommendation constraints extracted from user text."""
@@ -86,6 +113,7 @@ class RecommendSlots:
         )
 
 
+@turn_cached("parse_recommend_slots")
 def parse_recommend_slots(text: str, lang: str) -> RecommendSlots:
     """
     Extract recommendation slots from free-text.
@@ -109,54 +137,23 @@ def parse_recommend_slots(text: str, lang: str) -> RecommendSlots:
     )
 
 
-def _contains_token(t: str, raw: str) -> bool:
-    """
-    Check whether `raw` appears in text as a token (or full phrase).
-    """
-    raw = raw.strip().lower()
-    if not raw:
-        return False
-    if " " in raw:
-        return raw in t
-    return re.search(rf"\b{re.escape(raw)}\b", t) is not None
-
-
 def _parse_families(t: str) -> list[str]:
     """
-    Extract normalized olfactory families from text, preserving first-seen order.
+    Extract normalized olfactory families from text, in order of first appearance.
     """
-    found: list[str] = []
-
-    for raw, norm in _FAMILY_SYNONYMS.items():
-        if _contains_token(t, raw):
-            found.append(norm)
-
     out: list[str] = []
-    seen: set[str] = set()
-    for f in found:
-        if f not in seen:
-            seen.add(f)
-            out.append(f)
+    for raw in _FAMILY_RE.findall(t):
+        norm = _FAMILY_SYNONYMS[raw]
+        if norm not in out:
+            out.append(norm)
     return out
 
 
 def _parse_audience(t: str) -> Optional[str]:
     """Extract audience intent (male/female/unisex) from text."""
-    if re.search(r"\bunisex\b", t):
-        return "unisex"
-
-    if re.search(r"\bfor\s+men\b", t) or re.search(r"\bmen\b", t) or re.search(r"\bmale\b", t):
-        return "male"
-
-    if re.search(r"\bfor\s+women\b", t) or re.search(r"\bwomen\b", t) or re.search(r"\bfemale\b", t):
-        return "female"
-
-    if re.search(r"\bpara\s+hombre\b", t) or re.search(r"\bhombre\b", t) or re.search(r"\bmasculino\b", t):
-        return "male"
-
-    if re.search(r"\bpara\s+mujer\b", t) or re.search(r"\bmujer\b", t) or re.search(r"\bfemenino\b", t):
-        return "female"
-
+    for pattern, audience in _AUDIENCE_RES:
+        if pattern.search(t):
+            return audience
     return None
 
 
@@ -170,24 +167,24 @@ def _parse_price_range(t: str) -> tuple[Optional[float], Optional[float]]:
     - between X and Y / entre X y Y / de X a Y
     - "100€" / "100 eur" style mentions
     """
-    m = re.search(r"\b(?:between|entre|de)\s*(\d+(?:[.,]\d+)?)\s*(?:and|y|a)\s*(\d+(?:[.,]\d+)?)\b", t)
+    m = _PRICE_BETWEEN_RE.search(t)
     if m:
         a = _to_float(m.group(1))
         b = _to_float(m.group(2))
         if a is not None and b is not None:
             return (min(a, b), max(a, b))
 
-    m = re.search(r"\b(?:under|below|less than|menos de|por menos de|por debajo de)\s*(\d+(?:[.,]\d+)?)\b", t)
+    m = _PRICE_UNDER_RE.search(t)
     if m:
         mx = _to_float(m.group(1))
         return (None, mx)
 
-    m = re.search(r"\b(?:over|more than|mas de|más de|por encima de)\s*(\d+(?:[.,]\d+)?)\b", t)
+    m = _PRICE_OVER_RE.search(t)
     if m:
         mn = _to_float(m.group(1))
         return (mn, None)
 
-    m = re.search(r"\b(\d+(?:[.,]\d+)?)\s*(?:€|eur|euros?)\b", t)
+    m = _PRICE_AMOUNT_RE.search(t)
     if m:
         mx = _to_float(m.group(1))
         return (None, mx)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+
+
+"""
+Text normalization helpers shared by search and caching code.
+
+Folding removes case and diacritics so that user input typed without accents
+("acqua di gio", "hermes") matches catalog values ("Acqua di Giò", "Hermès").
+"""
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def fold_text(text: str | None) -> str:
+    """
+    Return `text` case-folded and without diacritics.
+
+    Example: "Acqua di Giò" -> "acqua di gio".
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.casefold()
+
+
+def word_tokens(text: str | None) -> list[str]:
+    """Split already-folded text into word tokens, dropping punctuation."""
+    return _WORD_RE.findall(text or "")
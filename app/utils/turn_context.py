@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+
+"""
+Per-turn scratch context for deterministic parser and search results.
+
+Within one turn the routing rules, then the selected node, then the tools it
+calls keep re-deriving the same facts from `state.user_message` (cart commands,
+qty/id pairs, recommendation slots, language, name-search hits). Functions
+decorated with `turn_cached` memoize their results in the `TurnContext` of the
+running turn, keyed by their arguments.
+
+Rationale:
+- The context lives in a `ContextVar` opened by `turn_scope()` (the engine wraps
+  every turn in it), so any helper can use it without threading it through
+  signatures, and nothing is added to `ConversationState` (never persisted).
+- Per-turn lifetime: search hits depend on the catalog and may change between
+  turns, and the scratch space is dropped with the turn (no global growth).
+- Outside a turn (tests, benchmarks, scripts) decorated functions just run.
+- `TurnContext.runs` / `hits` count executions and cache hits per function,
+  which makes "each parser runs at most once per turn" checkable.
+
+Notes:
+- Cached lists (and lists inside tuples) are handed out as shallow copies:
+  callers append to parser results (e.g. the bulk cart node extends
+  `pending_actions`), which must not leak into later readers of the cache.
+- The context is copied into worker threads by LangGraph's async executor, so
+  sync nodes run from `ainvoke` share the same scratch object.
+"""
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class TurnContext:
+    """Scratch space of one turn: cached results plus per-function counters."""
+
+    __slots__ = ("cache", "runs", "hits")
+
+    def __init__(self) -> None:
+        self.cache: dict[tuple, Any] = {}
+        self.runs: dict[str, int] = {}
+        self.hits: dict[str, int] = {}
+
+
+_CURRENT: ContextVar[Optional[TurnContext]] = ContextVar("turn_context", default=None)
+
+
+def current_turn() -> Optional[TurnContext]:
+    """Return the context of the running turn, or None outside `turn_scope()`."""
+    return _CURRENT.get()
+
+
+@contextmanager
+def turn_scope() -> Iterator[TurnContext]:
+    """Open a fresh `TurnContext` for the duration of the block."""
+    ctx = TurnContext()
+    token = _CURRENT.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _CURRENT.reset(token)
+
+
+def _fresh(value: Any) -> Any:
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, tuple) and any(isinstance(v, list) for v in value):
+        return tuple(_fresh(v) for v in value)
+    return value
+
+
+def turn_cached(name: str) -> Callable[[F], F]:
+    """
+    Memoize a pure function of its (hashable) arguments for the current turn.
+
+    `name` labels the function in `TurnContext.runs` / `hits`.
+    """
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            ctx = _CURRENT.get()
+            if ctx is None:
+                return fn(*args, **kwargs)
+
+            key = (name, args, tuple(sorted(kwargs.items())))
+            try:
+                value = ctx.cache[key]
+            except KeyError:
+                ctx.runs[name] = ctx.runs.get(name, 0) + 1
+                value = ctx.cache[key] = fn(*args, **kwargs)
+            else:
+                ctx.hits[name] = ctx.hits.get(name, 0) + 1
+            return _fresh(value)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
@@ -136,6 +136,11 @@ _COPY: dict[str, dict[str, str]] = {
             "Thanks for your purchase 🙌\n"
             "Do you want to see the catalog, recommendations, or your cart?"
         ),
+        "checkout_out_of_stock": (
+            "❌ I couldn't place the order: some products no longer have enough stock.\n"
+            "Adjust your cart and try again:"
+        ),
+        "checkout_out_of_stock_line": "- {product_label}: {qty} in your cart, {available} available",
 
         # Adjust qty
         "qty_set_done": "Done ✅ Set {product_label} to {qty} unit(s).\n\nTotal: €{total:.2f}",
@@ -322,6 +327,11 @@ _COPY: dict[str, dict[str, str]] = {
             "Gracias por tu compra 🙌\n"
             "¿Quieres ver el catálogo, recomendaciones o tu carrito?"
         ),
+        "checkout_out_of_stock": (
+            "❌ No he podido completar el pedido: algunos productos ya no tienen stock suficiente.\n"
+            "Ajusta tu carrito y vuelve a intentarlo:"
+        ),
+        "checkout_out_of_stock_line": "- {product_label}: {qty} en tu carrito, {available} disponibles",
         "checkout_form_open_guard_es": "Tengo el formulario de envío abierto 👇 Rellénalo y pulsa “Guardar datos y continuar”.",
 
         # Adjust qty
@@ -0,0 +1,6 @@
+"""
+Offline performance benchmarks.
+
+Benchmarks are plain scripts (not collected by pytest) and are run as modules
+from the repository root, e.g. `python -m benchmarks.bench_catalog_index`.
+"""
@@ -0,0 +1,89 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Synthetic catalogs reuse the brand/family/audience vocabulary of the real
+catalog so that facet cardinalities stay realistic as the catalog grows.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Callable
+
+from app.domain.product import Product
+
+
+BRANDS = [
+    "Dior", "Chanel", "Giorgio Armani", "Yves Saint Laurent", "Hermès", "Lancôme",
+    "Carolina Herrera", "Dolce & Gabbana", "Calvin Klein", "Maison Francis Kurkdjian",
+    "Creed", "Tom Ford", "Jean Paul Gaultier", "Viktor & Rolf",
+]
+FAMILIES = ["citrus", "woody", "oriental", "floral", "aquatic", "aromatic", "gourmand", "fruity", "leather"]
+AUDIENCES = ["male", "female", "unisex"]
+_WORDS = [
+    "bleu", "noir", "rouge", "light", "intense", "oud", "rose", "night", "ocean",
+    "vetiver", "ambre", "cedar", "musk", "santal", "neroli", "iris", "tonka", "elixir",
+]
+_SYLLABLES = ["ka", "lo", "mi", "ra", "ve", "su", "to", "ne", "xi", "bo", "da", "fe", "gu", "ji", "pa", "zo"]
+
+
+def coined_word(rnd: random.Random) -> str:
+    """Pseudo-word that is rare across the catalog (used for selective name queries)."""
+    return "".join(rnd.choice(_SYLLABLES) for _ in range(4))
+
+
+def make_catalog(size: int, seed: int = 7, first_id: int = 100_000) -> list[Product]:
+    """Build a deterministic synthetic catalog with `size` products."""
+    rnd = random.Random(seed)
+    products: list[Product] = []
+    for i in range(size):
+        name = " ".join(rnd.sample(_WORDS, 2) + [coined_word(rnd)]).title()
+        products.append(
+            Product(
+                id=first_id + i,
+                name=name,
+                brand=rnd.choice(BRANDS),
+                price=round(rnd.uniform(20, 400), 2),
+                concentration=rnd.choice(["EDT", "EDP", "Parfum"]),
+                size_ml=rnd.choice([30, 50, 75, 100, 125]),
+                family=rnd.choice(FAMILIES),
+                audience=rnd.choice(AUDIENCES),
+                description=f"Synthetic product {i}.",
+                description_es=f"Producto sintético {i}.",
+                stock=rnd.randint(0, 50),
+            )
+        )
+    return products
+
+
+def time_per_call(fn: Callable[[], object], min_time: float = 0.2) -> float:
+    """
+    Return the mean wall-clock time of `fn()` in seconds.
+
+    The function is repeated until at least `min_time` seconds have elapsed,
+    which keeps the measurement stable for both very cheap and expensive calls.
+    """
+    fn()  # warm-up
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / calls
+
+
+def fmt_us(seconds: float) -> str:
+    """Format a duration in microseconds for table output."""
+    return f"{seconds * 1e6:,.1f} µs"
+
+
+def percentiles(samples: list[float], points: tuple[int, ...] = (50, 95, 99)) -> dict[str, float]:
+    """Nearest-rank percentiles of `samples` as {"p50": ..., "p95": ..., "p99": ...}."""
+    if not samples:
+        return {f"p{p}": 0.0 for p in points}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {f"p{p}": ordered[min(last, max(0, -(-p * len(ordered) // 100) - 1))] for p in points}
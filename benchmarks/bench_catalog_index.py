@@ -0,0 +1,71 @@
+"""
+Per-turn catalog lookup cost: linear scan vs CatalogIndex.
+
+A "turn" is modelled as the product lookups a busy cart turn performs:
+a bulk update of 4 actions, a 3-item clarification list and the cart total and
+cart view over 6 lines (~19 `get_product_by_id` calls).
+
+Usage:
+    python -m benchmarks.bench_catalog_index
+    python -m benchmarks.bench_catalog_index --sizes 20 1000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from typing import Optional
+
+from app.domain.product import Product
+from app.services.catalog_index import CatalogIndex
+
+from ._synthetic import fmt_us, make_catalog, time_per_call
+
+
+_LOOKUPS_PER_TURN = 4 + 3 + 6 + 6
+
+
+def _linear_get(catalog: list[Product], product_id: int) -> Optional[Product]:
+    """Previous implementation of `get_product_by_id`."""
+    return next((p for p in catalog if p.id == product_id), None)
+
+
+def run(sizes: list[int], seed: int = 7) -> None:
+    print(f"{'SKUs':>9} | {'linear scan / turn':>20} | {'CatalogIndex / turn':>20} | {'speed-up':>9}")
+    print("-" * 68)
+
+    for size in sizes:
+        catalog = make_catalog(size, seed=seed)
+        index = CatalogIndex(catalog)
+
+        rnd = random.Random(seed)
+        turn_ids = [rnd.choice(catalog).id for _ in range(_LOOKUPS_PER_TURN)]
+
+        def linear_turn() -> None:
+            for pid in turn_ids:
+                _linear_get(catalog, pid)
+
+        def indexed_turn() -> None:
+            for pid in turn_ids:
+                index.get(pid)
+
+        # Keep the slow path bounded on very large catalogs.
+        linear = time_per_call(linear_turn, min_time=0.1 if size >= 10_000 else 0.2)
+        indexed = time_per_call(indexed_turn)
+
+        print(
+            f"{size:>9,} | {fmt_us(linear):>20} | {fmt_us(indexed):>20} | {linear / indexed:>8.0f}x"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 1_000, 10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.sizes, seed=args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""
+Catalog loading of a very large feed: peak RSS and load time per loader.
+
+A synthetic catalog (`--skus` products, written in slices so the generator
+itself stays small) is saved both as a JSON array and as JSON Lines. Every
+loader then runs in a fresh child process, so its peak RSS is not hidden by
+the parent's high-water mark. Loaders compared:
+- legacy:  previous `load_catalog` (`json.loads` of the whole text, then one
+           `Product.model_validate` per item)
+- stream:  `load_catalog` on the JSON array (chunked incremental decoding,
+           `TypeAdapter(list[Product])` per batch)
+- jsonl:   `load_catalog` on the JSON Lines file (batches validated straight
+           from bytes)
+
+"peak" is the process high-water mark (VmHWM) minus the RSS after imports;
+the loaded models themselves are part of it for every loader.
+
+Usage:
+    python -m benchmarks.bench_catalog_load
+    python -m benchmarks.bench_catalog_load --skus 100000 --batch-size 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.data.catalog_loader import DEFAULT_BATCH_SIZE, load_catalog
+from app.domain.product import Product
+from app.utils.proc import current_rss_bytes, peak_rss_bytes
+
+from ._synthetic import make_catalog
+
+
+_SLICE = 10_000
+
+
+def _legacy_load(path: Path) -> list[Product]:
+    """Previous implementation of `load_catalog`."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [Product.model_validate(item) for item in data]
+
+
+def _write_feeds(directory: Path, skus: int, seed: int) -> tuple[Path, Path]:
+    array, lines = directory / "catalog.json", directory / "catalog.jsonl"
+    with array.open("w", encoding="utf-8") as fa, lines.open("w", encoding="utf-8") as fl:
+        fa.write("[")
+        for start in range(0, skus, _SLICE):
+            for p in make_catalog(min(_SLICE, skus - start), seed=seed + start, first_id=100_000 + start):
+                item = json.dumps(p.model_dump(), ensure_ascii=False)
+                fa.write(("," if p.id > 100_000 else "") + "\n" + item)
+                fl.write(item + "\n")
+        fa.write("\n]\n")
+    return array, lines
+
+
+def _child(mode: str, path: Path, batch_size: int) -> None:
+    """Load `path` with `mode` and print the measurements as JSON."""
+    baseline = current_rss_bytes()
+    start = time.perf_counter()
+    if mode == "legacy":
+        products = _legacy_load(path)
+    else:
+        products = load_catalog(path, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"n": len(products), "seconds": elapsed, "peak": peak_rss_bytes() - baseline}))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], Path(args.child[1]), args.batch_size)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        array, lines = _write_feeds(Path(tmp), args.skus, args.seed)
+        runs = {"legacy": array, "stream": array, "jsonl": lines}
+
+        print(f"{args.skus:,} SKUs: {array.stat().st_size / 1e6:,.0f} MB JSON array, "
+              f"{lines.stat().st_size / 1e6:,.0f} MB JSON Lines, batches of {args.batch_size:,}\n")
+        print(f"{'loader':<8} {'load s':>8} {'peak MB':>9} {'vs legacy':>10}")
+        print("-" * 38)
+        legacy_peak = None
+        for mode, path in runs.items():
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_catalog_load", "--child", mode, str(path),
+                 "--batch-size", str(args.batch_size)],
+                check=True, capture_output=True, text=True,
+            )
+            r = json.loads(out.stdout)
+            if r["n"] != args.skus:
+                raise AssertionError(f"{mode} loaded {r['n']} products, expected {args.skus}")
+            legacy_peak = legacy_peak or r["peak"]
+            print(f"{mode:<8} {r['seconds']:>8.2f} {r['peak'] / 2**20:>9,.0f} {r['peak'] / legacy_peak:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
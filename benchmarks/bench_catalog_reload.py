@@ -0,0 +1,135 @@
+"""
+Catalog hot reload on a large catalog: reload cost and reader pause at swap.
+
+A synthetic catalog (`--skus` products) is written to a temporary file and
+served by a `CatalogManager`. Reported:
+- reload cost: load + validation of the file and construction of every index
+  (`CatalogIndex`, `ProductSearchIndex`, `RecommendIndex`), i.e. the work now
+  done by the watcher thread;
+- reader stalls while the catalog is reloaded `--reloads` times, with reader
+  threads resolving products by id the way request handlers do. A stall is
+  the gap between two consecutive lookups of one reader, so it includes time
+  spent waiting for a rebuild or for the interpreter:
+  - lru_cache:  previous behaviour (`cache_clear()` + rebuild on the next
+                request): the first reader after a reload rebuilds everything
+  - snapshot:   `CatalogManager.reload()` in a background thread, readers keep
+                using the previous snapshot until the swap
+
+With CPython's GIL the background rebuild still competes with readers for the
+interpreter: the snapshot column shows how long the longest single C call of a
+rebuild (`json.loads` of the whole file, a large sort) holds the GIL, not zero.
+It no longer grows with the full rebuild time, which readers waited for before.
+
+Usage:
+    python -m benchmarks.bench_catalog_reload
+    python -m benchmarks.bench_catalog_reload --skus 200000 --readers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+
+from app.data.catalog_loader import load_catalog
+from app.services.catalog_index import CatalogIndex
+from app.services.catalog_manager import CatalogManager, CatalogSnapshot
+
+from ._synthetic import make_catalog, percentiles
+
+
+def _write_catalog(path: Path, skus: int, seed: int) -> list[int]:
+    products = make_catalog(skus, seed=seed)
+    path.write_text(json.dumps([p.model_dump() for p in products]), encoding="utf-8")
+    return [p.id for p in products]
+
+
+def _read_under_reloads(get_index: Callable[[], CatalogIndex], reload: Callable[[], object],
+                        ids: list[int], readers: int, reloads: int, seed: int) -> list[float]:
+    """Gaps between consecutive lookups of `readers` threads while `reload()` runs `reloads` times."""
+    stop = threading.Event()
+    samples: list[list[float]] = [[] for _ in range(readers)]
+
+    def reader(i: int) -> None:
+        rng = random.Random(seed + i)
+        out = samples[i]
+        last = time.perf_counter()
+        while not stop.is_set():
+            pid = rng.choice(ids)
+            if get_index().get(pid) is None:
+                raise AssertionError(f"product {pid} missing")
+            now = time.perf_counter()
+            out.append(now - last)
+            last = now
+            time.sleep(0)  # hand over the GIL like an I/O-bound request would
+
+    pool = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for th in pool:
+        th.start()
+    try:
+        for _ in range(reloads):
+            time.sleep(0.05)
+            reload()
+        time.sleep(0.05)
+    finally:
+        stop.set()
+        for th in pool:
+            th.join()
+    return [s for per_thread in samples for s in per_thread]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, default=4, help="reader threads resolving products by id")
+    parser.add_argument("--reloads", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "catalog.json"
+        ids = _write_catalog(path, args.skus, args.seed)
+        size_mb = path.stat().st_size / 1e6
+
+        start = time.perf_counter()
+        products = load_catalog(path)
+        t_load = time.perf_counter() - start
+        t_build = CatalogSnapshot.build(products).build_seconds
+        del products
+
+        print(f"{args.skus:,} SKUs ({size_mb:,.1f} MB JSON)\n")
+        print(f"reload cost: load+validate {t_load * 1e3:,.0f} ms, build indexes {t_build * 1e3:,.0f} ms, "
+              f"total {(t_load + t_build) * 1e3:,.0f} ms (off the request path with the manager)\n")
+
+        @lru_cache(maxsize=1)
+        def legacy_index() -> CatalogIndex:
+            snap = CatalogSnapshot.build(load_catalog(path))
+            return snap.index
+
+        manager = CatalogManager(path)
+        manager.snapshot()
+        legacy_index()
+
+        modes: dict[str, tuple[Callable[[], CatalogIndex], Callable[[], object]]] = {
+            "lru_cache": (legacy_index, legacy_index.cache_clear),
+            "snapshot": (lambda: manager.snapshot().index, lambda: manager.reload(force=True)),
+        }
+
+        print(f"{args.readers} readers, {args.reloads} reloads")
+        print(f"{'mode':<10} {'lookups':>9} {'p50 gap µs':>11} {'p99 gap µs':>11} {'max stall ms':>13}")
+        print("-" * 58)
+        for name, (get_index, reload) in modes.items():
+            flat = _read_under_reloads(get_index, reload, ids, args.readers, args.reloads, args.seed)
+            p = percentiles(flat)
+            print(f"{name:<10} {len(flat):>9,} {p['p50'] * 1e6:>11.1f} {p['p99'] * 1e6:>11.1f} {max(flat) * 1e3:>13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
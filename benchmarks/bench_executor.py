@@ -0,0 +1,69 @@
+"""
+Turn latency: compiled LangGraph vs direct-dispatch executor.
+
+Both engines replay the same corpus (docs/chat.md plus generated ES/EN
+conversations, see `benchmarks.corpora`) through `ChatEngine.process_turn`
+with the LLM router disabled. Rounds alternate between executors so that
+machine noise affects both alike. Per-node/per-rule breakdowns are available
+from `benchmarks.bench_turns --executor graph|direct`.
+
+Usage:
+    python -m benchmarks.bench_executor
+    python -m benchmarks.bench_executor --conversations 500 --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from app.engine.service import ChatEngine
+
+from ._synthetic import percentiles
+from .bench_turns import replay
+from .corpora import default_corpus
+
+
+EXECUTORS = ("graph", "direct")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200, help="generated conversations (plus docs/chat.md)")
+    parser.add_argument("--rounds", type=int, default=3, help="alternating replays per executor")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    os.environ["LLM_ROUTER_ENABLED"] = "false"
+    corpus = default_corpus(args.conversations, seed=args.seed)
+    engines = {kind: ChatEngine(executor=kind) for kind in EXECUTORS}
+    samples: dict[str, list[float]] = {kind: [] for kind in EXECUTORS}
+    elapsed = dict.fromkeys(EXECUTORS, 0.0)
+    turns = dict.fromkeys(EXECUTORS, 0)
+
+    for kind, engine in engines.items():
+        replay(engine, corpus[:5], f"warmup-{kind}", [])
+
+    for r in range(args.rounds):
+        for kind, engine in engines.items():
+            start = time.perf_counter()
+            turns[kind] += replay(engine, corpus, f"r{r}", samples[kind])
+            elapsed[kind] += time.perf_counter() - start
+
+    print(f"corpus: {len(corpus)} conversations x {args.rounds} rounds | LLM router disabled\n")
+    print(f"{'executor':<10} {'turns':>8} {'p50 µs':>10} {'p95 µs':>10} {'p99 µs':>10} {'turns/s':>10}")
+    print("-" * 62)
+    for kind in EXECUTORS:
+        p = percentiles(samples[kind])
+        print(
+            f"{kind:<10} {turns[kind]:>8,} {p['p50'] * 1e6:>10.1f} {p['p95'] * 1e6:>10.1f} "
+            f"{p['p99'] * 1e6:>10.1f} {turns[kind] / elapsed[kind]:>10,.0f}"
+        )
+    speedup = (turns["direct"] / elapsed["direct"]) / (turns["graph"] / elapsed["graph"])
+    print(f"\ndirect executor throughput: {speedup:.1f}x the compiled graph")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
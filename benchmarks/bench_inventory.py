@@ -0,0 +1,157 @@
+"""
+Inventory ledger under contention: many sessions reserving a few hot SKUs.
+
+Every thread plays a stream of shoppers: each one sets holds on random SKUs
+(skewed towards the first `--hot` products), sometimes lowers them, and then
+checks out or abandons the cart (release). Ledgers compared:
+- memory/1:   `InMemoryInventoryLedger` with a single lock (no striping)
+- memory/64:  `InMemoryInventoryLedger` with 64 lock stripes (default)
+- sqlite:     `SqliteInventoryLedger` on a temporary file (one connection per
+              thread, as separate workers would have)
+
+After each run (every shopper has checked out or released) the ledger is
+checked for overselling: sold + available units must equal the initial stock
+of every SKU, and availability may never go negative.
+
+Usage:
+    python -m benchmarks.bench_inventory
+    python -m benchmarks.bench_inventory --threads 32 --ops 5000 --hot 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from app.services.inventory import InMemoryInventoryLedger, InventoryLedger, SqliteInventoryLedger
+
+from ._synthetic import percentiles
+
+
+def _shopper_ops(ledger: InventoryLedger, rng: random.Random, skus: list[int], hot: int, ops: int,
+                 name: str, samples: list[float], sold: dict[int, int], sold_lock: threading.Lock) -> None:
+    done = shopper = 0
+    while done < ops:
+        sid = f"{name}-{shopper}"
+        shopper += 1
+        held: dict[int, int] = {}
+        for _ in range(rng.randint(1, 6)):
+            pid = rng.choice(skus[:hot]) if rng.random() < 0.8 else rng.choice(skus)
+            qty = max(0, held.get(pid, 0) + rng.randint(-1, 3))
+            start = time.perf_counter()
+            held[pid] = ledger.hold(sid, pid, qty)
+            samples.append(time.perf_counter() - start)
+            done += 1
+
+        start = time.perf_counter()
+        if rng.random() < 0.5:
+            committed = ledger.commit(sid)
+            with sold_lock:
+                for pid, qty in committed.items():
+                    sold[pid] = sold.get(pid, 0) + qty
+        else:
+            ledger.release(sid)
+        samples.append(time.perf_counter() - start)
+        done += 1
+
+
+def run(factory: Callable[[], InventoryLedger], stock: dict[int, int], threads: int, ops: int,
+        hot: int, seed: int) -> dict[str, float]:
+    ledger = factory()
+    skus = sorted(stock)
+    samples: list[list[float]] = [[] for _ in range(threads)]
+    sold: dict[int, int] = {}
+    sold_lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(i: int) -> None:
+        barrier.wait()
+        _shopper_ops(ledger, random.Random(seed + i), skus, hot, ops, f"t{i}", samples[i], sold, sold_lock)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for th in pool:
+        th.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for th in pool:
+        th.join()
+    elapsed = time.perf_counter() - start
+
+    for pid, initial in stock.items():
+        available = ledger.available(pid)
+        if available < 0 or available + sold.get(pid, 0) != initial:
+            raise AssertionError(f"SKU {pid}: stock {initial}, sold {sold.get(pid, 0)}, available {available}")
+
+    flat = [s for per_thread in samples for s in per_thread]
+    p = percentiles(flat)
+    return {
+        "ops": len(flat),
+        "ops_s": len(flat) / elapsed,
+        "p50": p["p50"],
+        "p99": p["p99"],
+        "sold": sum(sold.values()),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=2000, help="ledger operations per thread")
+    parser.add_argument("--skus", type=int, default=200)
+    parser.add_argument("--hot", type=int, default=3, help="SKUs receiving 80%% of the holds")
+    parser.add_argument("--stock", type=int, default=5, help="initial units per SKU")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    stock = {100 + i: args.stock for i in range(args.skus)}
+    # Checkouts sell units for good: hot SKUs get more stock so that they do not
+    # sell out within the first few shoppers of the run.
+    for pid in sorted(stock)[: args.hot]:
+        stock[pid] = args.stock * args.threads * 4
+
+    tmp = tempfile.TemporaryDirectory()
+    ledgers: dict[str, Callable[[], InventoryLedger]] = {
+        "memory/1": lambda: InMemoryInventoryLedger(lock_stripes=1, stock_of=stock.get),
+        "memory/64": lambda: InMemoryInventoryLedger(lock_stripes=64, stock_of=stock.get),
+        "sqlite": lambda: _PerThreadSqlite(Path(tmp.name) / "inventory.db", stock),
+    }
+
+    print(f"{args.threads} threads x {args.ops:,} ops | {args.skus} SKUs, {args.hot} hot\n")
+    print(f"{'ledger':<10} {'ops':>9} {'ops/s':>10} {'p50 µs':>9} {'p99 µs':>9} {'units sold':>11}")
+    print("-" * 62)
+    try:
+        for name, factory in ledgers.items():
+            r = run(factory, stock, args.threads, args.ops, args.hot, args.seed)
+            print(
+                f"{name:<10} {r['ops']:>9,} {r['ops_s']:>10,.0f} {r['p50'] * 1e6:>9.1f} "
+                f"{r['p99'] * 1e6:>9.1f} {r['sold']:>11,}"
+            )
+    finally:
+        tmp.cleanup()
+    print("\nno SKU oversold (sold + available == initial stock for every SKU)")
+    return 0
+
+
+class _PerThreadSqlite:
+    """One `SqliteInventoryLedger` connection per thread, all on the same file."""
+
+    def __init__(self, path: Path, stock: dict[int, int]) -> None:
+        self._path = path
+        self._stock = stock
+        self._local = threading.local()
+        path.unlink(missing_ok=True)
+
+    def __getattr__(self, name: str):
+        ledger = getattr(self._local, "ledger", None)
+        if ledger is None:
+            ledger = self._local.ledger = SqliteInventoryLedger(self._path, stock_of=self._stock.get)
+        return getattr(ledger, name)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
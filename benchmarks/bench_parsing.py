@@ -0,0 +1,163 @@
+"""
+Micro-benchmarks for the deterministic message parsers.
+
+Every parser in `app.utils.parsing` and `app.utils.recommend_parsing` runs over
+the user messages of the replay corpus (docs/chat.md plus generated ES/EN
+conversations, see `benchmarks.corpora`) and a set of recommendation requests.
+The previous implementations, which passed pattern strings to `re.search` on
+every call and built one `\\b...\\b` pattern per family synonym per message,
+are kept here for comparison. Results of both versions are checked to be equal
+on every message (families as a set: the compiled version reports them in order
+of appearance in the text).
+
+Usage:
+    python -m benchmarks.bench_parsing
+    python -m benchmarks.bench_parsing --conversations 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from typing import Callable, Optional
+
+from app.utils import parsing, recommend_parsing
+from app.utils.message_features import analyze_message
+
+from ._synthetic import time_per_call
+from .corpora import default_corpus
+
+
+RECOMMEND_MESSAGES = [
+    "recomiéndame algo cítrico para hombre de menos de 80€",
+    "I want something woody or fresh for women between 50 and 90",
+    "busco un perfume floral y afrutado unisex por encima de 60",
+    "something sweet, marine or amber under 120 eur",
+    "quiero algo amaderado y con cuero para mujer de 40 a 70",
+    "recommend me a gourmand perfume",
+]
+
+
+# ---------------------------------------------------------------------------
+# Previous implementations
+# ---------------------------------------------------------------------------
+def _legacy_qty_and_product_id(text: str) -> tuple[Optional[int], Optional[int]]:
+    t = (text or "").lower()
+    for pat in (r"\b(?P<qty>\d+)\s*(?:x|of)\s*(?P<id>\d{3})\b", r"\b(?P<qty>\d+)\s*(?:del|de)\s*(?P<id>\d{3})\b"):
+        m = re.search(pat, t)
+        if m:
+            return int(m.group("qty")), int(m.group("id"))
+    m2 = re.search(r"\b(?P<id>\d{3})\b", t)
+    if m2:
+        return None, int(m2.group("id"))
+    return None, None
+
+
+def _legacy_qty_only(text: str) -> Optional[int]:
+    t = (text or "").lower()
+    for pat in (r"\bx\s*(\d{1,2})\b", r"\b(\d{1,2})\s*(?:unidades?|units?|pcs?)\b", r"\b(\d{1,2})\b"):
+        m = re.search(pat, t)
+        if m:
+            return int(m.group(1))
+    return None
+
+
+def _legacy_adjustment(text: str) -> tuple[Optional[int], Optional[str]]:
+    f = analyze_message(text or "")
+    t = f.text
+    if not t or not f.has(parsing._ADJUST_KEYWORDS):
+        return None, None
+    qty = _legacy_qty_only(t)
+    if qty is None:
+        return None, None
+    hint = re.sub(rf"\b{qty}\b", " ", t)
+    hint = re.sub(r"\s+", " ", hint).strip()
+    weak = {
+        "mejor", "solo", "que", "sea", "sean", "cámbialo", "cambialo", "en", "vez", "de", "uno", "una",
+        "make", "it", "just", "only", "change", "set", "to", "instead", "of", "one",
+    }
+    tokens = [x for x in hint.split() if x and x not in weak]
+    return qty, " ".join(tokens).strip() or None
+
+
+def _legacy_families(t: str) -> list[str]:
+    found = []
+    for raw, norm in recommend_parsing._FAMILY_SYNONYMS.items():
+        raw = raw.strip().lower()
+        if raw and (raw in t if " " in raw else re.search(rf"\b{re.escape(raw)}\b", t) is not None):
+            found.append(norm)
+    return list(dict.fromkeys(found))
+
+
+def _legacy_audience(t: str) -> Optional[str]:
+    if re.search(r"\bunisex\b", t):
+        return "unisex"
+    if re.search(r"\bfor\s+men\b", t) or re.search(r"\bmen\b", t) or re.search(r"\bmale\b", t):
+        return "male"
+    if re.search(r"\bfor\s+women\b", t) or re.search(r"\bwomen\b", t) or re.search(r"\bfemale\b", t):
+        return "female"
+    if re.search(r"\bpara\s+hombre\b", t) or re.search(r"\bhombre\b", t) or re.search(r"\bmasculino\b", t):
+        return "male"
+    if re.search(r"\bpara\s+mujer\b", t) or re.search(r"\bmujer\b", t) or re.search(r"\bfemenino\b", t):
+        return "female"
+    return None
+
+
+def _legacy_price_range(t: str) -> tuple[Optional[float], Optional[float]]:
+    num = r"(\d+(?:[.,]\d+)?)"
+    m = re.search(rf"\b(?:between|entre|de)\s*{num}\s*(?:and|y|a)\s*{num}\b", t)
+    if m:
+        a, b = float(m.group(1).replace(",", ".")), float(m.group(2).replace(",", "."))
+        return (min(a, b), max(a, b))
+    m = re.search(rf"\b(?:under|below|less than|menos de|por menos de|por debajo de)\s*{num}\b", t)
+    if m:
+        return (None, float(m.group(1).replace(",", ".")))
+    m = re.search(rf"\b(?:over|more than|mas de|más de|por encima de)\s*{num}\b", t)
+    if m:
+        return (float(m.group(1).replace(",", ".")), None)
+    m = re.search(rf"\b{num}\s*(?:€|eur|euros?)\b", t)
+    if m:
+        return (None, float(m.group(1).replace(",", ".")))
+    return (None, None)
+
+
+# name -> (legacy, current, result normalizer)
+PARSERS: dict[str, tuple[Callable, Callable, Callable]] = {
+    "parse_qty_and_product_id": (_legacy_qty_and_product_id, parsing.parse_qty_and_product_id, lambda r: r),
+    "parse_qty_only": (_legacy_qty_only, parsing.parse_qty_only, lambda r: r),
+    "parse_adjustment": (_legacy_adjustment, parsing.parse_adjustment, lambda r: r),
+    "_parse_families": (_legacy_families, recommend_parsing._parse_families, frozenset),
+    "_parse_audience": (_legacy_audience, recommend_parsing._parse_audience, lambda r: r),
+    "_parse_price_range": (_legacy_price_range, recommend_parsing._parse_price_range, lambda r: r),
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200, help="generated conversations (plus docs/chat.md)")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    corpus = default_corpus(args.conversations, seed=args.seed)
+    messages = list(dict.fromkeys(m.lower().strip() for conv in corpus for m in conv)) + RECOMMEND_MESSAGES
+
+    print(f"{len(messages):,} distinct messages\n")
+    print(f"{'parser':<26} {'legacy µs/msg':>14} {'compiled µs/msg':>16} {'speedup':>8}")
+    print("-" * 68)
+    for name, (legacy, current, norm) in PARSERS.items():
+        for m in messages:
+            if norm(legacy(m)) != norm(current(m)):
+                raise AssertionError(f"{name} differs on {m!r}: {legacy(m)!r} != {current(m)!r}")
+
+        def run_all(fn: Callable = legacy) -> None:
+            for m in messages:
+                fn(m)
+
+        t_legacy = time_per_call(run_all) / len(messages)
+        t_current = time_per_call(lambda: run_all(current)) / len(messages)
+        print(f"{name:<26} {t_legacy * 1e6:>14.2f} {t_current * 1e6:>16.2f} {t_legacy / t_current:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
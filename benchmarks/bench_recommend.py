@@ -0,0 +1,124 @@
+"""
+Recommendation latency: per-call filtering + full sort vs the RecommendIndex facet index.
+
+Runs on a synthetic catalog (200k products by default). The legacy path is the
+previous `recommend_products` body, kept here for comparison.
+
+Usage:
+    python -m benchmarks.bench_recommend
+    python -m benchmarks.bench_recommend --size 50000 --limit 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional
+
+from app.domain.product import Product
+from app.services.recommend_index import RecommendIndex
+
+from ._synthetic import fmt_us, make_catalog, time_per_call
+
+
+def _legacy_recommend(
+    catalog: list[Product],
+    families: Optional[list[str]],
+    audience: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    limit: int,
+) -> list[Product]:
+    """Previous implementation: closures + full scan + full sort, twice when relaxing."""
+    norm_families = [f.strip().lower() for f in (families or []) if (f or "").strip()]
+
+    def _family_ok(p: Product) -> bool:
+        if not norm_families:
+            return True
+        return (p.family or "").strip().lower() in norm_families
+
+    def _price_ok(p: Product) -> bool:
+        if min_price is not None and p.price < min_price:
+            return False
+        return not (max_price is not None and p.price > max_price)
+
+    strict = [
+        p for p in catalog
+        if _family_ok(p) and _price_ok(p)
+        and not (audience and (p.audience or "").strip().lower() != audience.strip().lower())
+    ]
+    if strict:
+        return sorted(strict, key=lambda x: x.price)[:limit]
+
+    if audience in ("male", "female"):
+        relaxed = [
+            p for p in catalog
+            if _family_ok(p) and _price_ok(p) and (p.audience or "").strip().lower() in (audience, "unisex")
+        ]
+        if relaxed:
+            return sorted(relaxed, key=lambda x: x.price)[:limit]
+    return []
+
+
+def _indexed_recommend(
+    index: RecommendIndex,
+    families: Optional[list[str]],
+    audience: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    limit: int,
+) -> list[Product]:
+    """Same two-pass strategy as `recommend_products`, against a given index."""
+    norm_families = [f.strip().lower() for f in (families or []) if (f or "").strip()]
+    audiences = [audience.strip().lower()] if audience else None
+    strict = index.query(norm_families, audiences, min_price, max_price, limit)
+    if strict or audience not in ("male", "female"):
+        return strict
+    return index.query(norm_families, [audience, "unisex"], min_price, max_price, limit)
+
+
+_QUERIES = {
+    "family + audience + max": (["woody"], "male", None, 100.0),
+    "2 families + range": (["citrus", "floral"], None, 80.0, 150.0),
+    "audience only": (None, "female", None, None),
+    "relaxed (no strict hit)": (["leather"], "female", 20.0, 20.5),
+    "price only (wide)": (None, None, None, 400.0),
+}
+
+
+def run(size: int, limit: int, seed: int = 7) -> None:
+    catalog = make_catalog(size, seed=seed)
+
+    start = time.perf_counter()
+    index = RecommendIndex(catalog)
+    build = time.perf_counter() - start
+    print(f"catalog: {size:,} products | index build: {build * 1e3:.1f} ms | limit={limit}\n")
+
+    print(f"{'query':<26} | {'legacy':>14} | {'facet index':>12} | {'speed-up':>9}")
+    print("-" * 70)
+    for label, (families, audience, min_price, max_price) in _QUERIES.items():
+        expected = _legacy_recommend(catalog, families, audience, min_price, max_price, limit)
+        got = _indexed_recommend(index, families, audience, min_price, max_price, limit)
+        assert [p.id for p in expected] == [p.id for p in got], label
+
+        legacy = time_per_call(
+            lambda: _legacy_recommend(catalog, families, audience, min_price, max_price, limit), min_time=0.3
+        )
+        indexed = time_per_call(
+            lambda: _indexed_recommend(index, families, audience, min_price, max_price, limit)
+        )
+        print(f"{label:<26} | {fmt_us(legacy):>14} | {fmt_us(indexed):>12} | {legacy / indexed:>8.0f}x")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.size, args.limit, seed=args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
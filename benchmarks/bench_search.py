@@ -0,0 +1,87 @@
+"""
+Name search latency: per-query catalog scan vs ProductSearchIndex.
+
+Queries cover a selective coined product word, the same word with a typo, and
+a broad brand + common word query. The legacy scan is the previous
+`tool_find_products_by_name` scoring loop, kept here for comparison.
+
+Usage:
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --sizes 20 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+
+from app.domain.product import Product
+from app.services.search_index import ProductSearchIndex
+from app.utils.text import fold_text
+
+from ._synthetic import fmt_us, make_catalog, time_per_call
+
+
+def _legacy_search(catalog: list[Product], tokens: list[str], limit: int = 5) -> list[int]:
+    """Previous scoring loop: substring test of every token against every product."""
+    scored: list[tuple[int, Product]] = []
+    for p in catalog:
+        hay = f"{p.brand or ''} {p.name}".lower()
+        score = sum(1 for tok in tokens if tok in hay)
+        if score > 0:
+            scored.append((score, p))
+    if not scored:
+        return []
+    scored.sort(key=lambda x: x[0], reverse=True)
+    best_score = scored[0][0]
+    return [p.id for s, p in scored if s == best_score][:limit]
+
+
+def _typo(word: str) -> str:
+    """Drop one inner character ("kalomira" -> "kaloira")."""
+    mid = len(word) // 2
+    return word[:mid] + word[mid + 1:]
+
+
+def run(sizes: list[int], seed: int = 7) -> None:
+    print(f"{'SKUs':>9} | {'query':<22} | {'build':>10} | {'legacy scan':>14} | {'index':>12}")
+    print("-" * 80)
+
+    for size in sizes:
+        catalog = make_catalog(size, seed=seed)
+
+        start = time.perf_counter()
+        index = ProductSearchIndex(catalog)
+        build = time.perf_counter() - start
+
+        rnd = random.Random(seed)
+        target = rnd.choice(catalog)
+        coined = fold_text(target.name.split()[-1])
+
+        queries = {
+            "selective": [coined],
+            "selective + typo": [_typo(coined)],
+            "broad (brand + word)": ["tom", "ford", "rose"],
+        }
+
+        for label, tokens in queries.items():
+            legacy = time_per_call(lambda: _legacy_search(catalog, tokens), min_time=0.1)
+            indexed = time_per_call(lambda: index.search(tokens))
+            print(
+                f"{size:>9,} | {label:<22} | {build * 1e3:>8.1f}ms | {fmt_us(legacy):>14} | {fmt_us(indexed):>12}"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 1_000, 10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.sizes, seed=args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+"""
+ConversationState snapshot size and encode/decode time.
+
+States are captured after every turn of the replayed corpus (docs/chat.md plus
+generated ES/EN conversations, see `benchmarks.corpora`), so the mix covers
+catalog listings, recommendations, carts and checkout. Formats compared:
+- json:       `model_dump_json()` / `model_validate_json()`
+- json+zlib:  JSON without defaults, zlib-compressed (previous SQLite format)
+- snapshot:   `app.engine.state_codec` (tagged binary, products as tagged records)
+
+Usage:
+    python -m benchmarks.bench_state_codec
+    python -m benchmarks.bench_state_codec --conversations 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+import zlib
+from typing import Callable
+
+from app.engine.service import ChatEngine
+from app.engine.state import ConversationState
+from app.engine.state_codec import decode_state, encode_state
+
+from ._synthetic import percentiles
+from .corpora import default_corpus
+
+
+FORMATS: dict[str, tuple[Callable[[ConversationState], bytes], Callable[[bytes], ConversationState]]] = {
+    "json": (
+        lambda s: s.model_dump_json().encode("utf-8"),
+        ConversationState.model_validate_json,
+    ),
+    "json+zlib": (
+        lambda s: zlib.compress(s.model_dump_json(exclude_defaults=True).encode("utf-8")),
+        lambda b: ConversationState.model_validate_json(zlib.decompress(b)),
+    ),
+    "snapshot": (encode_state, decode_state),
+}
+
+
+def capture_states(conversations: int, seed: int) -> list[ConversationState]:
+    """Deep copies of the session state after every turn of the corpus."""
+    engine = ChatEngine(executor="direct")
+    states: list[ConversationState] = []
+    for i, conversation in enumerate(default_corpus(conversations, seed=seed)):
+        sid = f"codec-{i}"
+        engine.start_session(sid)
+        for message in conversation:
+            states.append(engine.process_turn(sid, message).model_copy(deep=True))
+    return states
+
+
+def _mean_time(fn: Callable, items: list, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (repeat * len(items))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=100, help="generated conversations (plus docs/chat.md)")
+    parser.add_argument("--repeat", type=int, default=3, help="timing passes over all captured states")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    os.environ["LLM_ROUTER_ENABLED"] = "false"
+    states = capture_states(args.conversations, args.seed)
+    print(f"{len(states):,} states captured\n")
+    print(f"{'format':<11} {'mean B':>8} {'p95 B':>8} {'max B':>8} {'encode µs':>10} {'decode µs':>10}")
+    print("-" * 60)
+
+    for name, (encode, decode) in FORMATS.items():
+        blobs = [encode(s) for s in states]
+        sizes = [float(len(b)) for b in blobs]
+        p = percentiles(sizes)
+        enc = _mean_time(encode, states, args.repeat)
+        dec = _mean_time(decode, blobs, args.repeat)
+        print(
+            f"{name:<11} {sum(sizes) / len(sizes):>8,.0f} {p['p95']:>8,.0f} {max(sizes):>8,.0f} "
+            f"{enc * 1e6:>10.1f} {dec * 1e6:>10.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,276 @@
+"""
+Turn-level benchmark: replay conversation corpora through ChatEngine.process_turn.
+
+Each conversation of the corpus (docs/chat.md plus generated ES/EN variants,
+see `benchmarks.corpora`) runs in its own session. The report shows:
+- end-to-end turn latency (p50/p95/p99) and turns per second,
+- latency per graph node and per routing rule (p50/p95/p99, call counts, how
+  often each rule decided the turn),
+- allocations per turn (tracemalloc peak and net allocated blocks), measured
+  in a separate pass because tracing slows everything down.
+
+Modes:
+- default: deterministic path only (LLM_ROUTER_ENABLED=false).
+- --stub-router MS: the LLM router is replaced by a stub that sleeps MS
+  milliseconds. The shipped rule set ends with a catch-all out-of-scope rule
+  that answers before the router, so this mode drops that rule to let
+  unmatched turns reach the (stubbed) router.
+
+Usage:
+    python -m benchmarks.bench_turns
+    python -m benchmarks.bench_turns --conversations 500 --repeat 3
+    python -m benchmarks.bench_turns --stub-router 150
+    python -m benchmarks.bench_turns --executor direct
+    python -m benchmarks.bench_turns --json bench_turns.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import inspect
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, Iterator
+
+from app.engine.service import ChatEngine
+from app.engine.state import ConversationState
+from app.graph import builder, executor as executor_module
+from app.graph.nodes import interpret as interpret_module
+from app.graph.routing.rules import RULES
+from app.graph.routing.rules.out_of_scope_rules import rule_out_of_scope
+from app.llm.router_schema import Intent, RouterResult
+
+from ._synthetic import percentiles
+from .corpora import Conversation, default_corpus
+
+
+class Recorder:
+    """Collects duration samples (seconds) per label."""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.wins: dict[str, int] = defaultdict(int)
+
+    def reset(self) -> None:
+        """Drop collected samples (wrappers keep appending to the same lists)."""
+        for samples in self.samples.values():
+            samples.clear()
+        self.wins.clear()
+
+    def timed(self, label: str, fn: Callable[[ConversationState], object]) -> Callable[[ConversationState], object]:
+        samples = self.samples[label]
+
+        def wrapper(state: ConversationState):
+            start = time.perf_counter()
+            try:
+                return fn(state)
+            finally:
+                samples.append(time.perf_counter() - start)
+
+        wrapper.__name__ = getattr(fn, "__name__", label)
+        return wrapper
+
+    def timed_rule(self, fn: Callable[[ConversationState], bool]) -> Callable[[ConversationState], bool]:
+        label = fn.__name__
+        samples = self.samples[f"rule:{label}"]
+
+        def wrapper(state: ConversationState) -> bool:
+            start = time.perf_counter()
+            matched = fn(state)
+            samples.append(time.perf_counter() - start)
+            if matched:
+                self.wins[label] += 1
+            return matched
+
+        wrapper.__name__ = label
+        return wrapper
+
+
+@contextlib.contextmanager
+def instrumented(recorder: Recorder, stub_latency_ms: float | None) -> Iterator[None]:
+    """
+    Wrap graph nodes, routing rules and (optionally) stub the LLM router.
+
+    Nodes are wrapped through `instrumented`, the hook both executors apply
+    to every node when they are built; RULES is edited in place because the
+    interpret node holds a reference to that list. Everything is restored on
+    exit.
+    """
+    saved_instrumented = builder.instrumented
+    saved_rules = list(RULES)
+    saved_router = interpret_module.interpret_with_openai
+    saved_env = os.environ.get("LLM_ROUTER_ENABLED")
+
+    def instrumented(name, fn):
+        # The harness drives the sync path only; async node variants stay as they are.
+        fn = saved_instrumented(name, fn)
+        return fn if inspect.iscoroutinefunction(fn) else recorder.timed(f"node:{name}", fn)
+
+    try:
+        builder.instrumented = instrumented
+        executor_module.instrumented = instrumented
+
+        rules = saved_rules
+        if stub_latency_ms is not None:
+            rules = [r for r in rules if r is not rule_out_of_scope]
+            delay = stub_latency_ms / 1000.0
+
+            def stub_router(state: ConversationState) -> RouterResult:
+                time.sleep(delay)
+                return RouterResult(intent=Intent.SHOW_CATALOG, confidence=0.9)
+
+            interpret_module.interpret_with_openai = recorder.timed("llm_router", stub_router)
+            os.environ["LLM_ROUTER_ENABLED"] = "true"
+        else:
+            os.environ["LLM_ROUTER_ENABLED"] = "false"
+        RULES[:] = [recorder.timed_rule(r) for r in rules]
+        yield
+    finally:
+        builder.instrumented = saved_instrumented
+        executor_module.instrumented = saved_instrumented
+        RULES[:] = saved_rules
+        interpret_module.interpret_with_openai = saved_router
+        if saved_env is None:
+            os.environ.pop("LLM_ROUTER_ENABLED", None)
+        else:
+            os.environ["LLM_ROUTER_ENABLED"] = saved_env
+
+
+def replay(engine: ChatEngine, corpus: list[Conversation], prefix: str, turn_samples: list[float]) -> int:
+    """Run every conversation in a fresh session; return the number of turns."""
+    turns = 0
+    for i, conversation in enumerate(corpus):
+        session_id = f"{prefix}-{i}"
+        engine.start_session(session_id)
+        for message in conversation:
+            start = time.perf_counter()
+            engine.process_turn(session_id, message)
+            turn_samples.append(time.perf_counter() - start)
+            turns += 1
+        engine.reset(session_id)
+    return turns
+
+
+def measure_allocations(engine: ChatEngine, corpus: list[Conversation]) -> dict[str, float]:
+    """tracemalloc peak bytes and net allocated blocks per turn (separate, slower pass)."""
+    peaks: list[float] = []
+    blocks: list[float] = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for i, conversation in enumerate(corpus):
+            session_id = f"alloc-{i}"
+            engine.start_session(session_id)
+            for message in conversation:
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+                before = sys.getallocatedblocks()
+                engine.process_turn(session_id, message)
+                blocks.append(sys.getallocatedblocks() - before)
+                peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            engine.reset(session_id)
+    finally:
+        tracemalloc.stop()
+    p_peak = percentiles(peaks)
+    return {
+        "peak_kib_p50": p_peak["p50"] / 1024,
+        "peak_kib_p95": p_peak["p95"] / 1024,
+        "net_blocks_mean": sum(blocks) / len(blocks) if blocks else 0.0,
+    }
+
+
+def _row(label: str, samples: list[float], extra: str = "") -> str:
+    p = percentiles(samples)
+    return (
+        f"{label:<40} {len(samples):>8,} {p['p50'] * 1e6:>10.1f} {p['p95'] * 1e6:>10.1f} "
+        f"{p['p99'] * 1e6:>10.1f}  {extra}"
+    )
+
+
+def run(
+    conversations: int,
+    repeat: int,
+    stub_latency_ms: float | None,
+    alloc: bool,
+    seed: int,
+    executor: str = "graph",
+) -> dict:
+    corpus = default_corpus(conversations, seed=seed)
+    recorder = Recorder()
+    turn_samples: list[float] = []
+
+    with instrumented(recorder, stub_latency_ms):
+        engine = ChatEngine(executor=executor)
+        replay(engine, corpus[:5], "warmup", [])  # warm caches and indexes
+        allocations = measure_allocations(engine, corpus) if alloc else {}
+        recorder.reset()
+
+        start = time.perf_counter()
+        turns = 0
+        for r in range(repeat):
+            turns += replay(engine, corpus, f"run{r}", turn_samples)
+        elapsed = time.perf_counter() - start
+
+    mode = "deterministic" if stub_latency_ms is None else f"stub router {stub_latency_ms:g} ms"
+    mode += f", {executor} executor"
+    print(f"corpus: {len(corpus)} conversations x {repeat} | {turns:,} turns | {mode}\n")
+    print(f"{'':<40} {'count':>8} {'p50 µs':>10} {'p95 µs':>10} {'p99 µs':>10}")
+    print("-" * 84)
+    print(_row("turn (process_turn)", turn_samples))
+    print(f"\nthroughput: {turns / elapsed:,.0f} turns/s (single thread)")
+    if allocations:
+        print(
+            f"allocations/turn: peak {allocations['peak_kib_p50']:.1f} KiB p50, "
+            f"{allocations['peak_kib_p95']:.1f} KiB p95 | net blocks {allocations['net_blocks_mean']:.1f} mean"
+        )
+
+    print(f"\n{'graph node':<40} {'count':>8} {'p50 µs':>10} {'p95 µs':>10} {'p99 µs':>10}")
+    print("-" * 84)
+    for label in sorted(k for k in recorder.samples if k.startswith("node:") or k == "llm_router"):
+        if recorder.samples[label]:
+            print(_row(label.removeprefix("node:"), recorder.samples[label]))
+
+    print(f"\n{'routing rule (pipeline order)':<40} {'count':>8} {'p50 µs':>10} {'p95 µs':>10} {'p99 µs':>10}  wins")
+    print("-" * 90)
+    for rule in RULES:
+        label = f"rule:{rule.__name__}"
+        if recorder.samples.get(label):
+            print(_row(rule.__name__, recorder.samples[label], f"{recorder.wins.get(rule.__name__, 0):,}"))
+
+    return {
+        "mode": mode,
+        "turns": turns,
+        "turns_per_second": turns / elapsed,
+        "turn": percentiles(turn_samples),
+        "allocations": allocations,
+        "stages": {label: percentiles(s) | {"count": len(s)} for label, s in recorder.samples.items() if s},
+        "rule_wins": dict(recorder.wins),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200, help="generated conversations (plus docs/chat.md)")
+    parser.add_argument("--repeat", type=int, default=1, help="replays of the whole corpus")
+    parser.add_argument("--stub-router", type=float, default=None, metavar="MS", help="stub LLM router latency")
+    parser.add_argument("--no-alloc", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--executor", choices=["graph", "direct"], default="graph", help="turn executor")
+    parser.add_argument("--json", default=None, help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    result = run(args.conversations, args.repeat, args.stub_router, not args.no_alloc, args.seed, args.executor)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+"""
+Replayable conversation corpora for the turn-level benchmarks.
+
+A corpus is a list of conversations; a conversation is the ordered list of
+user messages of one session. Sources:
+- `docs/chat.md`: the reference transcript shipped with the repository.
+- Generated ES/EN conversations: scripted flows (greeting, recommendation,
+  an open-ended question, single and multi-item cart commands, quantity
+  adjustments, product detail, checkout confirmation, exit) with products, quantities, families and budgets
+  drawn from a seeded RNG, so every run replays the same turns.
+"""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+from app.services import get_catalog
+
+
+Conversation = list[str]
+
+DOCS_CHAT = Path(__file__).resolve().parent.parent / "docs" / "chat.md"
+
+_FAMILIES_ES = ["cítrico", "amaderado", "floral", "oriental", "afrutado", "dulce", "acuático", "de cuero"]
+_FAMILIES_EN = ["citrus", "woody", "floral", "oriental", "fruity", "sweet", "aquatic", "leather"]
+_AUDIENCE_ES = ["para hombre", "para mujer", "unisex", ""]
+_AUDIENCE_EN = ["for men", "for women", "unisex", ""]
+# Free-form turns no deterministic rule claims (they reach the LLM router when enabled).
+_OPEN_ES = [
+    "tengo una cena importante el sábado",
+    "mi novia cumple años la semana que viene",
+    "algo que dure todo el día en la oficina",
+    "¿cuál es vuestro más vendido?",
+]
+_OPEN_EN = [
+    "I have an important dinner on saturday",
+    "my girlfriend's birthday is next week",
+    "something that lasts all day at the office",
+    "which one is your bestseller?",
+]
+
+
+def load_markdown_transcript(path: Path = DOCS_CHAT) -> Conversation:
+    """Extract the user messages of a `**Usuario:**` / `**Asistente:**` transcript."""
+    messages: Conversation = []
+    lines = path.read_text(encoding="utf-8").splitlines()
+    for i, line in enumerate(lines):
+        if line.strip().startswith("**Usuario:**"):
+            body: list[str] = []
+            for nxt in lines[i + 1:]:
+                if not nxt.strip():
+                    break
+                body.append(nxt.strip())
+            if body:
+                messages.append(" ".join(body))
+    return messages
+
+
+def _spanish(rnd: random.Random, ids: list[int], names: list[str]) -> Conversation:
+    a, b, c = rnd.sample(ids, 3)
+    q1, q2 = rnd.randint(1, 3), rnd.randint(1, 3)
+    family = rnd.choice(_FAMILIES_ES)
+    audience = rnd.choice(_AUDIENCE_ES)
+    return [
+        rnd.choice(["hola", "buenas", "¿qué puedes hacer?"]),
+        rnd.choice(_OPEN_ES),
+        f"¿Puedes recomendarme algo {family} {audience} por menos de {rnd.randrange(60, 200, 10)}€?".replace("  ", " "),
+        "ver el catálogo",
+        f"enséñame el {a}",
+        f"añade {q1} del {a}",
+        f"añádeme {q2} del {b} y 1 del {c}",
+        f"Añade también 1 {rnd.choice(names)}",
+        "Muéstrame el carrito",
+        "mejor que sea 1",
+        f"quítame 1 del {b}",
+        "Finalizar compra",
+        rnd.choice(["no", "si"]),
+        "salir",
+    ]
+
+
+def _english(rnd: random.Random, ids: list[int], names: list[str]) -> Conversation:
+    a, b, c = rnd.sample(ids, 3)
+    q1 = rnd.randint(1, 3)
+    family = rnd.choice(_FAMILIES_EN)
+    audience = rnd.choice(_AUDIENCE_EN)
+    return [
+        rnd.choice(["hello", "hi", "what can you do"]),
+        rnd.choice(_OPEN_EN),
+        f"recommend me something {family} {audience} under {rnd.randrange(60, 200, 10)}".replace("  ", " "),
+        "show me the catalog",
+        f"show me {a}",
+        f"add {q1} of {a}",
+        f"add 2 of {b} and remove 1 of {a}",
+        f"add the {rnd.choice(names)}",
+        "show me the cart",
+        "make it 2",
+        f"remove 1 of {c}",
+        "checkout",
+        rnd.choice(["no", "yes"]),
+        "bye",
+    ]
+
+
+def generated_conversations(count: int, seed: int = 11) -> list[Conversation]:
+    """`count` scripted conversations alternating Spanish and English."""
+    rnd = random.Random(seed)
+    catalog = get_catalog()
+    ids = [p.id for p in catalog]
+    names = [p.name for p in catalog]
+    return [
+        (_spanish if i % 2 == 0 else _english)(rnd, ids, names)
+        for i in range(count)
+    ]
+
+
+def default_corpus(generated: int = 200, seed: int = 11) -> list[Conversation]:
+    """The reference transcript followed by `generated` ES/EN conversations."""
+    return [load_markdown_transcript()] + generated_conversations(generated, seed=seed)
+
@@ -0,0 +1,99 @@
+"""
+Fake OpenAI-compatible server for load tests.
+
+Answers `POST /v1/chat/completions` with a canned `RouterResult` JSON after a
+configurable delay, so the LLM path of the app can be load-tested offline and
+with a controlled, reproducible latency. Point the app at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=fake
+
+The delay is an `asyncio.sleep`, so a single process can hold thousands of
+in-flight completions (the fake must never be the bottleneck being measured).
+
+Usage:
+    python -m benchmarks.fake_llm --port 8100 --delay-ms 300
+    python -m benchmarks.fake_llm --response '{"intent": "view_cart", "confidence": 0.9}'
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+
+# Default answer: a recommendation with slots, i.e. the heaviest path behind the router.
+DEFAULT_RESPONSE = {
+    "intent": "recommend_product",
+    "confidence": 0.9,
+    "language": None,
+    "product_id": None,
+    "name": None,
+    "city": None,
+    "family": ["woody"],
+    "audience": None,
+    "max_price": 150,
+    "min_price": None,
+    "actions": [],
+}
+
+
+def create_app(delay_ms: float = 300.0, jitter_ms: float = 0.0, response: dict | None = None) -> FastAPI:
+    """Build the fake server; the completion body is encoded once."""
+    content = json.dumps(response or DEFAULT_RESPONSE)
+    body = json.dumps(
+        {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "fake",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+            "usage": {"prompt_tokens": 900, "completion_tokens": 60, "total_tokens": 960},
+        }
+    ).encode("utf-8")
+
+    app = FastAPI(title="fake-openai")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions():
+        delay = delay_ms + (random.uniform(-jitter_ms, jitter_ms) if jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        return Response(content=body, media_type="application/json")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+def main() -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--delay-ms", type=float, default=300.0, help="latency of every completion")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform +/- jitter on the delay")
+    parser.add_argument("--response", default=None, help="RouterResult JSON to return (default: recommendation)")
+    args = parser.parse_args()
+
+    response = json.loads(args.response) if args.response else None
+    app = create_app(args.delay_ms, args.jitter_ms, response)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,23 @@
+"""
+ASGI entry point used by `benchmarks.load_http` (uvicorn import string
+`benchmarks.load_app:app`).
+
+It serves `app.main:app` unchanged, except that with LOADTEST_LLM_FALLTHROUGH=true
+the catch-all out-of-scope rule is removed from the routing rules. The shipped
+rule set answers every unmatched message deterministically, so without this
+the LLM router (and therefore the fake LLM server) would never be exercised.
+"""
+
+from __future__ import annotations
+
+import os
+
+from app.graph.routing.rules import RULES
+from app.graph.routing.rules.out_of_scope_rules import rule_out_of_scope
+from app.main import app
+
+if os.getenv("LOADTEST_LLM_FALLTHROUGH", "false").lower() == "true":
+    # In place: the interpret node iterates over this very list.
+    RULES[:] = [r for r in RULES if r is not rule_out_of_scope]
+
+__all__ = ["app"]
@@ -0,0 +1,312 @@
+"""
+HTTP load test of the FastAPI app across uvicorn worker counts.
+
+For every worker count the harness starts `uvicorn --workers N` on a free port
+(via `benchmarks.load_app`), then drives it with an async httpx client at each
+requested concurrency level. Every virtual user replays conversations from
+`benchmarks.corpora` end to end: `POST /start`, one `POST /chat` per message and
+`POST /checkout/submit` whenever the UI asks for the shipping form. Users run
+closed-loop (next request as soon as the previous answer arrives, plus an
+optional think time).
+
+LLM routing goes to a bundled fake OpenAI-compatible server
+(`benchmarks.fake_llm`) that answers with a canned RouterResult after
+`--llm-delay-ms`; the corpus' open-ended turns fall through to it. Use
+`--no-llm` to measure the deterministic path only. The router cache is off by
+default so that every fall-through turn pays the LLM latency.
+
+Output: one throughput/latency table per worker count (a curve over the
+concurrency levels) and its saturation point, i.e. the lowest concurrency
+that reaches 90% of the best throughput observed for that worker count.
+
+Notes:
+- Worker counts above 1 use the SQLite session store (shared file in a temp
+  dir); a single worker uses the in-memory store unless `--store sqlite`.
+- Client and servers share the host: keep an eye on CPU usage of the client
+  when interpreting the highest concurrency levels.
+- `app/main.py` loads `app/.env` with override=True; the harness refuses to run
+  if that file sets OpenAI/LLM variables, so it can never hit the real API.
+
+Usage:
+    python -m benchmarks.load_http
+    python -m benchmarks.load_http --workers 1,2,4 --concurrency 1,8,32,128 --duration 15
+    python -m benchmarks.load_http --no-llm --json load.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import httpx
+
+from ._synthetic import percentiles
+from .corpora import Conversation, default_corpus
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+_GUARDED_ENV = ("OPENAI_API_KEY", "OPENAI_BASE_URL", "LLM_ROUTER_ENABLED")
+_CHECKOUT_FORM = {
+    "full_name": "Ana Pérez",
+    "address_line1": "Calle Mayor 1",
+    "city": "Madrid",
+    "postal_code": "28013",
+    "phone": "600123123",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _check_dotenv() -> None:
+    """Abort if app/.env would override the fake LLM configuration."""
+    path = REPO_ROOT / "app" / ".env"
+    if not path.exists():
+        return
+    from dotenv import dotenv_values
+
+    clashing = sorted(k for k in dotenv_values(path) if k in _GUARDED_ENV)
+    if clashing:
+        raise SystemExit(f"{path} sets {', '.join(clashing)} (loaded with override=True); move it aside to run the load test")
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode} before becoming ready ({url})")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server not ready after {timeout:.0f}s ({url})")
+
+
+@contextmanager
+def _server(cmd: list[str], env: dict[str, str], health_url: str) -> Iterator[None]:
+    proc = subprocess.Popen(cmd, cwd=REPO_ROOT, env=env)
+    try:
+        _wait_ready(health_url, proc)
+        yield
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+class LevelStats:
+    """Latency samples and counters of one (workers, concurrency) run."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = {"start": [], "chat": [], "checkout": []}
+        self.errors = 0
+        self.conversations = 0
+
+    def all_latencies(self) -> list[float]:
+        return [x for samples in self.latencies.values() for x in samples]
+
+
+async def _post(client: httpx.AsyncClient, stats: LevelStats, endpoint: str, path: str, payload: dict) -> dict | None:
+    start = time.perf_counter()
+    try:
+        resp = await client.post(path, json=payload)
+    except httpx.HTTPError:
+        stats.errors += 1
+        return None
+    stats.latencies[endpoint].append(time.perf_counter() - start)
+    if resp.status_code != 200:
+        stats.errors += 1
+        return None
+    return resp.json()
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    user: int,
+    concurrency: int,
+    corpus: list[Conversation],
+    deadline: float,
+    think: float,
+    stats: LevelStats,
+    tag: str,
+) -> None:
+    k = 0
+    while time.perf_counter() < deadline:
+        conversation = corpus[(user + k * concurrency) % len(corpus)]
+        session_id = f"{tag}-u{user}-{k}"
+        k += 1
+        if await _post(client, stats, "start", "/start", {"session_id": session_id}) is None:
+            continue
+        for message in conversation:
+            if time.perf_counter() >= deadline:
+                return
+            if think:
+                await asyncio.sleep(think)
+            body = await _post(client, stats, "chat", "/chat", {"session_id": session_id, "message": message})
+            if body is None:
+                break
+            ui = body.get("ui") or {}
+            if ui.get("show_checkout_form"):
+                body = await _post(
+                    client, stats, "checkout", "/checkout/submit", {"session_id": session_id, **_CHECKOUT_FORM}
+                )
+                ui = (body or {}).get("ui") or {}
+            if ui.get("should_end"):
+                break
+        stats.conversations += 1
+
+
+async def run_level(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    corpus: list[Conversation],
+    think_ms: float,
+    tag: str,
+) -> tuple[LevelStats, float]:
+    """Drive `concurrency` virtual users for `duration` seconds; return stats and elapsed time."""
+    stats = LevelStats()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(
+            *(
+                _virtual_user(client, u, concurrency, corpus, deadline, think_ms / 1000.0, stats, tag)
+                for u in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+    return stats, elapsed
+
+
+def _saturation(points: list[dict]) -> dict | None:
+    """Lowest concurrency reaching 90% of the best throughput of the curve."""
+    if not points:
+        return None
+    best = max(p["rps"] for p in points)
+    return next(p for p in points if p["rps"] >= 0.9 * best)
+
+
+def run(args: argparse.Namespace) -> dict:
+    _check_dotenv()
+    corpus = default_corpus(args.conversations, seed=args.seed)
+    workers_list = [int(x) for x in args.workers.split(",")]
+    levels = [int(x) for x in args.concurrency.split(",")]
+    results: dict = {"llm_delay_ms": None if args.no_llm else args.llm_delay_ms, "workers": {}}
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as tmp, ExitStack() as stack:
+        base_env = {k: v for k, v in os.environ.items() if k not in _GUARDED_ENV}
+        base_env["ROUTER_CACHE_ENABLED"] = "true" if args.router_cache else "false"
+        base_env.pop("ROUTER_CACHE_PATH", None)
+
+        llm_port = _free_port()
+        fake_cmd = [
+            sys.executable, "-m", "benchmarks.fake_llm",
+            "--port", str(llm_port), "--delay-ms", str(args.llm_delay_ms),
+        ]
+        if not args.no_llm:
+            stack.enter_context(_server(fake_cmd, base_env, f"http://127.0.0.1:{llm_port}/health"))
+
+        for workers in workers_list:
+            store = args.store if args.store != "auto" else ("sqlite" if workers > 1 else "memory")
+            env = dict(base_env)
+            env["SESSION_STORE"] = store
+            env["SESSION_DB_PATH"] = str(Path(tmp) / f"sessions-{workers}.db")
+            if args.no_llm:
+                env["LLM_ROUTER_ENABLED"] = "false"
+                env["LOADTEST_LLM_FALLTHROUGH"] = "false"
+            else:
+                env["LLM_ROUTER_ENABLED"] = "true"
+                env["LOADTEST_LLM_FALLTHROUGH"] = "true"
+                env["OPENAI_API_KEY"] = "fake"
+                env["OPENAI_BASE_URL"] = f"http://127.0.0.1:{llm_port}/v1"
+
+            port = _free_port()
+            cmd = [
+                sys.executable, "-m", "uvicorn", "benchmarks.load_app:app",
+                "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+                "--log-level", "warning", "--no-access-log",
+            ]
+            base_url = f"http://127.0.0.1:{port}"
+            points: list[dict] = []
+            print(f"\nworkers={workers} store={store}")
+            print(f"{'concurrency':>11} {'req/s':>9} {'conv/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            print("-" * 66)
+            with _server(cmd, env, f"{base_url}/health"):
+                if args.warmup > 0:
+                    asyncio.run(run_level(base_url, max(levels), args.warmup, corpus, args.think_ms, f"w{workers}-warm"))
+                for concurrency in levels:
+                    stats, elapsed = asyncio.run(
+                        run_level(base_url, concurrency, args.duration, corpus, args.think_ms, f"w{workers}-c{concurrency}")
+                    )
+                    samples = stats.all_latencies()
+                    p = percentiles(samples)
+                    point = {
+                        "concurrency": concurrency,
+                        "requests": len(samples),
+                        "rps": len(samples) / elapsed,
+                        "conversations_per_s": stats.conversations / elapsed,
+                        "errors": stats.errors,
+                        "latency_ms": {k: v * 1000 for k, v in p.items()},
+                        "by_endpoint_ms": {
+                            name: {k: v * 1000 for k, v in percentiles(s).items()} | {"count": len(s)}
+                            for name, s in stats.latencies.items()
+                        },
+                    }
+                    points.append(point)
+                    print(
+                        f"{concurrency:>11} {point['rps']:>9,.0f} {point['conversations_per_s']:>8,.1f} "
+                        f"{p['p50'] * 1000:>8.1f} {p['p95'] * 1000:>8.1f} {p['p99'] * 1000:>8.1f} {stats.errors:>7}"
+                    )
+            sat = _saturation(points)
+            if sat is not None:
+                print(f"saturation: ~{sat['rps']:,.0f} req/s from concurrency {sat['concurrency']} "
+                      f"(p95 {sat['latency_ms']['p95']:.1f} ms)")
+            results["workers"][str(workers)] = {"store": store, "curve": points, "saturation": sat}
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated uvicorn worker counts")
+    parser.add_argument("--concurrency", default="1,4,16,64,128", help="comma-separated virtual user counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="warm-up seconds per worker count")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="pause before every chat message")
+    parser.add_argument("--llm-delay-ms", type=float, default=300.0, help="fake LLM completion latency")
+    parser.add_argument("--no-llm", action="store_true", help="deterministic routing only (no fake LLM)")
+    parser.add_argument("--router-cache", action="store_true", help="keep the router cache enabled")
+    parser.add_argument("--store", choices=["auto", "memory", "sqlite"], default="auto")
+    parser.add_argument("--conversations", type=int, default=200, help="generated conversations to replay")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--json", default=None, help="also write the curves to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+"""
+Session-store soak test: process RSS while many short-lived sessions come and go.
+
+Each simulated visitor opens a fresh session (like the Gradio "new conversation"
+button), asks for a recommendation (fills `ui_products`), adds a product to the
+cart and never comes back. With an unbounded store RSS keeps climbing; with
+TTL/LRU eviction it plateaus once the store reaches its steady-state size.
+
+Time is simulated (one visitor per `--arrival` seconds) so the TTL is
+exercised without waiting in real time.
+
+Usage:
+    python -m benchmarks.soak_sessions
+    python -m benchmarks.soak_sessions --sessions 50000 --ttl 600 --max-sessions 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+
+from app.engine.memory import InMemorySessionStore
+from app.engine.service import ChatEngine
+from app.utils.proc import current_rss_bytes
+
+
+class _SimulatedClock:
+    """Monotonic clock advanced by the driver instead of wall time."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+_TURNS = ["recomiéndame un perfume amaderado para hombre", "añade 1 del 301"]
+
+
+def soak(label: str, store: InMemorySessionStore, clock: _SimulatedClock, sessions: int, arrival: float) -> None:
+    engine = ChatEngine(store=store)
+    checkpoints = max(1, sessions // 10)
+    sweep_every = max(1, int(60 / arrival)) if arrival > 0 else sessions
+
+    print(f"\n{label}")
+    print(f"{'sessions':>10} | {'live':>8} | {'RSS':>10} | {'turns/s':>9}")
+    print("-" * 46)
+    start = time.perf_counter()
+    for i in range(1, sessions + 1):
+        session_id = f"soak-{i}"
+        for message in _TURNS:
+            engine.process_turn(session_id, message)
+        clock.now += arrival
+        if i % sweep_every == 0:
+            store.sweep()  # what the background sweeper does once a minute
+        if i % checkpoints == 0:
+            gc.collect()
+            elapsed = time.perf_counter() - start
+            live = store.stats()["sessions"]
+            rss = current_rss_bytes() / 2**20
+            print(f"{i:>10,} | {live:>8,} | {rss:>7.1f} MB | {i * len(_TURNS) / elapsed:>9,.0f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--arrival", type=float, default=0.5, help="simulated seconds between visitors")
+    parser.add_argument("--ttl", type=float, default=600.0)
+    parser.add_argument("--max-sessions", type=int, default=5_000)
+    parser.add_argument("--skip-unbounded", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_unbounded:
+        clock = _SimulatedClock()
+        soak("unbounded store", InMemorySessionStore(clock=clock), clock, args.sessions, args.arrival)
+        gc.collect()
+
+    clock = _SimulatedClock()
+    store = InMemorySessionStore(
+        ttl_seconds=args.ttl, max_sessions=args.max_sessions, sweep_interval=0, clock=clock
+    )
+    soak(f"ttl={args.ttl:g}s max_sessions={args.max_sessions:,}", store, clock, args.sessions, args.arrival)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())